@@ -1,5 +1,8 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Body, File, UploadFile, BackgroundTasks, Form
-from fastapi.responses import FileResponse
+import time
+IMPORT_STARTED = time.perf_counter()  # startup timing covers the imports below
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Body, UploadFile, Header, Request
+from fastapi.responses import FileResponse, ORJSONResponse, RedirectResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -8,49 +11,406 @@ import logging
 import uuid
 import base64
 import shutil
-import ffmpeg
 from pathlib import Path
 import tempfile
 import asyncio
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, NamedTuple
 from datetime import datetime
-from pydantic import BaseModel, Field
-import openai
-from PIL import Image, ImageFont, ImageDraw
+from pydantic import BaseModel, ConfigDict, Field
 import io
 import requests
 import json
-from datetime import datetime, timedelta
-import time
+from datetime import datetime, timedelta, timezone
 import re
+import random
+import hashlib
+import functools
+import heapq
+import socket
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pymongo import monitoring, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, multiprocess
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Set up OpenAI API key
-openai.api_key = os.environ.get('OPENAI_API_KEY')
+# openai, PIL and ffmpeg are imported on first use rather than here: openai
+# alone takes most of a second to import and most requests never touch them
+_openai = None
+
+def get_openai():
+    """The configured openai module, imported on first use."""
+    global _openai
+    if _openai is None:
+        import openai
+        openai.api_key = os.environ.get('OPENAI_API_KEY')
+        # Retries are handled by the provider scheduler, which knows about our quotas
+        openai.max_retries = 0
+        _openai = openai
+    return _openai
+
+# Metrics
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route",
+    ["method", "route", "status"],
+)
+PROVIDER_CALL_SECONDS = Histogram(
+    "provider_call_duration_seconds",
+    "Latency of generation provider calls by call type",
+    ["call"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, float("inf")),
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Latency of media pipeline stages",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, float("inf")),
+)
+PIPELINE_FAILURES = Counter(
+    "pipeline_failures_total",
+    "Failures by pipeline stage",
+    ["stage"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+# With several worker processes, gauges are combined across live workers
+# (see get_metrics); multiprocess_mode is ignored in a single process
+RENDERS_IN_FLIGHT = Gauge("renders_in_flight", "Videos currently being rendered", multiprocess_mode="livesum")
+RENDER_QUEUE_DEPTH = Gauge("render_queue_depth", "Videos accepted but not yet rendering", multiprocess_mode="livemax")
+MONGO_POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Open MongoDB pool connections", multiprocess_mode="livesum")
+MONGO_POOL_CHECKED_OUT = Gauge("mongo_pool_checked_out", "MongoDB pool connections in use", multiprocess_mode="livesum")
+PROVIDER_RETRIES = Counter(
+    "provider_retries_total",
+    "Retried generation provider calls by model and reason",
+    ["model", "reason"],
+)
+PROVIDER_CONCURRENCY = Gauge(
+    "provider_concurrency_limit",
+    "Current adaptive concurrency limit per model",
+    ["model"],
+    multiprocess_mode="livesum",
+)
+PROVIDER_HEDGES = Counter(
+    "provider_hedged_requests_total",
+    "Duplicate provider requests sent after the hedge delay, by model and which request won",
+    ["model", "winner"],
+)
+PROVIDER_CIRCUIT_STATE = Gauge(
+    "provider_circuit_state",
+    "Provider circuit breaker state per model (0 closed, 1 half-open, 2 open)",
+    ["model"],
+    multiprocess_mode="livemax",
+)
+
+# Pre-bound children keep label lookups off the hot paths
+CHAT_CALL_SECONDS = PROVIDER_CALL_SECONDS.labels("chat")
+IMAGE_CALL_SECONDS = PROVIDER_CALL_SECONDS.labels("image")
+SPEECH_CALL_SECONDS = PROVIDER_CALL_SECONDS.labels("speech")
+IMAGE_DOWNLOAD_SECONDS = PIPELINE_STAGE_SECONDS.labels("image_download")
+SUBTITLE_SECONDS = PIPELINE_STAGE_SECONDS.labels("subtitle")
+PROBE_SECONDS = PIPELINE_STAGE_SECONDS.labels("probe")
+ENCODE_SECONDS = PIPELINE_STAGE_SECONDS.labels("encode")
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Mirror MongoDB connection pool usage into gauges."""
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec()
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_CHECKED_OUT.inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[PoolMetricsListener()])
 db = client[os.environ['DB_NAME']]
 
-# Create media directories if they don't exist
-MEDIA_DIR = ROOT_DIR / "media"
-MEDIA_DIR.mkdir(exist_ok=True)
+# Identifies this worker process in job claims and leases
+INSTANCE_ID = f"{socket.gethostname()}-{os.getpid()}"
 
+# Media directories, created on startup
+MEDIA_DIR = ROOT_DIR / "media"
 IMAGES_DIR = MEDIA_DIR / "images"
-IMAGES_DIR.mkdir(exist_ok=True)
-
 AUDIO_DIR = MEDIA_DIR / "audio"
-AUDIO_DIR.mkdir(exist_ok=True)
-
 VIDEOS_DIR = MEDIA_DIR / "videos"
-VIDEOS_DIR.mkdir(exist_ok=True)
+
+def create_media_dirs():
+    for directory in (MEDIA_DIR, IMAGES_DIR, AUDIO_DIR, VIDEOS_DIR):
+        directory.mkdir(exist_ok=True)
+
+# Media storage
+# Stories and videos reference media by its /api/media/... path; the storage
+# backend maps that path to bytes and to a URL clients can fetch directly.
+MEDIA_URL_PREFIX = "/api/media/"
+
+class MediaObject(NamedTuple):
+    size: int
+    modified: float
+
+class LocalMediaStorage:
+    """Media on the local disk, served by nginx straight from MEDIA_DIR."""
+
+    def path(self, media_url: str) -> Path:
+        return MEDIA_DIR / media_url.replace(MEDIA_URL_PREFIX, "")
+
+    def save_bytes(self, media_url: str, data: bytes, content_type: str):
+        self.path(media_url).write_bytes(data)
+
+    def save_file(self, media_url: str, source: Path, content_type: str):
+        shutil.move(str(source), self.path(media_url))
+
+    def save_stream(self, media_url: str, chunks, content_type: str):
+        with open(self.path(media_url), "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+    def fetch(self, media_url: str, directory: Path) -> Path:
+        """A local path to read the media from; local files are used in place."""
+        return self.path(media_url)
+
+    def exists(self, media_url: str) -> bool:
+        return self.path(media_url).exists()
+
+    def delete(self, media_url: str):
+        self.path(media_url).unlink(missing_ok=True)
+
+    def list(self) -> Dict[str, MediaObject]:
+        objects = {}
+        for directory in (IMAGES_DIR, AUDIO_DIR, VIDEOS_DIR):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        objects[f"{MEDIA_URL_PREFIX}{directory.name}/{entry.name}"] = MediaObject(
+                            stat.st_size, max(stat.st_atime, stat.st_mtime)
+                        )
+        return objects
+
+    def url(self, media_url: str) -> str:
+        return media_url
+
+class S3MediaStorage:
+    """Media in an S3-compatible bucket, delivered through presigned or CDN URLs."""
+
+    def __init__(self):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = os.environ["S3_BUCKET"]
+        self.prefix = os.environ.get("S3_PREFIX", "media/")
+        self.cdn_url = os.environ.get("MEDIA_CDN_URL", "").rstrip("/")
+        self.url_expiry = int(os.environ.get("MEDIA_URL_EXPIRY_SECONDS", "3600"))
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=os.environ.get("S3_ENDPOINT_URL") or None,
+            region_name=os.environ.get("S3_REGION") or None
+        )
+        # Files above 8MB are uploaded as parallel multipart chunks
+        self.transfer_config = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
+
+    def key(self, media_url: str) -> str:
+        return self.prefix + media_url.replace(MEDIA_URL_PREFIX, "")
+
+    def save_bytes(self, media_url: str, data: bytes, content_type: str):
+        self.client.put_object(Bucket=self.bucket, Key=self.key(media_url), Body=data, ContentType=content_type)
+
+    def save_file(self, media_url: str, source: Path, content_type: str):
+        self.client.upload_file(
+            str(source), self.bucket, self.key(media_url),
+            ExtraArgs={"ContentType": content_type}, Config=self.transfer_config
+        )
+        source.unlink(missing_ok=True)
+
+    def save_stream(self, media_url: str, chunks, content_type: str):
+        self.client.upload_fileobj(
+            ChunkReader(chunks), self.bucket, self.key(media_url),
+            ExtraArgs={"ContentType": content_type}, Config=self.transfer_config
+        )
+
+    def fetch(self, media_url: str, directory: Path) -> Path:
+        destination = directory / media_url.replace(MEDIA_URL_PREFIX, "").replace("/", "_")
+        self.client.download_file(self.bucket, self.key(media_url), str(destination), Config=self.transfer_config)
+        return destination
+
+    def exists(self, media_url: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(media_url))
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def delete(self, media_url: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(media_url))
+
+    def list(self) -> Dict[str, MediaObject]:
+        objects = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                media_url = MEDIA_URL_PREFIX + item["Key"][len(self.prefix):]
+                objects[media_url] = MediaObject(item["Size"], item["LastModified"].timestamp())
+        return objects
+
+    def url(self, media_url: str) -> str:
+        if self.cdn_url:
+            return f"{self.cdn_url}/{self.key(media_url)}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self.key(media_url)},
+            ExpiresIn=self.url_expiry
+        )
+
+class ChunkReader(io.RawIOBase):
+    """File-like view over an iterator of byte chunks, for streaming uploads."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self.buffer:
+            try:
+                self.buffer = next(self.chunks)
+            except StopIteration:
+                return 0
+        size = min(len(target), len(self.buffer))
+        target[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+MEDIA_STORAGE = os.environ.get("MEDIA_STORAGE", "local")
+storage = S3MediaStorage() if MEDIA_STORAGE == "s3" else LocalMediaStorage()
+
+MEDIA_CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".wav": "audio/wav",
+    ".mp4": "video/mp4",
+}
+
+def media_content_type(media_url: str) -> str:
+    return MEDIA_CONTENT_TYPES.get(Path(media_url).suffix, "application/octet-stream")
+
+def delivery_url(media_url: Optional[str]) -> Optional[str]:
+    """URL a client should fetch a stored media path from."""
+    if not media_url or not media_url.startswith(MEDIA_URL_PREFIX):
+        return media_url
+    return storage.url(media_url)
+
+def with_delivery_urls(document: dict) -> dict:
+    """Copy of a story or video document with media paths swapped for delivery URLs."""
+    document = dict(document)
+    for field in ("audio_url", "video_url", "thumbnail_url"):
+        if document.get(field):
+            document[field] = delivery_url(document[field])
+    if document.get("images"):
+        document["images"] = [delivery_url(url) for url in document["images"]]
+    if document.get("image_urls"):
+        document["image_urls"] = [delivery_url(url) for url in document["image_urls"]]
+    if document.get("outputs"):
+        document["outputs"] = [{**output, "video_url": delivery_url(output["video_url"])} for output in document["outputs"]]
+    return document
+
+# Media catalog
+# Every stored file gets a db.media entry when it is written: content hash,
+# size, duration, dimensions and codec, linked to its stories and video.
+# Rendering and cleanup read these instead of probing or re-reading files.
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def image_header_metadata(head: bytes) -> dict:
+    """Dimensions and format of an image, read from its first bytes."""
+    from PIL import Image
+    
+    try:
+        with Image.open(io.BytesIO(head)) as image:
+            return {"width": image.width, "height": image.height, "codec": image.format.lower()}
+    except Exception:
+        return {}
+
+PROBE_FIELDS = ("duration", "width", "height", "codec", "audio_codec")
+
+def probe_media(path: Path) -> dict:
+    """Duration, dimensions and codecs of an audio or video file from one ffprobe run."""
+    import ffmpeg
+    
+    probe = ffmpeg.probe(str(path))
+    video = next((stream for stream in probe["streams"] if stream["codec_type"] == "video"), None)
+    audio = next((stream for stream in probe["streams"] if stream["codec_type"] == "audio"), None)
+    metadata = {"duration": float(probe["format"]["duration"])}
+    if video:
+        metadata.update(width=video["width"], height=video["height"], codec=video["codec_name"])
+        if audio:
+            metadata["audio_codec"] = audio["codec_name"]
+    elif audio:
+        metadata["codec"] = audio["codec_name"]
+    return metadata
+
+async def catalog_media(media_url: str, kind: str, metadata: dict, story_id: Optional[str] = None, video_id: Optional[str] = None):
+    now = datetime.utcnow()
+    fields = {"kind": kind, "content_type": media_content_type(media_url), **metadata, "updated_at": now}
+    if video_id:
+        fields["video_id"] = video_id
+    update = {"$set": fields, "$setOnInsert": {"created_at": now}}
+    # Probe results that were not measured for this file must not survive from
+    # whatever was catalogued under the same URL before
+    stale = [field for field in PROBE_FIELDS if field not in metadata]
+    if kind in ("audio", "video") and stale:
+        update["$unset"] = {field: "" for field in stale}
+    if story_id:
+        # Deduplicated uploads can belong to several stories
+        update["$addToSet"] = {"story_ids": story_id}
+    await db.media.update_one({"url": media_url}, update, upsert=True)
 
 # Create the main app
-app = FastAPI()
+# orjson serializes responses (datetimes included) several times faster than json
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -65,25 +425,59 @@ class User(BaseModel):
 class StoryRequest(BaseModel):
     prompt: str
     duration: str  # "30-60", "60-90", "90-120" seconds
+    reuse: Optional[bool] = None  # reuse a near-duplicate story; None follows PROMPT_REUSE_MODE
 
 class StoryResponse(BaseModel):
     story: str
     duration: str
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    # Set when an existing story was returned instead of writing a new one
+    reused: bool = False
+    similarity: Optional[float] = None
+    images: Optional[List[str]] = None
+    style: Optional[str] = None
+    audio_url: Optional[str] = None
+    voice: Optional[str] = None
 
 class ImageGenerationRequest(BaseModel):
     story_id: str
     style: str  # "realistic", "cartoon", "lego", "fashion", "painting", "neon"
+    resume: bool = False  # only regenerate images that are missing or failed
+
+class ImageRegenerationRequest(BaseModel):
+    story_id: str
+    index: int
+    style: Optional[str] = None  # defaults to the story's current style
 
 class ImageResponse(BaseModel):
     image_urls: List[str]
     story_id: str
+    failed_indices: List[int] = []
+
+class ImageSegmentState(BaseModel):
+    index: int
+    status: str = "pending"  # "pending", "generating", "done", "failed"
+    attempts: int = 0
+    image_url: Optional[str] = None
+    error: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class SubtitleCustomization(BaseModel):
     font: str
     color: str
     placement: str  # "top", "middle", "bottom"
     background: str  # "none", "solid", "gradient"
+    outline: bool = False
+    shadow: bool = False
+
+class SubtitleCue(BaseModel):
+    start: float
+    end: float
+    text: str
+
+class SubtitleUpdate(BaseModel):
+    cues: Optional[List[SubtitleCue]] = None
+    customization: Optional[SubtitleCustomization] = None
 
 class VoiceGenerationRequest(BaseModel):
     story_id: str
@@ -93,6 +487,10 @@ class VideoGenerationRequest(BaseModel):
     story_id: str
     subtitle_customization: SubtitleCustomization
     voice_id: str
+    formats: List[str] = ["9:16"]  # any of "9:16", "16:9", "1:1"; the first is the primary video_url
+    priority: str = "interactive"  # "interactive" for renders someone is waiting on, "batch" otherwise
+    # Subtitles go in a text track unless the target platform needs them in the picture
+    burn_subtitles: bool = False
 
 class Video(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -102,6 +500,66 @@ class Video(BaseModel):
     video_url: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Stored documents are returned through these models. Fields a document
+# lacks, e.g. because fields= left them out, are omitted from the response
+# and undeclared fields pass through as stored.
+class VideoOutput(BaseModel):
+    format: str
+    width: int
+    height: int
+    video_url: str
+
+class VideoDocument(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    id: str
+    title: Optional[str] = None
+    story_id: Optional[str] = None
+    duration: Optional[str] = None
+    video_url: Optional[str] = None
+    outputs: Optional[List[VideoOutput]] = None
+    thumbnail_url: Optional[str] = None
+    subtitles: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+class StoryDocument(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    id: str
+    story: Optional[str] = None
+    prompt: Optional[str] = None
+    duration: Optional[str] = None
+    scenes: Optional[List[Dict[str, Any]]] = None
+    images: Optional[List[str]] = None
+    image_segments: Optional[List[Dict[str, Any]]] = None
+    storyboard: Optional[Dict[str, Any]] = None
+    image_generation_progress: Optional[float] = None
+    image_generation_complete: Optional[bool] = None
+    style: Optional[str] = None
+    audio_url: Optional[str] = None
+    voice: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+class PublishEntry(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    id: str
+    video_id: Optional[str] = None
+    platform: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    publish_date: Optional[datetime] = None
+    visibility: Optional[str] = None
+    status: Optional[str] = None
+    status_history: Optional[List[Dict[str, Any]]] = None
+    uploaded_bytes: Optional[int] = None
+    platform_response: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
 class PublishRequest(BaseModel):
     video_id: str
     platform: str  # "tiktok", "youtube"
@@ -116,14 +574,30 @@ class Settings(BaseModel):
     youtube_api_key: Optional[str] = None
 
 # Helper functions
-async def get_story(story_id: str):
-    story = await db.stories.find_one({"id": story_id})
+def field_projection(fields: Optional[str]) -> dict:
+    """Mongo projection for a comma-separated ``fields=`` query parameter.
+
+    Mongo's _id is never returned, and a path inside another requested path
+    is left to that one, since Mongo rejects overlapping projection paths.
+    """
+    if not fields:
+        return {"_id": 0}
+    names = ["id"] + [name.strip() for name in fields.split(",") if name.strip()]
+    if any(name.startswith("$") or "" in name.split(".") for name in names):
+        raise HTTPException(status_code=400, detail="Invalid field name")
+    names = [name for name in dict.fromkeys(names) if name.split(".")[0] != "_id"]
+    # "images" already covers "images.url"
+    names = [name for name in names if not any(name.startswith(f"{other}.") for other in names)]
+    return {"_id": 0, **{name: 1 for name in names}}
+
+async def get_story(story_id: str, projection: Optional[dict] = None):
+    story = await db.stories.find_one({"id": story_id}, projection)
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     return story
 
-async def get_video(video_id: str):
-    video = await db.videos.find_one({"id": video_id})
+async def get_video(video_id: str, projection: Optional[dict] = None):
+    video = await db.videos.find_one({"id": video_id}, projection)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     return video
@@ -135,6 +609,597 @@ async def check_auth(password: str = Body(...)):
         raise HTTPException(status_code=401, detail="Authentication failed")
     return user
 
+# Innermost open span of the running task, as (trace, node)
+_current_span: ContextVar[Optional[tuple]] = ContextVar("current_span", default=None)
+
+class PipelineTrace:
+    """Span tree recording where the time of one pipeline run went.
+
+    Spans nest by task context, so concurrent steps started with
+    asyncio.gather attach to the span that was open when they were created.
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.root = {"name": name, "start": datetime.utcnow(), "children": []}
+        if attrs:
+            self.root["attrs"] = attrs
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, metric=None, **attrs):
+        current = _current_span.get()
+        parent = current[1] if current and current[0] is self else self.root
+        node = {"name": name, "start": datetime.utcnow(), "children": []}
+        if attrs:
+            node["attrs"] = attrs
+        parent["children"].append(node)
+        token = _current_span.set((self, node))
+        started = time.perf_counter()
+        try:
+            yield node
+        except Exception as e:
+            node["error"] = str(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            node["end"] = datetime.utcnow()
+            node["duration_ms"] = round(elapsed * 1000, 3)
+            _current_span.reset(token)
+            if metric is not None:
+                metric.observe(elapsed)
+
+    def finish(self, error: Optional[str] = None) -> dict:
+        self.root["end"] = datetime.utcnow()
+        self.root["duration_ms"] = round((time.perf_counter() - self._started) * 1000, 3)
+        if error:
+            self.root["error"] = error
+        return self.root
+
+    def stage_durations(self) -> Dict[str, float]:
+        """Total milliseconds per span path, e.g. ``render/frames/frame``."""
+        totals = {}
+
+        def walk(node, prefix):
+            for child in node["children"]:
+                path = f"{prefix}/{child['name']}" if prefix else child["name"]
+                totals[path] = round(totals.get(path, 0) + child.get("duration_ms", 0), 3)
+                walk(child, path)
+
+        walk(self.root, "")
+        return totals
+
+async def save_trace(trace: PipelineTrace, kind: str, story_id: str, video_id: Optional[str] = None, error: Optional[str] = None):
+    """Persist a finished trace on the story and in the job_timings collection."""
+    tree = trace.finish(error)
+    try:
+        await db.stories.update_one({"id": story_id}, {"$set": {f"timings.{kind}": tree}})
+        await db.job_timings.insert_one({
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "story_id": story_id,
+            "video_id": video_id,
+            "total_ms": tree["duration_ms"],
+            "stages": trace.stage_durations(),
+            "failed": error is not None,
+            "created_at": datetime.utcnow()
+        })
+    except Exception as e:
+        # Timing data must never fail the pipeline it describes
+        logging.error(f"Error saving {kind} timings for story {story_id}: {str(e)}")
+    return tree
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+# Provider scheduler
+# Default per-model budgets; override with OPENAI_RATE_LIMITS, e.g.
+# '{"dall-e-3": {"rpm": 15, "concurrency": 8}}'
+DEFAULT_RATE_LIMITS = {
+    "gpt-4o": {"rpm": 500, "tpm": 30000, "concurrency": 16},
+    "dall-e-3": {"rpm": 5, "tpm": 0, "concurrency": 5},
+    "tts-1-hd": {"rpm": 50, "tpm": 0, "concurrency": 8},
+}
+PROVIDER_MAX_ATTEMPTS = int(os.environ.get("OPENAI_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 60.0
+# Longest a single provider request may take; the request budget can cut it shorter
+PROVIDER_CALL_TIMEOUTS = {"gpt-4o": 45, "dall-e-3": 90, "tts-1-hd": 90}
+DEFAULT_CALL_TIMEOUT = 60
+# Total seconds each kind of request may spend on provider calls, retries
+# and backoff included; override with OPENAI_REQUEST_BUDGETS
+REQUEST_BUDGETS = {"story": 90, "images": 300, "voice": 150, **json.loads(os.environ.get("OPENAI_REQUEST_BUDGETS", "{}"))}
+# Models whose calls are cheap enough to duplicate when they run slow. The
+# duplicate goes out once the first request has taken longer than the
+# model's recent p95, and only if the model has a free slot right away.
+HEDGED_MODELS = set(filter(None, os.environ.get("OPENAI_HEDGE_MODELS", "gpt-4o").split(",")))
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+# A model's circuit opens when at least half of its recent calls failed on
+# the provider side, fails calls fast while open, and lets one probe call
+# through after the cool-down
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_CALLS = 10
+CIRCUIT_FAILURE_RATE = 0.5
+CIRCUIT_COOLDOWN_SECONDS = 30
+
+class ProviderError(Exception):
+    status_code = 503
+
+class ProviderUnavailable(ProviderError):
+    pass
+
+class ProviderDeadlineExceeded(ProviderError):
+    status_code = 504
+
+# Deadline (time.monotonic) for provider calls of the request being served
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+@contextmanager
+def request_budget(kind: str):
+    """Give the provider calls made inside the block, and the tasks they start, a shared deadline."""
+    token = _deadline.set(time.monotonic() + REQUEST_BUDGETS[kind])
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def budget_remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse rate limit reset values such as "20ms", "1.5s" or "6m0s" into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    parts = re.findall(r"([\d.]+)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+class TokenBucket:
+    """Per-minute budget that refills continuously, shared by every worker.
+
+    The level lives in db.rate_limits, so all worker processes, on any host,
+    draw on the one account quota however requests are spread across them.
+    Each change is a compare-and-set against the last write, retried if
+    another worker wrote in between.
+    """
+
+    def __init__(self, name: str, per_minute: float):
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+
+    async def update(self, change):
+        """Apply ``change(tokens) -> (new level or None, result)`` to the refilled level and return the result."""
+        while True:
+            state = await db.rate_limits.find_one({"_id": self.name})
+            # Wall-clock time, since the workers may be on different hosts
+            now = time.time()
+            tokens = self.capacity
+            if state:
+                tokens = min(self.capacity, state["tokens"] + max(0.0, now - state["updated"]) * self.rate)
+            new_tokens, result = change(tokens)
+            if new_tokens is None:
+                return result
+            if state:
+                written = await db.rate_limits.update_one(
+                    {"_id": self.name, "tokens": state["tokens"], "updated": state["updated"]},
+                    {"$set": {"tokens": new_tokens, "updated": now}}
+                )
+                if written.matched_count:
+                    return result
+            else:
+                try:
+                    await db.rate_limits.insert_one({"_id": self.name, "tokens": new_tokens, "updated": now})
+                    return result
+                except DuplicateKeyError:
+                    pass
+
+    async def take(self, amount: float) -> float:
+        """Take ``amount`` if it is available and return 0, else take nothing and return the seconds until it is."""
+        amount = min(amount, self.capacity)
+        
+        def change(tokens):
+            if tokens >= amount:
+                return tokens - amount, 0.0
+            return None, (amount - tokens) / self.rate
+        return await self.update(change)
+
+    async def give_back(self, amount: float):
+        await self.update(lambda tokens: (min(self.capacity, tokens + min(amount, self.capacity)), None))
+
+    async def sync(self, remaining: float, reset_seconds: Optional[float]):
+        """Align the shared budget with what the provider reports as left."""
+        def change(tokens):
+            if remaining >= tokens:
+                return None, None
+            if remaining <= 0 and reset_seconds:
+                # Provider says we're out until the window resets
+                return -reset_seconds * self.rate, None
+            return remaining, None
+        await self.update(change)
+
+class ModelLimiter:
+    """Request/token budgets and AIMD concurrency control for one model."""
+
+    def __init__(self, model: str, rpm: float, tpm: float, concurrency: int):
+        self.model = model
+        self.requests = TokenBucket(f"{model}:requests", rpm) if rpm else None
+        self.tokens = TokenBucket(f"{model}:tokens", tpm) if tpm else None
+        self.max_concurrency = concurrency
+        self.limit = float(concurrency)
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+        self.latencies = deque(maxlen=200)
+        PROVIDER_CONCURRENCY.labels(model).set(self.limit)
+
+    async def take_budget(self, tokens: int) -> float:
+        """Take a request and ``tokens`` from the shared budgets; if either is short, take neither and return the wait."""
+        wait = await self.requests.take(1) if self.requests else 0.0
+        if wait or not (self.tokens and tokens):
+            return wait
+        wait = await self.tokens.take(tokens)
+        if wait and self.requests:
+            await self.requests.give_back(1)
+        return wait
+
+    async def try_acquire(self, tokens: int) -> bool:
+        """Take a slot only if one is free right now; used for hedged requests."""
+        async with self.condition:
+            if self.in_flight >= int(self.limit) or await self.take_budget(tokens):
+                return False
+            self.in_flight += 1
+            return True
+
+    def hedge_delay(self) -> Optional[float]:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(list(self.latencies), HEDGE_PERCENTILE)
+
+    async def acquire(self, tokens: int):
+        async with self.condition:
+            while True:
+                if self.in_flight < int(self.limit):
+                    wait = await self.take_budget(tokens)
+                    if wait == 0:
+                        self.in_flight += 1
+                        return
+                    # Sleep exactly until the budget refills, or until a slot frees up
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self.condition.wait()
+
+    async def release(self, throttled: bool):
+        async with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            PROVIDER_CONCURRENCY.labels(self.model).set(self.limit)
+            self.condition.notify_all()
+
+    async def sync_headers(self, headers):
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        if self.requests and remaining_requests is not None:
+            await self.requests.sync(float(remaining_requests), parse_reset_duration(headers.get("x-ratelimit-reset-requests")))
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if self.tokens and remaining_tokens is not None:
+            await self.tokens.sync(float(remaining_tokens), parse_reset_duration(headers.get("x-ratelimit-reset-tokens")))
+
+class CircuitBreaker:
+    """Fails calls to one model fast while the provider keeps failing them."""
+
+    STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+    def __init__(self, model: str):
+        self.model = model
+        self.results = deque(maxlen=CIRCUIT_WINDOW)
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probe_started = None
+
+    def set_state(self, state: str):
+        if state != self.state:
+            logging.warning(f"{self.model} circuit {self.state} -> {state}")
+        self.state = state
+        PROVIDER_CIRCUIT_STATE.labels(self.model).set(self.STATES[state])
+
+    def check(self):
+        now = time.monotonic()
+        if self.state == "open":
+            if now - self.opened_at < CIRCUIT_COOLDOWN_SECONDS:
+                raise ProviderUnavailable(f"{self.model} is failing, retry in {CIRCUIT_COOLDOWN_SECONDS - (now - self.opened_at):.0f}s")
+            self.set_state("half_open")
+        if self.state == "half_open":
+            # One probe at a time; a probe that never reported back is replaced
+            if self.probe_started is not None and now - self.probe_started < CIRCUIT_COOLDOWN_SECONDS:
+                raise ProviderUnavailable(f"{self.model} is recovering, retry shortly")
+            self.probe_started = now
+
+    def record(self, ok: bool):
+        if self.state == "half_open":
+            self.probe_started = None
+            if ok:
+                self.results.clear()
+                self.set_state("closed")
+            else:
+                self.opened_at = time.monotonic()
+                self.set_state("open")
+            return
+        self.results.append(ok)
+        failures = self.results.count(False)
+        if len(self.results) >= CIRCUIT_MIN_CALLS and failures / len(self.results) >= CIRCUIT_FAILURE_RATE:
+            self.opened_at = time.monotonic()
+            self.set_state("open")
+
+class ProviderScheduler:
+    """Process-wide throttling, deadlines and retry for generation provider calls."""
+
+    def __init__(self, limits: Dict[str, Dict[str, float]]):
+        self.limits = limits
+        self.limiters: Dict[str, ModelLimiter] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        if model not in self.limiters:
+            config = {"rpm": 60, "tpm": 0, "concurrency": 4, **self.limits.get(model, {})}
+            self.limiters[model] = ModelLimiter(model, config["rpm"], config["tpm"], int(config["concurrency"]))
+        return self.limiters[model]
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(model)
+        return self.breakers[model]
+
+    def circuit_states(self) -> Dict[str, str]:
+        return {model: breaker.state for model, breaker in self.breakers.items()}
+
+    @staticmethod
+    def retry_reason(error: Exception) -> Optional[str]:
+        """Why an error is worth retrying, or None if it is not."""
+        openai = get_openai()
+        if isinstance(error, openai.RateLimitError):
+            # An exhausted account quota won't recover by waiting
+            return None if error.code == "insufficient_quota" else "rate_limited"
+        if isinstance(error, openai.APIStatusError):
+            return "server_error" if error.status_code >= 500 else None
+        if isinstance(error, openai.APIConnectionError):
+            return "connection"
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        return None
+
+    async def send(self, limiter: ModelLimiter, model: str, create, timeout: float, **kwargs):
+        """One request on a limiter slot that is already held, releasing it when done."""
+        throttled = False
+        started = time.monotonic()
+        try:
+            # The client timeout ends the request thread; wait_for bounds the
+            # whole call, which the client's per-read timeout does not
+            raw = await asyncio.wait_for(asyncio.to_thread(create, model=model, timeout=timeout, **kwargs), timeout)
+            await limiter.sync_headers(raw.headers)
+            limiter.latencies.append(time.monotonic() - started)
+            return raw
+        except Exception as e:
+            throttled = self.retry_reason(e) == "rate_limited"
+            raise
+        finally:
+            await limiter.release(throttled)
+
+    async def hedged(self, limiter: ModelLimiter, model: str, create, timeout: float, tokens: int, **kwargs):
+        """Send the request, and a duplicate if the first is slower than usual; first success wins."""
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.send(limiter, model, create, timeout, **kwargs))
+        delay = limiter.hedge_delay()
+        if delay is None or delay >= timeout:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not await limiter.try_acquire(tokens):
+            return await primary
+        
+        hedge = asyncio.ensure_future(self.send(limiter, model, create, timeout - (time.monotonic() - started), **kwargs))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception():
+                        PROVIDER_HEDGES.labels(model, "hedge" if task is hedge else "primary").inc()
+                        return task.result()
+            # Both failed; the primary's error is the one to retry on
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, model: str, create, tokens: int = 0, **kwargs):
+        """Run a ``with_raw_response`` provider call under the model's budget.
+
+        Each request is bounded by the model's call timeout and whatever is
+        left of the request budget. Retries 429s, 5xx responses and timeouts
+        with jittered exponential backoff, honouring Retry-After, as long as
+        the budget allows, and returns the parsed response.
+        """
+        limiter = self.limiter(model)
+        breaker = self.breaker(model)
+        for attempt in range(1, PROVIDER_MAX_ATTEMPTS + 1):
+            remaining = budget_remaining()
+            timeout = PROVIDER_CALL_TIMEOUTS.get(model, DEFAULT_CALL_TIMEOUT)
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+            if timeout <= 0:
+                raise ProviderDeadlineExceeded(f"Request budget spent before {model} could answer")
+            breaker.check()
+            
+            # Waiting for our own rate limits counts against the deadline too
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(limiter.acquire(tokens), timeout)
+            except asyncio.TimeoutError:
+                raise ProviderDeadlineExceeded(f"Request budget spent waiting for {model} capacity")
+            timeout -= time.monotonic() - started
+            
+            try:
+                if model in HEDGED_MODELS:
+                    raw = await self.hedged(limiter, model, create, timeout, tokens, **kwargs)
+                else:
+                    raw = await self.send(limiter, model, create, timeout, **kwargs)
+                breaker.record(True)
+                current = _current_span.get()
+                if current:
+                    current[1].setdefault("attrs", {})["attempts"] = attempt
+                return raw.parse()
+            except Exception as e:
+                reason = self.retry_reason(e)
+                # Only the provider failing counts against its circuit
+                breaker.record(reason in (None, "rate_limited"))
+                if reason is None or attempt == PROVIDER_MAX_ATTEMPTS:
+                    raise
+                headers = e.response.headers if isinstance(e, get_openai().APIStatusError) else {}
+                await limiter.sync_headers(headers)
+                delay = parse_reset_duration(headers.get("retry-after"))
+                if delay is None:
+                    delay = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                remaining = budget_remaining()
+                if remaining is not None and delay >= remaining:
+                    raise ProviderDeadlineExceeded(f"{model} call failed ({reason}) with no request budget left to retry: {str(e) or type(e).__name__}")
+                PROVIDER_RETRIES.labels(model, reason).inc()
+                logging.warning(f"{model} call failed ({reason}), retrying in {delay:.1f}s: {str(e)}")
+            await asyncio.sleep(delay)
+
+def load_rate_limits() -> Dict[str, Dict[str, float]]:
+    limits = {model: dict(config) for model, config in DEFAULT_RATE_LIMITS.items()}
+    for model, overrides in json.loads(os.environ.get("OPENAI_RATE_LIMITS", "{}")).items():
+        limits.setdefault(model, {}).update(overrides)
+    # rpm and tpm are the account's; the buckets are shared, so no worker is
+    # held to a fraction of them while the others sit idle. Concurrency
+    # bounds each worker's own requests in flight.
+    return limits
+
+provider_scheduler = ProviderScheduler(load_rate_limits())
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting."""
+    return sum(len(text) for text in texts) // 4 + 1
+
+# Idempotency
+IDEMPOTENCY_RETENTION = timedelta(seconds=int(os.environ.get("IDEMPOTENCY_RETENTION_SECONDS", "86400")))
+# A claim older than this belongs to a worker that died mid-operation
+IDEMPOTENCY_LOCK_TIMEOUT = timedelta(minutes=15)
+IDEMPOTENCY_POLL_SECONDS = 0.5
+# How long a result without an explicit key stays around for duplicates that
+# were waiting on it from other workers; well above the poll interval
+IDEMPOTENCY_JOIN_WINDOW = timedelta(seconds=30)
+
+# Operations this process is currently running, by idempotency key
+_in_flight: Dict[str, asyncio.Future] = {}
+
+async def single_flight(endpoint: str, params: dict, idempotency_key: Optional[str], response: Response, run) -> dict:
+    """Run ``run`` at most once per (endpoint, parameters) or explicit idempotency key.
+
+    Concurrent duplicates attach to the in-flight operation, here or on another
+    worker, and get its result. Completed results are replayed to new
+    requests only for an explicit idempotency key, until the retention window
+    expires; without one, the same request sent again later runs again.
+    Failures are not stored.
+    """
+    params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"{endpoint}:{idempotency_key or params_hash}"
+    
+    waited = False
+    while True:
+        if key in _in_flight:
+            CACHE_REQUESTS.labels("idempotency", "joined").inc()
+            response.headers["Idempotent-Replayed"] = "true"
+            return await asyncio.shield(_in_flight[key])
+        
+        existing = await db.idempotency.find_one({"key": key})
+        if existing:
+            if existing["params_hash"] != params_hash:
+                raise HTTPException(status_code=422, detail="Idempotency key was already used with different parameters")
+            now = datetime.utcnow()
+            if existing["status"] == "completed":
+                if existing["expires_at"] > now and (idempotency_key or waited):
+                    CACHE_REQUESTS.labels("idempotency", "hit").inc()
+                    response.headers["Idempotent-Replayed"] = "true"
+                    return existing["response"]
+                # A new request for a finished operation runs it again; taking
+                # the record over in place keeps late waiters attached to this run
+                claimed = await db.idempotency.update_one(
+                    {"key": key, "status": "completed", "expires_at": existing["expires_at"]},
+                    {
+                        "$set": {"status": "in_progress", "created_at": now, "expires_at": now + IDEMPOTENCY_LOCK_TIMEOUT},
+                        "$unset": {"response": ""}
+                    }
+                )
+                if claimed.modified_count:
+                    break
+                continue
+            if existing["expires_at"] > now:
+                # Another worker is running it; wait for its result
+                waited = True
+                await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+                continue
+            await db.idempotency.delete_one({"key": key, "status": "in_progress", "expires_at": existing["expires_at"]})
+        
+        try:
+            await db.idempotency.insert_one({
+                "key": key,
+                "params_hash": params_hash,
+                "status": "in_progress",
+                "created_at": datetime.utcnow(),
+                "expires_at": datetime.utcnow() + IDEMPOTENCY_LOCK_TIMEOUT
+            })
+        except DuplicateKeyError:
+            continue
+        break
+    
+    CACHE_REQUESTS.labels("idempotency", "miss").inc()
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        result = await run()
+    except BaseException as e:
+        await db.idempotency.delete_one({"key": key})
+        future.set_exception(e)
+        # Mark the exception retrieved when nobody joined
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
+    
+    # Kept briefly even without a key, so duplicates polling from other
+    # workers pick up this result instead of running the operation again
+    await db.idempotency.update_one(
+        {"key": key},
+        {"$set": {
+            "status": "completed",
+            "response": result,
+            "expires_at": datetime.utcnow() + (IDEMPOTENCY_RETENTION if idempotency_key else IDEMPOTENCY_JOIN_WINDOW)
+        }}
+    )
+    future.set_result(result)
+    return result
+
+async def forget_video_request(video_id: str):
+    """Stop replaying the /generate-video result for a render that is gone or failed."""
+    await db.idempotency.delete_many({"response.video_id": video_id})
+
 # Routes
 @api_router.post("/auth", response_model=dict)
 async def authenticate(password: str = Body(..., embed=True)):
@@ -163,9 +1228,123 @@ async def change_password(old_password: str = Body(...), new_password: str = Bod
     await db.users.update_one({"id": user["id"]}, {"$set": {"password": new_password}})
     return {"message": "Password changed successfully"}
 
+# Prompt similarity
+# Prompts are reduced to MinHash signatures over character shingles and
+# split into LSH bands stored on the story. Finding near-duplicates is one
+# indexed query on the bands, so it doesn't slow down as stories pile up.
+PROMPT_REUSE_MODE = os.environ.get("PROMPT_REUSE_MODE", "offer")  # "off", "offer" (client asks) or "auto"
+PROMPT_REUSE_THRESHOLD = float(os.environ.get("PROMPT_REUSE_THRESHOLD", "0.8"))
+SHINGLE_SIZE = 4
+# Dropped before shingling so "a robot who..." and "the robot that..." match
+PROMPT_STOPWORDS = {"a", "an", "the", "of", "to", "in", "on", "for", "its", "it", "is", "who", "that", "which", "and", "or", "with", "about", "at", "by", "from", "as"}
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 4 rows per band: prompts about 50% similar or more usually share a band
+MINHASH_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(20240601)  # fixed seed so signatures stay comparable across restarts
+MINHASH_COEFFICIENTS = [
+    (_minhash_rng.randrange(1, MINHASH_PRIME), _minhash_rng.randrange(0, MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+def prompt_shingles(prompt: str) -> set:
+    # Case, punctuation, spacing and filler words don't make prompts different
+    text = " ".join(word for word in re.findall(r"[a-z0-9]+", prompt.lower()) if word not in PROMPT_STOPWORDS)
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+@functools.lru_cache(maxsize=None)
+def minhash_coefficient_arrays():
+    """MINHASH_COEFFICIENTS as columns, with a split at bit 30 so a * h fits in 64 bits."""
+    import numpy as np
+    a = np.array([a for a, _ in MINHASH_COEFFICIENTS], dtype=np.uint64)[:, None]
+    b = np.array([b for _, b in MINHASH_COEFFICIENTS], dtype=np.uint64)[:, None]
+    return a >> np.uint64(30), a & np.uint64((1 << 30) - 1), b
+
+def minhash_signature(prompt: str) -> List[int]:
+    """(a * h + b) mod 2^61 - 1 for every permutation and shingle hash at once, min per permutation.
+    
+    a is below 2^61 and h below 2^32, so a * h is built from a's high 31 and low 30
+    bits. Shifting by 30 uses 2^61 = 1 (mod p): the bits pushed past 61 wrap to the bottom.
+    """
+    import numpy as np
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "big") for shingle in prompt_shingles(prompt)],
+        dtype=np.uint64
+    )
+    a_high, a_low, b = minhash_coefficient_arrays()
+    prime = np.uint64(MINHASH_PRIME)
+    high = a_high * hashes % prime
+    high = ((high >> np.uint64(31)) + ((high & np.uint64((1 << 31) - 1)) << np.uint64(30))) % prime
+    values = (high + a_low * hashes % prime + b) % prime
+    return values.min(axis=1).tolist()
+
+def lsh_bands(signature: List[int]) -> List[str]:
+    rows = len(signature) // LSH_BANDS
+    return [
+        f"{band}:{hashlib.blake2b(repr(signature[band * rows:(band + 1) * rows]).encode(), digest_size=8).hexdigest()}"
+        for band in range(LSH_BANDS)
+    ]
+
+def signature_similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+async def find_similar_story(prompt: str, duration: str, signature: Optional[List[int]] = None) -> Optional[dict]:
+    """The most similar earlier story of the same length above the threshold, if any."""
+    signature = signature or minhash_signature(prompt)
+    candidates = await db.stories.find(
+        {"duration": duration, "lsh_bands": {"$in": lsh_bands(signature)}},
+        {"_id": 0, "id": 1, "minhash": 1, "created_at": 1}
+    ).to_list(100)
+    
+    # Most similar first, newest on ties
+    scored = [
+        (signature_similarity(signature, candidate["minhash"]), candidate["created_at"], candidate["id"])
+        for candidate in candidates
+    ]
+    scored = [score for score in scored if score[0] >= PROMPT_REUSE_THRESHOLD]
+    if not scored:
+        CACHE_REQUESTS.labels("prompt_reuse", "miss").inc()
+        return None
+    
+    CACHE_REQUESTS.labels("prompt_reuse", "hit").inc()
+    similarity, _, story_id = max(scored)
+    story = await db.stories.find_one(
+        {"id": story_id},
+        {"_id": 0, "id": 1, "story": 1, "prompt": 1, "duration": 1, "images": 1, "style": 1, "audio_url": 1, "voice": 1}
+    )
+    return {**story, "similarity": round(similarity, 3)} if story else None
+
+@api_router.get("/similar-story")
+async def get_similar_story(prompt: str, duration: str):
+    """Offer an existing story before paying for a new one."""
+    if PROMPT_REUSE_MODE == "off":
+        return {"match": None}
+    match = await find_similar_story(prompt, duration)
+    if match:
+        match = with_delivery_urls({
+            **match,
+            "has_images": bool(match.get("images")),
+            "has_audio": bool(match.get("audio_url"))
+        })
+    return {"match": match}
+
 @api_router.post("/generate-story", response_model=StoryResponse)
 async def generate_story(request: StoryRequest):
+    trace = PipelineTrace("story", duration=request.duration)
     try:
+        signature = minhash_signature(request.prompt)
+        
+        # Near-duplicate prompts reuse the earlier story with its images and narration
+        reuse = request.reuse if request.reuse is not None else PROMPT_REUSE_MODE == "auto"
+        if reuse and PROMPT_REUSE_MODE != "off":
+            with trace.span("similar_lookup"):
+                match = await find_similar_story(request.prompt, request.duration, signature)
+            if match:
+                trace.finish()
+                return StoryResponse(**with_delivery_urls(match), reused=True)
+        
         # Determine target word count based on duration
         duration_map = {
             "30-60": (150, 300),  # 150-300 words for 30-60 seconds
@@ -176,13 +1355,18 @@ async def generate_story(request: StoryRequest):
         min_words, max_words = duration_map.get(request.duration, (150, 300))
         
         # Generate story using OpenAI
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": f"You are a creative story writer. Create a short, engaging story based on the following prompt. The story should be suitable for a short video between {request.duration} seconds. Use between {min_words} and {max_words} words. Make it captivating, with a clear beginning, middle, and end."},
-                {"role": "user", "content": request.prompt}
-            ]
-        )
+        system_prompt = f"You are a creative story writer. Create a short, engaging story based on the following prompt. The story should be suitable for a short video between {request.duration} seconds. Use between {min_words} and {max_words} words. Make it captivating, with a clear beginning, middle, and end."
+        with request_budget("story"), trace.span("provider_call", metric=CHAT_CALL_SECONDS, model="gpt-4o"):
+            response = await provider_scheduler.call(
+                "gpt-4o",
+                get_openai().chat.completions.with_raw_response.create,
+                # Budget for the prompt plus the longest story we ask for
+                tokens=estimate_tokens(system_prompt, request.prompt) + int(max_words * 1.4),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": request.prompt}
+                ]
+            )
         
         story = response.choices[0].message.content
         
@@ -195,154 +1379,530 @@ async def generate_story(request: StoryRequest):
         await db.stories.insert_one({
             "id": story_response.id,
             "story": story_response.story,
+            "prompt": request.prompt,
             "duration": story_response.duration,
+            "scenes": build_scenes(story_response.story, get_num_images(story_response.duration)),
+            "minhash": signature,
+            "lsh_bands": lsh_bands(signature),
             "created_at": datetime.utcnow()
         })
+        await save_trace(trace, "story", story_response.id)
         
         return story_response
     
     except Exception as e:
+        PIPELINE_FAILURES.labels("story").inc()
+        trace.finish(str(e))
         logging.error(f"Story generation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating story: {str(e)}")
+        raise HTTPException(status_code=e.status_code if isinstance(e, ProviderError) else 500, detail=f"Error generating story: {str(e)}")
 
 @api_router.post("/generate-images", response_model=ImageResponse)
-async def generate_images(request: ImageGenerationRequest):
+async def generate_images(request: ImageGenerationRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
+    result = await single_flight("generate-images", request.dict(), idempotency_key, response, lambda: run_image_generation(request))
+    return with_delivery_urls(result)
+
+async def run_image_generation(request: ImageGenerationRequest) -> dict:
+    trace = PipelineTrace("images", style=request.style, resume=request.resume)
     try:
         # Get story from database
         story = await get_story(request.story_id)
         
-        # Determine number of images based on duration
-        duration_range = story["duration"]
-        if duration_range == "30-60":
-            num_images = 3  # Reduced from 6 to improve performance
-        elif duration_range == "60-90":
-            num_images = 5  # Reduced from 10 to improve performance
-        else:  # 90-120
-            num_images = 7  # Reduced from 15 to improve performance
+        # Scenes are segmented once per story and shared with the renderer
+        scenes = await get_story_scenes(story)
+        num_images = len(scenes)
         
-        # Split the story into segments
-        story_text = story["story"]
-        segments = split_story_into_segments(story_text, num_images)
+        # On resume keep every image that is done and still on disk, as long
+        # as it was made for the same style and scene layout
+        states = [ImageSegmentState(index=i).dict() for i in range(num_images)]
+        previous = story.get("image_segments") or []
+        if request.resume and story.get("style") == request.style and len(previous) == num_images:
+            states = [
+                state if state["status"] == "done" and image_file_exists(state["image_url"]) else {**state, "status": "pending"}
+                for state in previous
+            ]
         
-        # Generate an image for each segment
-        image_urls = []
+        await db.stories.update_one(
+            {"id": request.story_id},
+            {"$set": {"image_segments": states, "style": request.style, "image_generation_complete": False}}
+        )
         
-        for i, segment in enumerate(segments):
-            try:
+        pending = [i for i, state in enumerate(states) if state["status"] != "done"]
+        completed = num_images - len(pending)
+        
+        async def generate(i: int) -> Optional[str]:
+            nonlocal completed
+            image_url = await generate_scene_image(request.story_id, i, scene_image_prompt(request.style, scenes[i], storyboard), trace)
+            if image_url:
                 # Update progress in database to track generation
+                completed += 1
                 await db.stories.update_one(
                     {"id": request.story_id},
-                    {"$set": {"image_generation_progress": (i / num_images) * 100}}
-                )
-                
-                # Generate prompt for DALL-E based on the segment and style
-                style_prompt = get_style_prompt(request.style)
-                
-                # Generate the image with a timeout
-                response = openai.images.generate(
-                    model="dall-e-3",
-                    prompt=f"{style_prompt} {segment}. Full HD (1920x1080) aspect ratio.",
-                    size="1792x1024",
-                    quality="hd",
-                    n=1
+                    {"$set": {"image_generation_progress": (completed / num_images) * 100}}
                 )
+            return image_url
+        
+        # Generate an image for each missing segment, keeping scene order;
+        # the storyboard and all of the images share the request's provider budget
+        with request_budget("images"):
+            storyboard = await get_storyboard(story, scenes, trace) if pending else None
+            results = await asyncio.gather(*(generate(i) for i in pending))
+        for i, image_url in zip(pending, results):
+            states[i]["image_url"] = image_url
+        
+        return await finish_image_generation(request.story_id, request.style, states, trace)
+    
+    except Exception as e:
+        await save_trace(trace, "images", request.story_id, error=str(e))
+        logging.error(f"Image generation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating images: {str(e)}")
+
+@api_router.post("/regenerate-image", response_model=ImageResponse)
+async def regenerate_image(request: ImageRegenerationRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
+    result = await single_flight("regenerate-image", request.dict(), idempotency_key, response, lambda: run_image_regeneration(request))
+    return with_delivery_urls(result)
+
+async def run_image_regeneration(request: ImageRegenerationRequest) -> dict:
+    story = await get_story(request.story_id)
+    states = story.get("image_segments")
+    if not states:
+        raise HTTPException(status_code=400, detail="Images have not been generated for this story")
+    if not 0 <= request.index < len(states):
+        raise HTTPException(status_code=400, detail=f"Image index must be between 0 and {len(states) - 1}")
+    
+    style = request.style or story.get("style")
+    trace = PipelineTrace("images", style=style, index=request.index)
+    try:
+        scenes = await get_story_scenes(story)
+        with request_budget("images"):
+            storyboard = await get_storyboard(story, scenes, trace)
+            # A regeneration asks for a different picture, so it skips the prompt cache
+            prompt = scene_image_prompt(style, scenes[request.index], storyboard)
+            image_url = await generate_scene_image(request.story_id, request.index, prompt, trace, fresh=True)
+        if not image_url:
+            # The scene keeps the picture it had; only the error is reported
+            previous = states[request.index]
+            state_field = f"image_segments.{request.index}"
+            failed = await db.stories.find_one({"id": request.story_id}, {"_id": 0, "image_segments": 1})
+            await db.stories.update_one(
+                {"id": request.story_id},
+                {"$set": {f"{state_field}.status": previous.get("status", "done"), f"{state_field}.image_url": previous.get("image_url")}}
+            )
+            raise Exception(failed["image_segments"][request.index].get("error") or "image generation failed")
+        states[request.index]["image_url"] = image_url
+        return await finish_image_generation(request.story_id, style, states, trace)
+    
+    except Exception as e:
+        await save_trace(trace, "images", request.story_id, error=str(e))
+        logging.error(f"Image regeneration error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error regenerating image: {str(e)}")
+
+IMAGE_SIZE = "1792x1024"
+IMAGE_QUALITY = "hd"
+
+def download_to_storage(source_url: str, media_url: str) -> dict:
+    """Stream a remote image into media storage without holding it in memory.
+
+    Returns its catalog metadata, collected from the chunks on the way through.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    
+    def chunks(response):
+        nonlocal size, head
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            digest.update(chunk)
+            size += len(chunk)
+            if len(head) < 64 * 1024:
+                head += chunk[:64 * 1024 - len(head)]
+            yield chunk
+    
+    with requests.get(source_url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        storage.save_stream(media_url, chunks(response), media_content_type(media_url))
+    return {"sha256": digest.hexdigest(), "size": size, **image_header_metadata(head)}
+
+async def generate_scene_image(story_id: str, index: int, prompt: str, trace: PipelineTrace, fresh: bool = False) -> Optional[str]:
+    """Generate, download and save the image for one scene, tracking its state on the story.
+
+    An image already generated from the exact same prompt is reused unless
+    ``fresh`` asks for a new one.
+    """
+    state_field = f"image_segments.{index}"
+    await db.stories.update_one(
+        {"id": story_id},
+        {
+            "$set": {f"{state_field}.status": "generating", f"{state_field}.updated_at": datetime.utcnow()},
+            "$inc": {f"{state_field}.attempts": 1}
+        }
+    )
+    
+    try:
+        with trace.span("image", index=index):
+            prompt_hash = hashlib.sha256(f"{IMAGE_SIZE}|{IMAGE_QUALITY}|{prompt}".encode()).hexdigest()
+            cached = None if fresh else await db.media.find_one({"prompt_hash": prompt_hash}, {"_id": 0, "url": 1})
+            if cached and await asyncio.to_thread(storage.exists, cached["url"]):
+                CACHE_REQUESTS.labels("image_prompt", "hit").inc()
+                local_url = cached["url"]
+                await catalog_media(local_url, "image", {}, story_id=story_id)
+            else:
+                CACHE_REQUESTS.labels("image_prompt", "miss").inc()
+                # The scheduler paces these against the dall-e-3 budget
+                with trace.span("provider_call", metric=IMAGE_CALL_SECONDS, model="dall-e-3"):
+                    response = await provider_scheduler.call(
+                        "dall-e-3",
+                        get_openai().images.with_raw_response.generate,
+                        prompt=prompt,
+                        size=IMAGE_SIZE,
+                        quality=IMAGE_QUALITY,
+                        n=1
+                    )
                 
                 # Get the image URL from the response
                 image_url = response.data[0].url
                 
-                # Download the image and save locally
-                image_response = requests.get(image_url, timeout=30)
-                image_response.raise_for_status()
-                
-                image_filename = f"{request.story_id}_{i}.png"
-                image_path = IMAGES_DIR / image_filename
-                
-                with open(image_path, "wb") as f:
-                    f.write(image_response.content)
-                
-                # Add the local path to the list of image URLs
-                image_urls.append(f"/api/media/images/{image_filename}")
-                
-                # Add a small delay to avoid rate limiting
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logging.error(f"Error generating image {i}: {str(e)}")
-                # If we have an error with one image, continue with the rest
-                continue
-        
-        # If we have at least one image, consider it a success
-        if not image_urls:
-            raise Exception("Failed to generate any images")
-        
-        # Update the story in the database with the image URLs
+                # Stream the image from the provider into media storage. Names are
+                # never reused, since other stories may share the file via the cache
+                local_url = f"/api/media/images/{story_id}_{index}_{uuid.uuid4().hex[:12]}.png"
+                with trace.span("download", metric=IMAGE_DOWNLOAD_SECONDS):
+                    metadata = await asyncio.to_thread(download_to_storage, image_url, local_url)
+                await catalog_media(local_url, "image", {**metadata, "prompt_hash": prompt_hash}, story_id=story_id)
+
         await db.stories.update_one(
-            {"id": request.story_id},
-            {"$set": {"images": image_urls, "style": request.style, "image_generation_complete": True}}
+            {"id": story_id},
+            {"$set": {
+                f"{state_field}.status": "done",
+                f"{state_field}.image_url": local_url,
+                f"{state_field}.error": None,
+                f"{state_field}.updated_at": datetime.utcnow()
+            }}
         )
-        
-        return ImageResponse(image_urls=image_urls, story_id=request.story_id)
+        return local_url
     
     except Exception as e:
-        logging.error(f"Image generation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating images: {str(e)}")
+        PIPELINE_FAILURES.labels("image").inc()
+        logging.error(f"Error generating image {index}: {str(e)}")
+        await db.stories.update_one(
+            {"id": story_id},
+            {"$set": {
+                f"{state_field}.status": "failed",
+                f"{state_field}.error": str(e),
+                f"{state_field}.updated_at": datetime.utcnow()
+            }}
+        )
+        # If we have an error with one image, continue with the rest
+        return None
+
+async def finish_image_generation(story_id: str, style: str, states: List[dict], trace: PipelineTrace) -> dict:
+    """Publish the finished images on the story and report which scenes are still missing."""
+    image_urls = [state["image_url"] for state in states if state.get("image_url")]
+    failed_indices = [state["index"] for state in states if not state.get("image_url")]
+    
+    # If we have at least one image, consider it a success
+    if not image_urls:
+        raise Exception("Failed to generate any images")
+    
+    # Update the story in the database with the image URLs
+    await db.stories.update_one(
+        {"id": story_id},
+        {"$set": {"images": image_urls, "style": style, "image_generation_complete": True}}
+    )
+    await save_trace(trace, "images", story_id)
+    
+    return ImageResponse(image_urls=image_urls, story_id=story_id, failed_indices=failed_indices).dict()
 
 @api_router.post("/generate-voice", response_model=dict)
-async def generate_voice(request: VoiceGenerationRequest):
+async def generate_voice(request: VoiceGenerationRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
+    result = await single_flight("generate-voice", request.dict(), idempotency_key, response, lambda: run_voice_generation(request))
+    return with_delivery_urls(result)
+
+async def run_voice_generation(request: VoiceGenerationRequest) -> dict:
+    trace = PipelineTrace("voice", voice=request.voice)
     try:
         # Get story from database
         story = await get_story(request.story_id)
         
         # Generate audio using OpenAI TTS
-        response = openai.audio.speech.create(
-            model="tts-1-hd",
-            voice=request.voice,
-            input=story["story"]
-        )
-        
-        # Save the audio file
-        audio_filename = f"{request.story_id}.mp3"
-        audio_path = AUDIO_DIR / audio_filename
+        with request_budget("voice"), trace.span("provider_call", metric=SPEECH_CALL_SECONDS, model="tts-1-hd"):
+            response = await provider_scheduler.call(
+                "tts-1-hd",
+                get_openai().audio.speech.with_raw_response.create,
+                voice=request.voice,
+                input=story["story"]
+            )
         
-        with open(audio_path, "wb") as f:
-            f.write(response.content)
+        # Save the audio file, probing it once for the catalog on the way. Every
+        # narration gets a new name, so caches never serve a previous voice;
+        # the one it replaces is swept as an orphan
+        audio_url = f"/api/media/audio/{request.story_id}_{uuid.uuid4().hex[:12]}.mp3"
+        metadata = {"sha256": hashlib.sha256(response.content).hexdigest(), "size": len(response.content)}
+        with trace.span("save"):
+            with tempfile.TemporaryDirectory(dir=MEDIA_DIR) as temp_dir:
+                audio_path = Path(temp_dir) / "speech.mp3"
+                audio_path.write_bytes(response.content)
+                try:
+                    with trace.span("probe", metric=PROBE_SECONDS):
+                        metadata.update(await asyncio.to_thread(probe_media, audio_path))
+                except Exception as e:
+                    # The renderer probes and catalogs it instead
+                    logging.warning(f"Could not probe narration for {request.story_id}: {str(e)}")
+                await asyncio.to_thread(storage.save_file, audio_url, audio_path, "audio/mpeg")
+        await catalog_media(audio_url, "audio", metadata, story_id=request.story_id)
         
         # Update the story in the database with the audio URL
-        audio_url = f"/api/media/audio/{audio_filename}"
         await db.stories.update_one(
             {"id": request.story_id},
             {"$set": {"audio_url": audio_url, "voice": request.voice}}
         )
+        await save_trace(trace, "voice", request.story_id)
         
         return {"audio_url": audio_url, "story_id": request.story_id}
     
     except Exception as e:
+        PIPELINE_FAILURES.labels("voice").inc()
+        await save_trace(trace, "voice", request.story_id, error=str(e))
         logging.error(f"Voice generation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating voice: {str(e)}")
+        raise HTTPException(status_code=e.status_code if isinstance(e, ProviderError) else 500, detail=f"Error generating voice: {str(e)}")
+
+# Uploads
+# User-supplied stills and narration replace the DALL-E and TTS stages.
+# Uploads are named by content hash, so the same file is stored once.
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+# Room in the request body for multipart boundaries, headers and story_id
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_IMAGE_FORMATS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}
+UPLOAD_AUDIO_SUFFIXES = {".mp3", ".m4a", ".wav"}
+
+async def read_upload_form(request: Request):
+    """Parse a multipart upload request, cutting it off once the body passes the upload limit.
+
+    The body is parsed from the request stream as it arrives, so an
+    oversized upload is refused at the limit rather than after it has been
+    received and spooled to disk in full.
+    """
+    from starlette.formparsers import MultiPartParser
+    
+    limit = MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+    too_large = HTTPException(status_code=413, detail=f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes per request")
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise too_large
+    
+    async def limited_stream():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise too_large
+            yield chunk
+    
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Uploads must be sent as multipart/form-data")
+    return await MultiPartParser(request.headers, limited_stream()).parse()
+
+def upload_fields(form, files_field: str) -> tuple:
+    """story_id and the uploaded files of an upload form."""
+    story_id = form.get("story_id")
+    files = [item for item in form.getlist(files_field) if not isinstance(item, str)]
+    if not story_id or not isinstance(story_id, str):
+        raise HTTPException(status_code=400, detail="story_id is required")
+    if not files:
+        raise HTTPException(status_code=400, detail=f"At least one file is required in {files_field}")
+    return story_id, files
+
+def receive_upload(upload: UploadFile, directory: Path) -> tuple:
+    """Copy an upload to disk chunk by chunk, hashing it on the way.
+
+    Returns the file's path and its catalog metadata.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    path = directory / uuid.uuid4().hex
+    with open(path, "wb") as f:
+        while chunk := upload.file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"{upload.filename} is larger than {MAX_UPLOAD_BYTES} bytes")
+            digest.update(chunk)
+            f.write(chunk)
+    if not size:
+        raise HTTPException(status_code=400, detail=f"{upload.filename} is empty")
+    return path, {"sha256": digest.hexdigest(), "size": size}
+
+def probe_image(path: Path, filename: str) -> tuple:
+    """File suffix and dimensions of a supported still image, rejecting anything else."""
+    from PIL import Image
+    
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+            metadata = {"width": image.width, "height": image.height, "codec": image_format.lower()}
+            image.verify()
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"{filename} is not a readable image")
+    if image_format not in UPLOAD_IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"{filename} must be one of {', '.join(UPLOAD_IMAGE_FORMATS)}")
+    return UPLOAD_IMAGE_FORMATS[image_format], metadata
+
+def probe_audio(path: Path, filename: str) -> dict:
+    """Catalog metadata of an uploaded narration track, rejecting files without audio."""
+    try:
+        metadata = probe_media(path)
+    except Exception:
+        metadata = {}
+    if "codec" not in metadata or "width" in metadata:
+        raise HTTPException(status_code=400, detail=f"{filename} is not a readable audio file")
+    return metadata
+
+def store_upload(path: Path, media_url: str):
+    """Move a received upload into storage unless identical content is already there."""
+    if storage.exists(media_url):
+        path.unlink(missing_ok=True)
+    else:
+        storage.save_file(media_url, path, media_content_type(media_url))
+
+@api_router.post("/upload-images", response_model=ImageResponse)
+async def upload_images(request: Request):
+    """Upload stills as multipart ``story_id`` and one or more ``files``."""
+    form = await read_upload_form(request)
+    try:
+        story_id, files = upload_fields(form, "files")
+        return await save_image_uploads(story_id, files)
+    finally:
+        await form.close()
+
+async def save_image_uploads(story_id: str, files: List[UploadFile]) -> dict:
+    story = await get_story(story_id)
+    # Every image needs a scene of its own, and a scene at least one word
+    max_images = len(story["story"].split())
+    if len(files) > max_images:
+        raise HTTPException(status_code=400, detail=f"This story has narration for at most {max_images} images")
+    
+    try:
+        # Staged next to the media directories so local storage moves are renames
+        with tempfile.TemporaryDirectory(dir=MEDIA_DIR) as temp_dir:
+            image_urls = []
+            for upload in files:
+                path, metadata = await asyncio.to_thread(receive_upload, upload, Path(temp_dir))
+                suffix, dimensions = await asyncio.to_thread(probe_image, path, upload.filename)
+                image_url = f"/api/media/images/upload_{metadata['sha256']}{suffix}"
+                await asyncio.to_thread(store_upload, path, image_url)
+                await catalog_media(image_url, "image", {**metadata, **dimensions}, story_id=story_id)
+                image_urls.append(image_url)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        PIPELINE_FAILURES.labels("upload").inc()
+        logging.error(f"Image upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error uploading images: {str(e)}")
+    
+    # One scene per uploaded image, in upload order
+    scenes = story.get("scenes")
+    if not scenes or len(scenes) != len(image_urls):
+        scenes = build_scenes(story["story"], len(image_urls))
+    states = [
+        ImageSegmentState(index=i, status="done", image_url=image_url).dict()
+        for i, image_url in enumerate(image_urls)
+    ]
+    await db.stories.update_one(
+        {"id": story_id},
+        {"$set": {
+            "scenes": scenes,
+            "image_segments": states,
+            "images": image_urls,
+            "style": "uploaded",
+            "image_generation_complete": True,
+            "image_generation_progress": 100
+        }}
+    )
+    
+    return with_delivery_urls(ImageResponse(image_urls=image_urls, story_id=story_id).dict())
+
+@api_router.post("/upload-audio", response_model=dict)
+async def upload_audio(request: Request):
+    """Upload a narration track as multipart ``story_id`` and ``file``."""
+    form = await read_upload_form(request)
+    try:
+        story_id, (file, *_) = upload_fields(form, "file")
+        return await save_audio_upload(story_id, file)
+    finally:
+        await form.close()
+
+async def save_audio_upload(story_id: str, file: UploadFile) -> dict:
+    await get_story(story_id)
+    
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in UPLOAD_AUDIO_SUFFIXES:
+        raise HTTPException(status_code=400, detail=f"Narration must be one of {', '.join(sorted(UPLOAD_AUDIO_SUFFIXES))}")
+    
+    try:
+        with tempfile.TemporaryDirectory(dir=MEDIA_DIR) as temp_dir:
+            path, metadata = await asyncio.to_thread(receive_upload, file, Path(temp_dir))
+            # Probed once here; the renderer reads the duration from the catalog
+            metadata.update(await asyncio.to_thread(probe_audio, path, file.filename))
+            audio_url = f"/api/media/audio/upload_{metadata['sha256']}{suffix}"
+            await asyncio.to_thread(store_upload, path, audio_url)
+            await catalog_media(audio_url, "audio", metadata, story_id=story_id)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        PIPELINE_FAILURES.labels("upload").inc()
+        logging.error(f"Audio upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error uploading audio: {str(e)}")
+    
+    await db.stories.update_one(
+        {"id": story_id},
+        {"$set": {"audio_url": audio_url, "voice": "uploaded"}}
+    )
+    
+    return with_delivery_urls({"audio_url": audio_url, "story_id": story_id, "duration": metadata["duration"]})
 
 @api_router.post("/generate-video", response_model=dict)
-async def generate_video(request: VideoGenerationRequest, background_tasks: BackgroundTasks):
+async def generate_video(request: VideoGenerationRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
+    return await single_flight("generate-video", request.dict(), idempotency_key, response, lambda: start_video_generation(request))
+
+async def start_video_generation(request: VideoGenerationRequest) -> dict:
     try:
         # Get story from database
         story = await get_story(request.story_id)
         
+        # Media evicted to stay under the quota has to be generated again first
+        evicted = " (media was evicted to stay under the quota; generate it again)" if story.get("media_evicted_at") else ""
         if "images" not in story or not story["images"]:
-            raise HTTPException(status_code=400, detail="No images available for this story")
+            raise HTTPException(status_code=400, detail=f"No images available for this story{evicted}")
         
         if "audio_url" not in story or not story["audio_url"]:
-            raise HTTPException(status_code=400, detail="No audio available for this story")
+            raise HTTPException(status_code=400, detail=f"No audio available for this story{evicted}")
+        
+        unknown_formats = [aspect_ratio for aspect_ratio in request.formats if aspect_ratio not in OUTPUT_FORMATS]
+        if unknown_formats or not request.formats:
+            raise HTTPException(status_code=400, detail=f"Formats must be chosen from {', '.join(OUTPUT_FORMATS)}")
+        
+        if request.priority not in RENDER_PRIORITIES:
+            raise HTTPException(status_code=400, detail=f"Priority must be one of {', '.join(RENDER_PRIORITIES)}")
         
         # Create a unique ID for the video
         video_id = str(uuid.uuid4())
         
-        # Generate the video asynchronously
-        background_tasks.add_task(
-            create_video, 
-            story, 
-            request.subtitle_customization, 
-            video_id,
-            request.voice_id
-        )
+        # Queue the render; any worker with a free render slot picks it up
+        await db.video_processing.insert_one({
+            "video_id": video_id,
+            "story_id": request.story_id,
+            "status": "queued",
+            "progress": 0,
+            "subtitle_customization": request.subtitle_customization.dict(),
+            "voice_id": request.voice_id,
+            "formats": list(dict.fromkeys(request.formats)),
+            "burn_subtitles": request.burn_subtitles,
+            "lane": request.priority,
+            "priority": RENDER_PRIORITIES[request.priority],
+            "attempts": 0,
+            "queued_at": datetime.utcnow(),
+            "watched_at": datetime.utcnow()
+        })
+        render_worker.notify()
         
         return {
             "message": "Video generation started", 
@@ -350,86 +1910,213 @@ async def generate_video(request: VideoGenerationRequest, background_tasks: Back
             "story_id": request.story_id
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Video generation request error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error starting video generation: {str(e)}")
 
-@api_router.get("/videos", response_model=List[dict])
-async def get_videos():
-    videos = await db.videos.find().sort("created_at", -1).to_list(100)
-    for video in videos:
-        video["id"] = video["id"]  # Ensure ID is included
-        if "_id" in video:
-            del video["_id"]  # Remove MongoDB's _id
-    return videos
+@api_router.get("/videos", response_model=List[VideoDocument], response_model_exclude_unset=True)
+async def get_videos(fields: Optional[str] = None):
+    videos = await db.videos.find({}, field_projection(fields)).sort("created_at", -1).to_list(100)
+    return [with_delivery_urls(video) for video in videos]
 
-@api_router.get("/video/{video_id}")
-async def get_video_details(video_id: str):
-    video = await get_video(video_id)
-    if "_id" in video:
-        del video["_id"]
-    return video
+@api_router.get("/video/{video_id}", response_model=VideoDocument, response_model_exclude_unset=True)
+async def get_video_details(video_id: str, fields: Optional[str] = None):
+    return with_delivery_urls(await get_video(video_id, field_projection(fields)))
 
 @api_router.delete("/video/{video_id}")
 async def delete_video(video_id: str):
     video = await get_video(video_id)
     
-    # Delete the video file
-    video_path = VIDEOS_DIR / f"{video_id}.mp4"
-    if video_path.exists():
-        video_path.unlink()
+    # Delete the video files, one per rendered aspect ratio
+    for video_url in video_urls(video):
+        await asyncio.to_thread(storage.delete, video_url)
+    await db.media.delete_many({"url": {"$in": list(video_urls(video))}})
+    
+    # Delete from database
+    await db.videos.delete_one({"id": video_id})
+    await forget_video_request(video_id)
+    
+    return {"message": "Video deleted successfully"}
+
+@api_router.post("/video/{video_id}/cancel")
+async def cancel_video(video_id: str):
+    # Renders nobody is working on are dropped straight away: queued or
+    # failed ones, and running ones whose worker stopped heartbeating
+    removed = await db.video_processing.delete_one({"video_id": video_id, "$or": [
+        {"status": {"$in": ["queued", "failed"]}},
+        {"status": "rendering", "heartbeat_at": {"$lt": datetime.utcnow() - RENDER_CLAIM_TIMEOUT}}
+    ]})
+    if removed.deleted_count:
+        # Asking for the same render again after a cancel starts a new one
+        await forget_video_request(video_id)
+        return {"message": "Render cancelled", "video_id": video_id, "status": "cancelled"}
+    
+    # A running render is stopped by the worker that claimed it, which kills
+    # ffmpeg, removes its temp files and then the processing entry
+    job = await db.video_processing.find_one_and_update(
+        {"video_id": video_id, "status": "rendering"},
+        {"$set": {"cancel_requested": True}}
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="No pending render for this video")
+    await forget_video_request(video_id)
+    render_worker.cancel(video_id)
+    
+    return {"message": "Render cancelling", "video_id": video_id, "status": "cancelling"}
+
+@api_router.get("/video/{video_id}/subtitles.vtt")
+async def get_video_subtitles(video_id: str):
+    video = await get_video(video_id, {"_id": 0, "subtitles": 1})
+    subtitles = video.get("subtitles")
+    if not subtitles:
+        raise HTTPException(status_code=404, detail="This video has no subtitle track")
+    return Response(
+        content=cues_to_webvtt(subtitles["cues"], subtitles["customization"]),
+        media_type="text/vtt",
+        # Edits take effect on the next load
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@api_router.put("/video/{video_id}/subtitles")
+async def update_video_subtitles(video_id: str, update: SubtitleUpdate):
+    """Change soft subtitle text, timing or style; the video itself is left alone."""
+    video = await get_video(video_id, {"_id": 0, "subtitles": 1})
+    subtitles = video.get("subtitles")
+    if not subtitles:
+        raise HTTPException(status_code=404, detail="This video has no subtitle track")
+    if subtitles["mode"] == "burned":
+        raise HTTPException(status_code=409, detail="Subtitles are burned into this video; render it again to change them")
+    
+    changes = {}
+    if update.cues is not None:
+        if any(cue.end <= cue.start for cue in update.cues):
+            raise HTTPException(status_code=400, detail="Every cue must end after it starts")
+        changes["subtitles.cues"] = [cue.dict() for cue in sorted(update.cues, key=lambda cue: cue.start)]
+    if update.customization is not None:
+        changes["subtitles.customization"] = update.customization.dict()
+    if changes:
+        changes["subtitles.updated_at"] = datetime.utcnow()
+        await db.videos.update_one({"id": video_id}, {"$set": changes})
+    
+    return (await get_video(video_id, {"_id": 0, "subtitles": 1}))["subtitles"]
+
+@api_router.get("/story/{story_id}", response_model=StoryDocument, response_model_exclude_unset=True)
+async def get_story_details(story_id: str, fields: Optional[str] = None):
+    return with_delivery_urls(await get_story(story_id, field_projection(fields)))
+
+SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_EXCERPT_CHARS = 200
+
+@api_router.get("/search")
+async def search(
+    q: Optional[str] = None,
+    duration: Optional[str] = None,
+    style: Optional[str] = None,
+    voice: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20
+):
+    """Stories matching the keywords in q, best matches first, with their videos.
+
+    Keywords are looked up in the stories text index (prompt weighted above
+    the story text). Without q, matching stories are listed newest first.
+    """
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), SEARCH_MAX_PAGE_SIZE)
+    
+    query = {field: value for field, value in (("duration", duration), ("style", style), ("voice", voice)) if value}
+    projection = {
+        "_id": 0, "id": 1, "prompt": 1, "duration": 1, "style": 1, "voice": 1, "created_at": 1,
+        "excerpt": {"$substrCP": ["$story", 0, SEARCH_EXCERPT_CHARS]}
+    }
+    if q and q.strip():
+        query["$text"] = {"$search": q}
+        projection["score"] = {"$meta": "textScore"}
+        sort = {"score": {"$meta": "textScore"}, "created_at": -1}
+    else:
+        sort = {"created_at": -1}
     
-    # Delete from database
-    await db.videos.delete_one({"id": video_id})
+    try:
+        total = await db.stories.count_documents(query)
+        stories = await db.stories.aggregate([
+            {"$match": query},
+            {"$sort": sort},
+            {"$skip": (page - 1) * page_size},
+            {"$limit": page_size},
+            {"$project": projection}
+        ]).to_list(page_size)
+        
+        # Videos for the page of stories, through the videos.story_id index
+        videos = await db.videos.find(
+            {"story_id": {"$in": [story["id"] for story in stories]}},
+            {"_id": 0, "id": 1, "story_id": 1, "title": 1, "duration": 1, "video_url": 1, "outputs": 1, "thumbnail_url": 1, "subtitles.mode": 1, "created_at": 1}
+        ).sort("created_at", -1).to_list(None)
+    except Exception as e:
+        logging.error(f"Search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
     
-    return {"message": "Video deleted successfully"}
+    videos_by_story = {}
+    for video in videos:
+        videos_by_story.setdefault(video["story_id"], []).append(with_delivery_urls(video))
+    for story in stories:
+        story["videos"] = videos_by_story.get(story["id"], [])
+    
+    return {"results": stories, "total": total, "page": page, "page_size": page_size}
 
-@api_router.get("/story/{story_id}")
-async def get_story_details(story_id: str):
-    story = await get_story(story_id)
-    if "_id" in story:
-        del story["_id"]
-    return story
+# nginx serves local media directly; these routes cover direct access to the
+# API and redirect to the storage backend when media lives in a bucket
+async def media_response(media_url: str, not_found: str):
+    if isinstance(storage, LocalMediaStorage):
+        path = storage.path(media_url)
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=not_found)
+        return FileResponse(path)
+    return RedirectResponse(await asyncio.to_thread(storage.url, media_url))
 
 @api_router.get("/media/images/{filename}")
 async def get_image(filename: str):
-    image_path = IMAGES_DIR / filename
-    if not image_path.exists():
-        raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(image_path)
+    return await media_response(f"/api/media/images/{filename}", "Image not found")
 
 @api_router.get("/media/audio/{filename}")
 async def get_audio(filename: str):
-    audio_path = AUDIO_DIR / filename
-    if not audio_path.exists():
-        raise HTTPException(status_code=404, detail="Audio not found")
-    return FileResponse(audio_path)
+    return await media_response(f"/api/media/audio/{filename}", "Audio not found")
 
 @api_router.get("/media/videos/{filename}")
-async def get_video(filename: str):
-    video_path = VIDEOS_DIR / filename
-    if not video_path.exists():
-        raise HTTPException(status_code=404, detail="Video not found")
-    return FileResponse(video_path)
+async def get_video_file(filename: str):
+    return await media_response(f"/api/media/videos/{filename}", "Video not found")
 
 @api_router.get("/video-status/{video_id}")
 async def get_video_status(video_id: str):
     video = await db.videos.find_one({"id": video_id})
     if not video:
-        # Check if it's still processing
-        processing = await db.video_processing.find_one({"video_id": video_id})
+        # Check if it's still processing; polling marks the render as watched
+        processing = await db.video_processing.find_one_and_update(
+            {"video_id": video_id},
+            {"$set": {"watched_at": datetime.utcnow()}}
+        )
         if processing:
-            return {"status": "processing", "progress": processing.get("progress", 0)}
+            # An interactive render that was demoted while nobody watched gets its lane back
+            if processing.get("status") == "queued" and processing.get("priority") != RENDER_PRIORITIES.get(processing.get("lane")):
+                await db.video_processing.update_one(
+                    {"video_id": video_id, "status": "queued"},
+                    {"$set": {"priority": RENDER_PRIORITIES.get(processing.get("lane"), 0)}}
+                )
+                render_worker.notify()
+            # "processing" covers queued renders too; stage tells them apart
+            stage = "cancelling" if processing.get("cancel_requested") else processing.get("status", "rendering")
+            return {"status": "processing", "stage": stage, "progress": processing.get("progress", 0)}
         else:
             return {"status": "not_found"}
     
-    return {"status": "completed", "video_url": video["video_url"]}
+    return {"status": "completed", "video_url": delivery_url(video["video_url"])}
 
 @api_router.post("/publish-video")
 async def publish_video(request: PublishRequest):
-    # This would handle the actual publishing to TikTok or YouTube
-    # For the MVP, we'll just log the request and simulate a response
-    
+    # The publish scheduler uploads the video once publish_date arrives
+    if not PUBLISH_UPLOAD_URLS.get(request.platform):
+        raise HTTPException(status_code=400, detail=f"Publishing to {request.platform} is not configured")
     video = await get_video(request.video_id)
     
     # Save the publish schedule to the database
@@ -446,19 +2133,16 @@ async def publish_video(request: PublishRequest):
     }
     
     await db.publish_schedule.insert_one(publish_entry)
+    publish_scheduler.notify(publish_entry)
     
     return {
         "message": f"Video scheduled for publishing on {request.platform}",
         "publish_id": publish_entry["id"]
     }
 
-@api_router.get("/publish-schedule", response_model=List[dict])
-async def get_publish_schedule():
-    schedule = await db.publish_schedule.find().sort("publish_date", 1).to_list(100)
-    for entry in schedule:
-        if "_id" in entry:
-            del entry["_id"]
-    return schedule
+@api_router.get("/publish-schedule", response_model=List[PublishEntry], response_model_exclude_unset=True)
+async def get_publish_schedule(fields: Optional[str] = None):
+    return await db.publish_schedule.find({}, field_projection(fields)).sort("publish_date", 1).to_list(100)
 
 @api_router.post("/settings", response_model=Settings)
 async def update_settings(settings: Settings = Body(...)):
@@ -487,39 +2171,148 @@ async def get_settings():
     
     return Settings(**settings)
 
-# Utility functions
-def split_story_into_segments(story: str, num_segments: int) -> List[str]:
-    """Split a story into roughly equal segments for image generation."""
-    # Split into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', story)
+@api_router.get("/debug/timings")
+async def get_timing_summary(last: int = 100, kind: Optional[str] = None):
+    """Per-stage latency percentiles over the last N pipeline runs, slowest first."""
+    query = {"kind": kind} if kind else {}
+    jobs = await db.job_timings.find(query, {"stages": 1, "total_ms": 1}).sort("created_at", -1).to_list(last)
     
-    # Group sentences into segments
-    segments = []
-    segment_size = max(1, len(sentences) // num_segments)
+    samples = {}
+    for job in jobs:
+        for stage, duration_ms in job["stages"].items():
+            samples.setdefault(stage, []).append(duration_ms)
+    
+    stages = [
+        {
+            "stage": stage,
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": max(values)
+        }
+        for stage, values in samples.items()
+    ]
+    stages.sort(key=lambda stage: stage["p95_ms"], reverse=True)
     
-    for i in range(0, len(sentences), segment_size):
-        segment = " ".join(sentences[i:i + segment_size])
-        segments.append(segment)
+    totals = [job["total_ms"] for job in jobs]
+    return {
+        "jobs": len(jobs),
+        "total": {"p50_ms": percentile(totals, 50), "p95_ms": percentile(totals, 95), "p99_ms": percentile(totals, 99)},
+        "stages": stages
+    }
+
+@api_router.get("/debug/timings/{story_id}")
+async def get_story_timings(story_id: str):
+    """Span trees for every pipeline run of a story and its videos."""
+    story = await get_story(story_id)
+    videos = await db.videos.find({"story_id": story_id}, {"_id": 0, "id": 1, "timings": 1}).to_list(100)
+    failed = await db.video_processing.find({"story_id": story_id}, {"_id": 0, "video_id": 1, "timings": 1}).to_list(100)
+    return {
+        "story_id": story_id,
+        "stages": story.get("timings", {}),
+        "videos": videos,
+        "failed_renders": failed
+    }
+
+@api_router.get("/metrics")
+async def get_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Aggregate every worker's samples, not just this process's
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# Utility functions
+def get_num_images(duration_range: str) -> int:
+    """Number of scenes to illustrate for a duration bucket."""
+    if duration_range == "30-60":
+        return 3  # Reduced from 6 to improve performance
+    elif duration_range == "60-90":
+        return 5  # Reduced from 10 to improve performance
+    else:  # 90-120
+        return 7  # Reduced from 15 to improve performance
+
+def image_file_exists(image_url: Optional[str]) -> bool:
+    return bool(image_url) and storage.exists(image_url)
+
+# Narration pace used to weight scenes, roughly what tts-1-hd produces
+WORDS_PER_SECOND = 2.5
+CLAUSE_PAUSE_SECONDS = 0.25
+SENTENCE_PAUSE_SECONDS = 0.5
+
+def estimate_speech_seconds(text: str) -> float:
+    """Estimate how long a piece of text takes to narrate."""
+    words = len(text.split())
+    clauses = len(re.findall(r"[,;:]", text))
+    sentences = len(re.findall(r"[.!?]+", text))
+    return words / WORDS_PER_SECOND + clauses * CLAUSE_PAUSE_SECONDS + sentences * SENTENCE_PAUSE_SECONDS
+
+def split_story_into_segments(story: str, num_segments: int) -> List[str]:
+    """Split a story into segments of similar speaking time for image generation.
+
+    Cuts only between sentences, falling back to clauses and then words when
+    the story has fewer sentences than segments, so no word is ever split.
+    A story with fewer words than segments gets one segment per word, never
+    an empty one. Runs in linear time over the story.
+    """
+    units = re.split(r'(?<=[.!?])\s+', story.strip())
+    if len(units) < num_segments:
+        units = re.split(r'(?<=[,;:.!?])\s+', story.strip())
+    if len(units) < num_segments:
+        units = story.split()
+    units = [unit for unit in units if unit]
+    if len(units) <= num_segments:
+        return units
     
-    # Ensure we don't have too many segments
-    while len(segments) > num_segments:
-        # Merge the last two segments
-        segments[-2] = segments[-2] + " " + segments[-1]
-        segments.pop()
+    weights = [estimate_speech_seconds(unit) for unit in units]
+    total = sum(weights)
     
-    # If we have too few segments, duplicate some
-    while len(segments) < num_segments:
-        # Find the longest segment and split it
-        longest_idx = max(range(len(segments)), key=lambda i: len(segments[i]))
-        longest = segments[longest_idx]
-        
-        # Split the segment approximately in half
-        half = len(longest) // 2
-        segments[longest_idx] = longest[:half]
-        segments.insert(longest_idx + 1, longest[half:])
+    # Walk the units once, cutting at the boundary closest to each ideal
+    # cumulative weight while leaving at least one unit per remaining segment
+    segments = []
+    start = 0
+    cumulative = 0.0
+    i = 0
+    for k in range(1, num_segments):
+        target = total * k / num_segments
+        latest = len(units) - (num_segments - k)
+        while i < latest and cumulative + weights[i] <= target:
+            cumulative += weights[i]
+            i += 1
+        # Take the straddling unit too if that lands closer to the target
+        if i < latest and (cumulative + weights[i] - target) < (target - cumulative):
+            cumulative += weights[i]
+            i += 1
+        if i == start:
+            cumulative += weights[i]
+            i += 1
+        segments.append(" ".join(units[start:i]))
+        start = i
+    segments.append(" ".join(units[start:]))
     
     return segments
 
+def build_scenes(story: str, num_scenes: int) -> List[dict]:
+    """Canonical scene list for a story: narration text and its share of the runtime."""
+    segments = split_story_into_segments(story, num_scenes)
+    weights = [estimate_speech_seconds(segment) for segment in segments]
+    total = sum(weights) or 1.0
+    return [
+        {"index": i, "text": segment, "weight": round(weight / total, 6)}
+        for i, (segment, weight) in enumerate(zip(segments, weights))
+    ]
+
+async def get_story_scenes(story: dict) -> List[dict]:
+    """Scenes stored on the story, computed and persisted once for older stories."""
+    scenes = story.get("scenes")
+    if not scenes:
+        scenes = build_scenes(story["story"], get_num_images(story["duration"]))
+        await db.stories.update_one({"id": story["id"]}, {"$set": {"scenes": scenes}})
+        story["scenes"] = scenes
+    return scenes
+
 def get_style_prompt(style: str) -> str:
     """Get a prompt prefix for a given image style."""
     style_prompts = {
@@ -533,39 +2326,290 @@ def get_style_prompt(style: str) -> str:
     
     return style_prompts.get(style, "Create an image of")
 
-async def create_video(story: dict, subtitle_customization: SubtitleCustomization, video_id: str, voice_id: str):
-    """Generate a video by combining images, audio, and subtitles."""
+# Storyboard
+# One structured chat call per story turns the scenes into short visual
+# prompts with shared character and setting descriptors. It holds no style,
+# so every style re-run reuses it, and identical prompts hit the image cache.
+STORYBOARD_MODEL = "gpt-4o"
+STORYBOARD_PROMPT_WORDS = 40
+STORYBOARD_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["setting", "characters", "scenes"],
+    "properties": {
+        "setting": {"type": "string"},
+        "characters": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["name", "description"],
+                "properties": {"name": {"type": "string"}, "description": {"type": "string"}}
+            }
+        },
+        "scenes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["index", "prompt", "characters"],
+                "properties": {
+                    "index": {"type": "integer"},
+                    "prompt": {"type": "string"},
+                    "characters": {"type": "array", "items": {"type": "string"}}
+                }
+            }
+        }
+    }
+}
+
+async def get_storyboard(story: dict, scenes: List[dict], trace: PipelineTrace) -> Optional[dict]:
+    """The story's storyboard, planned once and stored; None if planning failed."""
+    storyboard = story.get("storyboard")
+    if storyboard and storyboard.get("scene_count") == len(scenes):
+        CACHE_REQUESTS.labels("storyboard", "hit").inc()
+        return storyboard
+    CACHE_REQUESTS.labels("storyboard", "miss").inc()
+    
+    system_prompt = (
+        "You are a storyboard artist. For every numbered scene, write a visual prompt of at most "
+        f"{STORYBOARD_PROMPT_WORDS} words describing only what the picture shows: subjects, action, "
+        "framing and lighting. No art style, no text or captions in the image. Describe each recurring "
+        "character once under characters and refer to them by the same name in the scenes they appear in, "
+        "so they look the same in every image. Describe the setting once."
+    )
+    scene_list = "\n".join(f"Scene {scene['index']}: {scene['text']}" for scene in scenes)
     try:
-        # Create a processing entry to track progress
-        await db.video_processing.insert_one({
-            "video_id": video_id,
-            "story_id": story["id"],
-            "progress": 0,
-            "started_at": datetime.utcnow()
-        })
-        
-        # Get the images
-        image_paths = [Path(MEDIA_DIR) / image_url.replace("/api/media/", "") for image_url in story["images"]]
+        with trace.span("storyboard", metric=CHAT_CALL_SECONDS, model=STORYBOARD_MODEL):
+            response = await provider_scheduler.call(
+                STORYBOARD_MODEL,
+                get_openai().chat.completions.with_raw_response.create,
+                tokens=estimate_tokens(system_prompt, scene_list) + 100 * len(scenes) + 200,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": scene_list}
+                ],
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {"name": "storyboard", "strict": True, "schema": STORYBOARD_SCHEMA}
+                }
+            )
+        plan = json.loads(response.choices[0].message.content)
+        planned = {scene["index"]: scene for scene in plan["scenes"]}
+        if sorted(planned) != [scene["index"] for scene in scenes]:
+            raise ValueError(f"storyboard covers scenes {sorted(planned)}, expected {len(scenes)}")
+    except Exception as e:
+        # Images fall back to prompting with the narration itself
+        logging.warning(f"Storyboard planning failed for story {story['id']}: {str(e)}")
+        return None
+    
+    # Scene narration stays the stored segmentation, which timing and
+    # subtitles are built on; the storyboard only adds what to draw
+    storyboard = {
+        "setting": " ".join(plan["setting"].split()),
+        "characters": [
+            {"name": character["name"].strip(), "description": " ".join(character["description"].split())}
+            for character in plan["characters"]
+        ],
+        "scenes": [
+            {
+                "index": scene["index"],
+                "prompt": " ".join(planned[scene["index"]]["prompt"].split()),
+                "characters": planned[scene["index"]]["characters"]
+            }
+            for scene in scenes
+        ],
+        "scene_count": len(scenes),
+        "model": STORYBOARD_MODEL,
+        "created_at": datetime.utcnow()
+    }
+    await db.stories.update_one({"id": story["id"]}, {"$set": {"storyboard": storyboard}})
+    story["storyboard"] = storyboard
+    return storyboard
+
+def scene_image_prompt(style: str, scene: dict, storyboard: Optional[dict]) -> str:
+    """The DALL-E prompt for a scene: the storyboard's if there is one, else its narration."""
+    if not storyboard:
+        return f"{get_style_prompt(style)} {scene['text']}. Full HD (1920x1080) aspect ratio."
+    planned = storyboard["scenes"][scene["index"]]
+    parts = [planned["prompt"]]
+    parts += [
+        f"{character['name']}: {character['description']}"
+        for character in storyboard["characters"] if character["name"] in planned["characters"]
+    ]
+    if storyboard["setting"]:
+        parts.append(f"Setting: {storyboard['setting']}")
+    return f"{get_style_prompt(style)} " + " ".join(part.rstrip(". ") + "." for part in parts)
+
+async def get_render_scenes(story: dict):
+    """Scenes to render and the image for each, in scene order.
+
+    A scene whose image failed borrows its nearest neighbour's image so the
+    narration, subtitles and scene durations stay aligned.
+    """
+    states = story.get("image_segments") or []
+    scenes = await get_story_scenes(story)
+    
+    if len(states) == len(scenes):
+        urls = [state.get("image_url") if state.get("status") == "done" else None for state in states]
+    elif len(story["images"]) == len(scenes):
+        urls = list(story["images"])
+    else:
+        # Images from before scenes were stored; segment to match them
+        scenes = build_scenes(story["story"], len(story["images"]))
+        return scenes, list(story["images"])[:len(scenes)]
+    
+    available = [i for i, url in enumerate(urls) if url]
+    if not available:
+        raise Exception("No images available for this story")
+    for i, url in enumerate(urls):
+        if not url:
+            nearest = min(available, key=lambda j: (abs(j - i), j > i))
+            urls[i] = urls[nearest]
+    return scenes, urls
+
+def video_title(story: dict) -> str:
+    """Gallery title for a story's video, taken from the prompt it was written from."""
+    prompt = " ".join((story.get("prompt") or "").split())
+    if not prompt:
+        return f"Video from {story.get('id')}"
+    return prompt if len(prompt) <= 80 else prompt[:77].rstrip() + "..."
+
+def subtitle_cues(texts: List[str], durations: List[float]) -> List[dict]:
+    """One cue per scene, timed like the scene it belongs to."""
+    cues = []
+    start = 0.0
+    for text, duration in zip(texts, durations):
+        cues.append({"start": round(start, 3), "end": round(start + duration, 3), "text": " ".join(text.split())})
+        start += duration
+    return cues
+
+def cue_timestamp(seconds: float, separator: str = ".") -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+def cues_to_srt(cues: List[dict]) -> str:
+    return "\n".join(
+        f"{i}\n{cue_timestamp(cue['start'], ',')} --> {cue_timestamp(cue['end'], ',')}\n{cue['text']}\n"
+        for i, cue in enumerate(cues, 1)
+    )
+
+# WebVTT equivalents of the burn-in styles; players apply them to the cues
+VTT_LINE_SETTINGS = {"top": "line:10%,start", "middle": "line:50%,center", "bottom": "line:80%,end"}
+VTT_BACKGROUNDS = {
+    "none": "transparent",
+    "solid": "rgba(0, 0, 0, 0.7)",
+    "gradient": "linear-gradient(rgba(0, 0, 0, 0.16), rgba(0, 0, 0, 0.78))",
+}
+
+def cues_to_webvtt(cues: List[dict], customization: dict) -> str:
+    """WebVTT sidecar for soft subtitles, styled after the subtitle customization."""
+    # Style values end up inside a CSS block, so they can't be allowed to close it
+    font = re.sub(r"[^\w \-]", "", customization.get("font", ""))
+    color = re.sub(r"[^\w#(),. %]", "", customization.get("color", ""))
+    style = [f"font-family: {font}, sans-serif;" if font else "", f"color: {color};" if color else ""]
+    style.append(f"background: {VTT_BACKGROUNDS.get(customization.get('background'), VTT_BACKGROUNDS['solid'])};")
+    shadows = []
+    if customization.get("outline"):
+        shadows += ["-2px -2px 0 #000", "2px -2px 0 #000", "-2px 2px 0 #000", "2px 2px 0 #000"]
+    if customization.get("shadow"):
+        shadows.append("3px 3px 3px rgba(0, 0, 0, 0.63)")
+    if shadows:
+        style.append(f"text-shadow: {', '.join(shadows)};")
+    settings = VTT_LINE_SETTINGS.get(customization.get("placement"), VTT_LINE_SETTINGS["bottom"])
+    
+    blocks = ["WEBVTT", "STYLE\n::cue {\n  " + "\n  ".join(filter(None, style)) + "\n}"]
+    for i, cue in enumerate(cues, 1):
+        text = cue["text"].replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        # A blank line would end the cue early
+        text = "\n".join(line for line in text.splitlines() if line.strip())
+        blocks.append(f"{i}\n{cue_timestamp(cue['start'])} --> {cue_timestamp(cue['end'])} {settings} align:center\n{text}")
+    return "\n\n".join(blocks) + "\n"
+
+class RenderCancelled(Exception):
+    pass
+
+class RenderControl:
+    """Cancellation handle for one render, shared with the threads doing the work."""
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.processes = set()
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled.set()
+            for process in self.processes:
+                if process.poll() is None:
+                    process.kill()
+
+    def attach(self, process):
+        # ffmpeg processes are killed on cancel, even if they only just started
+        with self.lock:
+            self.processes.add(process)
+            if self.cancelled.is_set():
+                process.kill()
+
+    def detach(self, process):
+        with self.lock:
+            self.processes.discard(process)
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise RenderCancelled()
+
+async def create_video(story: dict, subtitle_customization: SubtitleCustomization, video_id: str, voice_id: str, formats: List[str] = ["9:16"], burn_subtitles: bool = False, control: Optional[RenderControl] = None):
+    """Generate a video by combining images, audio, and subtitles.
+
+    Subtitles go into a mov_text track and the WebVTT sidecar unless
+    ``burn_subtitles`` asks for them to be drawn onto the frames.
+    """
+    control = control or RenderControl()
+    RENDERS_IN_FLIGHT.inc()
+    trace = PipelineTrace("render", video_id=video_id)
+    try:
+        # Create or reset the processing entry to track progress
+        await db.video_processing.update_one(
+            {"video_id": video_id},
+            {
+                "$set": {"story_id": story["id"], "status": "rendering", "progress": 0, "heartbeat_at": datetime.utcnow()},
+                "$setOnInsert": {"started_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
         
-        # Get the audio path
-        audio_path = Path(MEDIA_DIR) / story["audio_url"].replace("/api/media/", "")
+        # Pair every scene with its image so subtitles and timing line up
+        scenes, image_urls = await get_render_scenes(story)
         
         # Create a temporary directory for processing
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_dir_path = Path(temp_dir)
             
-            # Get audio duration using ffmpeg
-            probe = ffmpeg.probe(str(audio_path))
-            audio_duration = float(probe['format']['duration'])
+            # Local paths for the inputs, downloaded when media lives in a bucket
+            with trace.span("fetch_inputs"):
+                local_inputs = {}
+                for media_url in set(image_urls) | {story["audio_url"]}:
+                    local_inputs[media_url] = await asyncio.to_thread(storage.fetch, media_url, temp_dir_path)
+            image_paths = [local_inputs[image_url] for image_url in image_urls]
+            audio_path = local_inputs[story["audio_url"]]
+            control.check()
             
-            # Calculate duration for each image
-            image_duration = audio_duration / len(image_paths)
+            # Audio duration comes from the media catalog; narration from
+            # before the catalog is probed once and catalogued now
+            audio_media = await db.media.find_one({"url": story["audio_url"]}, {"_id": 0, "duration": 1})
+            audio_duration = audio_media.get("duration") if audio_media else None
+            if not audio_duration:
+                with trace.span("probe", metric=PROBE_SECONDS):
+                    metadata = await asyncio.to_thread(probe_media, audio_path)
+                await catalog_media(story["audio_url"], "audio", metadata, story_id=story["id"])
+                audio_duration = metadata["duration"]
             
-            # Prepare text for subtitles
-            story_text = story["story"]
-            
-            # Split story text into segments for each image
-            text_segments = split_story_into_segments(story_text, len(image_paths))
+            # Each scene stays on screen for its share of the narration
+            scene_durations = [audio_duration * scene["weight"] for scene in scenes]
+            text_segments = [scene["text"] for scene in scenes]
             
             # Update progress
             await db.video_processing.update_one(
@@ -573,27 +2617,42 @@ async def create_video(story: dict, subtitle_customization: SubtitleCustomizatio
                 {"$set": {"progress": 10}}
             )
             
-            # Create frames with subtitles
-            frame_paths = []
+            # Subtitle cues follow the scene timing either way
+            cues = subtitle_cues(text_segments, scene_durations)
+            subtitles_path = None
             
-            for i, (image_path, text_segment) in enumerate(zip(image_paths, text_segments)):
-                # Update progress periodically
-                if i % 3 == 0:
-                    progress = 10 + int((i / len(image_paths)) * 40)
-                    await db.video_processing.update_one(
-                        {"video_id": video_id},
-                        {"$set": {"progress": progress}}
-                    )
+            if burn_subtitles:
+                # Create frames with subtitles
+                frame_paths = []
                 
-                # Add subtitles to image
-                frame_path = temp_dir_path / f"frame_{i:03d}.png"
-                add_subtitle_to_image(
-                    str(image_path),
-                    text_segment,
-                    str(frame_path),
-                    subtitle_customization
-                )
-                frame_paths.append(frame_path)
+                with trace.span("frames"):
+                    for i, (image_path, text_segment) in enumerate(zip(image_paths, text_segments)):
+                        control.check()
+                        
+                        # Update progress periodically
+                        if i % 3 == 0:
+                            progress = 10 + int((i / len(image_paths)) * 40)
+                            await db.video_processing.update_one(
+                                {"video_id": video_id},
+                                {"$set": {"progress": progress}}
+                            )
+                        
+                        # Add subtitles to image
+                        frame_path = temp_dir_path / f"frame_{i:03d}.png"
+                        with trace.span("frame", metric=SUBTITLE_SECONDS, index=i):
+                            await asyncio.to_thread(
+                                add_subtitle_to_image,
+                                str(image_path),
+                                text_segment,
+                                str(frame_path),
+                                subtitle_customization
+                            )
+                        frame_paths.append(frame_path)
+            else:
+                # The images go in untouched and the text rides along as a track
+                frame_paths = image_paths
+                subtitles_path = temp_dir_path / "subtitles.srt"
+                subtitles_path.write_text(cues_to_srt(cues), encoding="utf-8")
             
             # Update progress
             await db.video_processing.update_one(
@@ -601,33 +2660,45 @@ async def create_video(story: dict, subtitle_customization: SubtitleCustomizatio
                 {"$set": {"progress": 50}}
             )
             
-            # Create video from frames
-            video_with_frames = temp_dir_path / "frames_video.mp4"
-            
-            frame_inputs = []
-            for i, frame_path in enumerate(frame_paths):
-                # Create input for each frame with duration
-                frame_input = ffmpeg.input(str(frame_path), loop=1, t=image_duration)
-                frame_inputs.append(frame_input)
-            
-            # Concatenate all frame inputs
-            concat_frames = ffmpeg.concat(*frame_inputs, v=1, a=0)
-            
-            # Add audio to the video
-            audio_input = ffmpeg.input(str(audio_path))
-            
             # Create vertical format video (9:16 ratio)
-            output_video = VIDEOS_DIR / f"{video_id}.mp4"
+            # The primary format keeps the plain {video_id}.mp4 name
+            output_names = {
+                aspect_ratio: f"{video_id}.mp4" if i == 0 else f"{video_id}_{aspect_ratio.replace(':', 'x')}.mp4"
+                for i, aspect_ratio in enumerate(formats)
+            }
+            output_paths = {aspect_ratio: temp_dir_path / name for aspect_ratio, name in output_names.items()}
+            with trace.span("encode", metric=ENCODE_SECONDS, formats=formats):
+                await asyncio.to_thread(encode_video, frame_paths, scene_durations, audio_path, output_paths, control, subtitles_path)
+            # Past this point the render is as good as done and is finished
+            control.check()
             
-            # Run ffmpeg command
-            ffmpeg.output(
-                concat_frames,
-                audio_input.audio,
-                str(output_video),
-                vf="scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2,setsar=1",
-                video_bitrate="2M",
-                audio_bitrate="160k"
-            ).run(overwrite_output=True, quiet=True)
+            outputs = []
+            with trace.span("upload"):
+                for aspect_ratio, name in output_names.items():
+                    output_url = f"/api/media/videos/{name}"
+                    output_path = output_paths[aspect_ratio]
+                    width, height = OUTPUT_FORMATS[aspect_ratio]
+                    # Everything but the hash is known from the encode settings
+                    metadata = {
+                        "sha256": await asyncio.to_thread(file_sha256, output_path),
+                        "size": output_path.stat().st_size,
+                        "duration": audio_duration,
+                        "width": width,
+                        "height": height,
+                        "codec": "h264",
+                        "audio_codec": "aac"
+                    }
+                    await asyncio.to_thread(storage.save_file, output_url, output_path, "video/mp4")
+                    await catalog_media(output_url, "video", metadata, story_id=story["id"], video_id=video_id)
+                    outputs.append({"format": aspect_ratio, "width": width, "height": height, "video_url": output_url})
+                
+                # Gallery poster, so the list shows something before the video loads
+                thumbnail_url = f"/api/media/videos/{video_id}_thumb.jpg"
+                thumbnail_path = temp_dir_path / f"{video_id}_thumb.jpg"
+                metadata = await asyncio.to_thread(make_thumbnail, frame_paths[0], thumbnail_path, formats[0])
+                await asyncio.to_thread(storage.save_file, thumbnail_url, thumbnail_path, "image/jpeg")
+                await catalog_media(thumbnail_url, "image", metadata, story_id=story["id"], video_id=video_id)
+            video_url = outputs[0]["video_url"]
             
             # Update progress
             await db.video_processing.update_one(
@@ -636,13 +2707,21 @@ async def create_video(story: dict, subtitle_customization: SubtitleCustomizatio
             )
             
             # Create video entry in database
-            video_url = f"/api/media/videos/{video_id}.mp4"
             video = {
                 "id": video_id,
-                "title": f"Video from {story.get('id')}",
+                "title": video_title(story),
                 "story_id": story["id"],
                 "duration": story["duration"],
                 "video_url": video_url,
+                "outputs": outputs,
+                "thumbnail_url": thumbnail_url,
+                # Soft subtitles are edited here and served as WebVTT without re-rendering
+                "subtitles": {
+                    "mode": "burned" if burn_subtitles else "soft",
+                    "cues": cues,
+                    "customization": subtitle_customization.dict()
+                },
+                "timings": await save_trace(trace, "render", story["id"], video_id),
                 "created_at": datetime.utcnow()
             }
             
@@ -651,95 +2730,396 @@ async def create_video(story: dict, subtitle_customization: SubtitleCustomizatio
             # Clean up the processing entry
             await db.video_processing.delete_one({"video_id": video_id})
             
+    except RenderCancelled:
+        # The temp directory is already gone; only the queue entry is left
+        logging.info(f"Render {video_id} cancelled")
+        await db.video_processing.delete_one({"video_id": video_id})
     except Exception as e:
+        PIPELINE_FAILURES.labels("render").inc()
         logging.error(f"Video generation error: {str(e)}")
+        await forget_video_request(video_id)
         # Update the processing entry with the error
         await db.video_processing.update_one(
             {"video_id": video_id},
             {"$set": {
                 "error": str(e),
-                "status": "failed"
+                "status": "failed",
+                "timings": await save_trace(trace, "render", story["id"], video_id, error=str(e))
             }}
         )
+    finally:
+        RENDERS_IN_FLIGHT.dec()
 
-def add_subtitle_to_image(image_path: str, text: str, output_path: str, customization: SubtitleCustomization):
-    """Add subtitle text to an image."""
-    # Open the image
-    img = Image.open(image_path)
+# Output frame sizes by aspect ratio
+OUTPUT_FORMATS = {
+    "9:16": (1080, 1920),  # TikTok, Shorts, Reels
+    "16:9": (1920, 1080),  # YouTube
+    "1:1": (1080, 1080),
+}
+
+# Encoding
+# Long timelines are cut at scene boundaries, the pieces encoded by parallel
+# ffmpeg processes and joined with a stream-copy concat. Every piece uses the
+# same encoder settings and starts on a keyframe, so the joined stream plays
+# like a single encode.
+ENCODE_WORKERS = int(os.environ.get("ENCODE_WORKERS", str(os.cpu_count() or 1)))  # 1 keeps the single-process encode
+ENCODE_CHUNK_MIN_SECONDS = 20  # shorter chunks cost more in ffmpeg startup and the join than they save
+ENCODE_FPS = 25
+VIDEO_ENCODE_ARGS = {"vcodec": "libx264", "pix_fmt": "yuv420p", "r": ENCODE_FPS, "video_bitrate": "2M"}
+AUDIO_ENCODE_ARGS = {"acodec": "aac", "audio_bitrate": "160k"}
+SUBTITLE_TRACK_ARGS = {"scodec": "mov_text", "metadata:s:s:0": "language=eng"}
+
+def run_ffmpeg(stream, control: Optional[RenderControl] = None):
+    """Run an ffmpeg command, killable through the render control."""
+    import ffmpeg
+    
+    process = stream.run_async(overwrite_output=True, quiet=True)
+    if control:
+        control.attach(process)
+    try:
+        out, err = process.communicate()
+    finally:
+        if control:
+            control.detach(process)
+    if control:
+        control.check()
+    if process.returncode:
+        raise ffmpeg.Error("ffmpeg", out, err)
+
+THUMBNAIL_WIDTH = 360
+
+def make_thumbnail(frame_path: Path, output_path: Path, aspect_ratio: str) -> dict:
+    """Save a JPEG poster of a frame, letterboxed like the video, and return its catalog metadata."""
+    from PIL import Image, ImageOps
+    
+    width, height = OUTPUT_FORMATS[aspect_ratio]
+    size = (THUMBNAIL_WIDTH, round(THUMBNAIL_WIDTH * height / width))
+    with Image.open(frame_path) as frame:
+        ImageOps.pad(frame.convert("RGB"), size, color="black").save(output_path, "JPEG", quality=80)
+    return {"sha256": file_sha256(output_path), "size": output_path.stat().st_size, "width": size[0], "height": size[1], "codec": "jpeg"}
+
+def format_branches(frame_paths: List[Path], durations: List[float], formats: List[str]) -> list:
+    """Decode each frame once and concatenate a scaled/padded copy of them per format.
+
+    Uploaded stills can differ in size from each other and from generated
+    ones, and concat needs every segment at the same size and SAR, so each
+    frame is letterboxed to the format before the join rather than after.
+    """
+    import ffmpeg
+    
+    frame_inputs = []
+    for frame_path, duration in zip(frame_paths, durations):
+        # Create input for each frame with duration
+        frame_input = ffmpeg.input(str(frame_path), loop=1, t=duration, framerate=ENCODE_FPS)
+        frame_inputs.append(frame_input.split() if len(formats) > 1 else [frame_input])
+    
+    branches = []
+    for i, aspect_ratio in enumerate(formats):
+        width, height = OUTPUT_FORMATS[aspect_ratio]
+        # Letterbox rather than crop so burned-in subtitles are never cut off
+        segments = [
+            copies[i]
+            .filter("scale", width, height, force_original_aspect_ratio="decrease")
+            .filter("pad", width, height, "(ow-iw)/2", "(oh-ih)/2")
+            .filter("setsar", 1)
+            for copies in frame_inputs
+        ]
+        branches.append(ffmpeg.concat(*segments, v=1, a=0))
+    return branches
+
+def plan_encode_chunks(durations: List[float]) -> List[List[int]]:
+    """Group consecutive scenes into roughly equal-length chunks, one per encode worker.
+
+    Every chunk is at least ENCODE_CHUNK_MIN_SECONDS long, so timelines
+    shorter than two of those are encoded in one piece.
+    """
+    total = sum(durations)
+    count = min(ENCODE_WORKERS, len(durations), int(total // ENCODE_CHUNK_MIN_SECONDS))
+    if count < 2 or total < 2 * ENCODE_CHUNK_MIN_SECONDS:
+        return [list(range(len(durations)))]
+    
+    chunks = [[]]
+    elapsed = 0.0
+    for i, duration in enumerate(durations):
+        # A scene whose midpoint is past this chunk's share of the timeline starts the next chunk
+        if chunks[-1] and len(chunks) < count and elapsed + duration / 2 > total * len(chunks) / count:
+            chunks.append([])
+        chunks[-1].append(i)
+        elapsed += duration
+    
+    # Uneven scenes can still leave a chunk short; fold it into its shorter neighbour
+    while len(chunks) > 1:
+        lengths = [sum(durations[i] for i in chunk) for chunk in chunks]
+        short = min(range(len(chunks)), key=lengths.__getitem__)
+        if lengths[short] >= ENCODE_CHUNK_MIN_SECONDS:
+            break
+        if short == 0:
+            neighbour = 1
+        elif short == len(chunks) - 1:
+            neighbour = short - 1
+        else:
+            neighbour = short - 1 if lengths[short - 1] <= lengths[short + 1] else short + 1
+        first, second = sorted((short, neighbour))
+        chunks[first:second + 1] = [chunks[first] + chunks[second]]
+    return chunks
+
+def subtitle_streams(subtitles_path: Optional[Path]) -> tuple:
+    """Extra output streams and options that mux an SRT file in as a mov_text track."""
+    import ffmpeg
+    
+    if not subtitles_path:
+        return [], {}
+    return [ffmpeg.input(str(subtitles_path))["s"]], SUBTITLE_TRACK_ARGS
+
+def encode_video(frame_paths: List[Path], durations: List[float], audio_path: Path, outputs: Dict[str, Path], control: Optional[RenderControl] = None, subtitles_path: Optional[Path] = None):
+    """Encode the frames and the narration into one video per aspect ratio.
+
+    Each frame is decoded once and split into a scale/pad copy per format,
+    and every format is concatenated inside a single ffmpeg process. Timelines
+    long enough to be worth it are encoded in parallel chunks instead.
+    With ``subtitles_path`` the SRT is added to every output as a text track.
+    """
+    import ffmpeg
+    
+    chunks = plan_encode_chunks(durations)
+    if len(chunks) > 1:
+        return encode_video_chunked(frame_paths, durations, audio_path, outputs, chunks, control, subtitles_path)
+    
+    # Add audio to the video
+    audio_input = ffmpeg.input(str(audio_path))
+    subtitle_inputs, subtitle_args = subtitle_streams(subtitles_path)
+    
+    encodes = []
+    for branch, output_video in zip(format_branches(frame_paths, durations, list(outputs)), outputs.values()):
+        encodes.append(ffmpeg.output(branch, audio_input.audio, *subtitle_inputs, str(output_video), **VIDEO_ENCODE_ARGS, **AUDIO_ENCODE_ARGS, **subtitle_args))
     
-    # Create a drawing context
-    draw = ImageDraw.Draw(img)
+    # Run ffmpeg command; the render control can kill it mid-encode
+    run_ffmpeg(ffmpeg.merge_outputs(*encodes), control)
+
+def encode_video_chunked(frame_paths: List[Path], durations: List[float], audio_path: Path, outputs: Dict[str, Path], chunks: List[List[int]], control: Optional[RenderControl] = None, subtitles_path: Optional[Path] = None):
+    """Encode each chunk of scenes in its own ffmpeg process, then join them.
+
+    Chunks are cut at scene boundaries, where the picture changes anyway,
+    and each chunk is a separate encode that opens on a keyframe. The pieces
+    are joined with the concat demuxer without re-encoding and the narration
+    is muxed in over the whole timeline.
+    """
+    import ffmpeg
+    from concurrent.futures import ThreadPoolExecutor
+    
+    formats = list(outputs)
+    # x264 threads are shared out so parallel chunks don't oversubscribe the cores
+    threads = max(1, (os.cpu_count() or 1) // len(chunks))
+    
+    with tempfile.TemporaryDirectory(dir=next(iter(outputs.values())).parent) as chunk_dir:
+        chunk_dir = Path(chunk_dir)
+        
+        def encode_chunk(index: int, scene_indexes: List[int]) -> Dict[str, Path]:
+            chunk_paths = {aspect_ratio: chunk_dir / f"chunk_{index:03d}_{aspect_ratio.replace(':', 'x')}.mp4" for aspect_ratio in formats}
+            branches = format_branches(
+                [frame_paths[i] for i in scene_indexes],
+                [durations[i] for i in scene_indexes],
+                formats
+            )
+            run_ffmpeg(ffmpeg.merge_outputs(*[
+                ffmpeg.output(branch, str(chunk_paths[aspect_ratio]), threads=threads, **VIDEO_ENCODE_ARGS)
+                for branch, aspect_ratio in zip(branches, formats)
+            ]), control)
+            return chunk_paths
+        
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [pool.submit(encode_chunk, index, scene_indexes) for index, scene_indexes in enumerate(chunks)]
+        # A cancel stops every chunk, so a real encode error takes precedence
+        errors = [future.exception() for future in futures if future.exception()]
+        if errors:
+            raise next((error for error in errors if not isinstance(error, RenderCancelled)), errors[0])
+        chunk_outputs = [future.result() for future in futures]
+        
+        # Join the chunks with a stream copy and mux the narration over them
+        audio_input = ffmpeg.input(str(audio_path))
+        subtitle_inputs, subtitle_args = subtitle_streams(subtitles_path)
+        joins = []
+        for aspect_ratio, output_video in outputs.items():
+            concat_list = chunk_dir / f"concat_{aspect_ratio.replace(':', 'x')}.txt"
+            concat_list.write_text("".join(f"file '{paths[aspect_ratio].name}'\n" for paths in chunk_outputs))
+            chunk_video = ffmpeg.input(str(concat_list), format="concat", safe=0)
+            joins.append(ffmpeg.output(chunk_video.video, audio_input.audio, *subtitle_inputs, str(output_video), vcodec="copy", **AUDIO_ENCODE_ARGS, **subtitle_args))
+        run_ffmpeg(ffmpeg.merge_outputs(*joins), control)
+
+# Subtitle compositing
+# A subtitle overlay (box, shadow, outline and text) is rasterized once per
+# frame size, text and style into arrays covering just the subtitle area,
+# then alpha-blended onto the frame with integer NumPy arithmetic.
+SUBTITLE_FONT_SIZE = 40
+SUBTITLE_PADDING = 10
+SUBTITLE_BACKGROUND_ALPHA = 180  # the "solid" box, about 70% opaque
+SUBTITLE_GRADIENT_ALPHA = (40, 200)  # top and bottom of the "gradient" box
+SUBTITLE_OUTLINE_WIDTH = 2
+SUBTITLE_SHADOW_OFFSET = 3
+SUBTITLE_SHADOW_BLUR = 3
+SUBTITLE_SHADOW_ALPHA = 160
+
+@functools.lru_cache(maxsize=8)
+def load_subtitle_font(name: str):
+    from PIL import ImageFont
     
-    # We don't have many fonts installed in the environment, so use a default one
-    font_size = 40
+    # We don't have many fonts installed in the environment, so fall back to a default one
     try:
-        font = ImageFont.truetype(customization.font, font_size)
-    except:
-        # Fallback to default font
-        font = ImageFont.load_default()
+        return ImageFont.truetype(name, SUBTITLE_FONT_SIZE)
+    except Exception:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=16)
+def subtitle_overlay(width: int, height: int, text: str, font_name: str, color: str, placement: str, background: str, outline: bool, shadow: bool):
+    """Premultiplied colour, inverse alpha and frame offset of a subtitle overlay.
+
+    Both arrays are uint16 and cover only the box plus room for the shadow,
+    so blending touches a strip of the frame rather than all of it.
+    """
+    import numpy as np
+    from PIL import Image, ImageColor, ImageDraw, ImageFilter
     
+    font = load_subtitle_font(font_name)
     # Wrap text to fit image width (80% of image width)
-    width = img.width * 0.8
-    wrapped_text = wrap_text(text, font, width)
-    
-    # Get text dimensions
-    text_width, text_height = draw.textbbox((0, 0), wrapped_text, font=font)[2:4]
+    wrapped_text = wrap_text(text, font, width * 0.8)
+    text_width, text_height = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), wrapped_text, font=font)[2:4]
     
     # Define text position based on placement setting
-    if customization.placement == "top":
-        position = ((img.width - text_width) / 2, img.height * 0.1)
-    elif customization.placement == "middle":
-        position = ((img.width - text_width) / 2, (img.height - text_height) / 2)
+    if placement == "top":
+        position = ((width - text_width) / 2, height * 0.1)
+    elif placement == "middle":
+        position = ((width - text_width) / 2, (height - text_height) / 2)
     else:  # "bottom"
-        position = ((img.width - text_width) / 2, img.height * 0.8 - text_height)
-    
-    # Draw text background if specified
-    if customization.background != "none":
-        # Add padding around text
-        padding = 10
-        background_box = [
-            position[0] - padding,
-            position[1] - padding,
-            position[0] + text_width + padding,
-            position[1] + text_height + padding
-        ]
-        
-        if customization.background == "solid":
-            # Semi-transparent black background
-            draw.rectangle(background_box, fill=(0, 0, 0, 180))
-        elif customization.background == "gradient":
-            # Create a gradient background (simplified for this example)
-            draw.rectangle(background_box, fill=(0, 0, 0, 150))
+        position = ((width - text_width) / 2, height * 0.8 - text_height)
+    
+    # The overlay covers the padded box plus whatever the outline and shadow add
+    stroke = SUBTITLE_OUTLINE_WIDTH if outline else 0
+    margin = SUBTITLE_PADDING + stroke + (SUBTITLE_SHADOW_OFFSET + 2 * SUBTITLE_SHADOW_BLUR if shadow else 0)
+    x0, y0 = max(0, int(position[0] - margin)), max(0, int(position[1] - margin))
+    x1, y1 = min(width, int(position[0] + text_width + margin) + 1), min(height, int(position[1] + text_height + margin) + 1)
+    size = (x1 - x0, y1 - y0)
+    origin = (position[0] - x0, position[1] - y0)
+    
+    # Glyph rendering dominates the cost, so the text is rendered once and the
+    # outline is a dilation of it rather than a second, stroked render
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).text(origin, wrapped_text, font=font, fill=255)
+    text_mask = np.asarray(mask)
+    stroke_mask = dilate_mask(text_mask, stroke) if outline else text_mask
+    
+    # Everything under the text (box, shadow, outline) is black, so the
+    # colour comes from the text alone and the other layers only add opacity.
+    # Flattening them with "over" is then a product of their transparencies.
+    transparency = 1 - text_mask / np.float32(255)
+    if background in ("solid", "gradient"):
+        top, bottom = int(origin[1] - SUBTITLE_PADDING), int(origin[1] + text_height + SUBTITLE_PADDING)
+        left, right = int(origin[0] - SUBTITLE_PADDING), int(origin[0] + text_width + SUBTITLE_PADDING)
+        # The box may run off the frame, in which case the overlay is clipped to it
+        rows = slice(max(top, 0), min(bottom, size[1]))
+        columns = slice(max(left, 0), min(right, size[0]))
+        if background == "solid":
+            transparency[rows, columns] *= 1 - SUBTITLE_BACKGROUND_ALPHA / 255
+        else:
+            transparency[rows, columns] *= 1 - subtitle_gradient(bottom - top)[rows.start - top:rows.stop - top, None]
+    if shadow:
+        offset = np.zeros_like(stroke_mask)
+        offset[SUBTITLE_SHADOW_OFFSET:, SUBTITLE_SHADOW_OFFSET:] = stroke_mask[:-SUBTITLE_SHADOW_OFFSET, :-SUBTITLE_SHADOW_OFFSET]
+        blurred = np.asarray(Image.fromarray(offset).filter(ImageFilter.GaussianBlur(SUBTITLE_SHADOW_BLUR)))
+        transparency *= 1 - blurred * np.float32(SUBTITLE_SHADOW_ALPHA / 255 / 255)
+    if outline:
+        transparency *= 1 - stroke_mask / np.float32(255)
+    try:
+        rgb = ImageColor.getrgb(color)[:3]
+    except ValueError:
+        rgb = (255, 255, 255)
+    
+    return (
+        np.rint(text_mask[..., None] * (np.array(rgb, dtype=np.float32) / 255)).astype(np.uint16),
+        np.rint(transparency * 255).astype(np.uint16)[..., None],
+        (x0, y0)
+    )
+
+@functools.lru_cache(maxsize=32)
+def subtitle_gradient(rows: int):
+    """Per-row opacity of a gradient box this many rows tall; the same for every subtitle of that height."""
+    import numpy as np
+    
+    ramp = np.linspace(*SUBTITLE_GRADIENT_ALPHA, num=rows, dtype=np.float32) / 255
+    ramp.flags.writeable = False
+    return ramp
+
+def dilate_mask(mask, radius: int):
+    """Grow a uint8 mask by ``radius`` pixels in every direction (a square max filter)."""
+    import numpy as np
     
-    # Draw the text
-    draw.text(position, wrapped_text, font=font, fill=customization.color)
+    dilated = mask.copy()
+    for shift in range(1, radius + 1):
+        np.maximum(dilated[shift:], mask[:-shift], out=dilated[shift:])
+        np.maximum(dilated[:-shift], mask[shift:], out=dilated[:-shift])
+    rows = dilated.copy()
+    for shift in range(1, radius + 1):
+        np.maximum(dilated[:, shift:], rows[:, :-shift], out=dilated[:, shift:])
+        np.maximum(dilated[:, :-shift], rows[:, shift:], out=dilated[:, :-shift])
+    return dilated
+
+def composite_subtitle(img, overlay):
+    """Alpha-blend a subtitle overlay onto an RGB image in place."""
+    import numpy as np
+    from PIL import Image
+    
+    premultiplied, inverse_alpha, (x, y) = overlay
+    height, width = inverse_alpha.shape[:2]
+    # Only the strip under the overlay is converted, the rest of the frame is untouched
+    region = np.asarray(img.crop((x, y, x + width, y + height)))
+    # frame * (1 - alpha) + overlay, rounded, in 16-bit integers
+    blended = region * inverse_alpha
+    blended += 127
+    blended //= 255
+    blended += premultiplied
+    np.minimum(blended, 255, out=blended)
+    img.paste(Image.fromarray(blended.astype(np.uint8)), (x, y))
+
+def add_subtitle_to_image(image_path: str, text: str, output_path: str, customization: SubtitleCustomization):
+    """Add subtitle text to an image."""
+    from PIL import Image
     
-    # Save the modified image
+    img = Image.open(image_path).convert("RGB")
+    overlay = subtitle_overlay(
+        img.width, img.height, text,
+        customization.font, customization.color, customization.placement, customization.background,
+        customization.outline, customization.shadow
+    )
+    composite_subtitle(img, overlay)
     img.save(output_path)
 
+@functools.lru_cache(maxsize=4096)
+def word_length(font, word: str) -> float:
+    return font.getlength(word)
+
 def wrap_text(text: str, font, max_width: float) -> str:
-    """Wrap text to fit within a maximum width."""
-    words = text.split()
+    """Wrap text to fit within a maximum width.
+
+    Line widths are summed from per-word widths, cached across calls, rather
+    than measuring every candidate line again.
+    """
+    space = word_length(font, " ")
     wrapped_lines = []
     current_line = []
+    current_width = 0.0
     
-    for word in words:
-        # Add word to current line
-        test_line = ' '.join(current_line + [word])
-        # Check if it fits
-        width = font.getlength(test_line)
-        
-        if width <= max_width:
+    for word in text.split():
+        width = word_length(font, word)
+        # Check if it fits on the current line
+        if not current_line or current_width + space + width <= max_width:
+            if current_line:
+                current_width += space
             current_line.append(word)
+            current_width += width
         else:
             # Line is full, start a new one
-            if current_line:
-                wrapped_lines.append(' '.join(current_line))
-                current_line = [word]
-            else:
-                # This handles the case where a single word is wider than max_width
-                wrapped_lines.append(word)
-                current_line = []
+            wrapped_lines.append(' '.join(current_line))
+            current_line = [word]
+            current_width = width
     
     # Add the last line if it's not empty
     if current_line:
@@ -747,9 +3127,642 @@ def wrap_text(text: str, font, max_width: float) -> str:
     
     return '\n'.join(wrapped_lines)
 
+# Media lifecycle
+MEDIA_RETENTION_DAYS = float(os.environ.get("MEDIA_RETENTION_DAYS", "30"))
+FAILED_JOB_RETENTION_HOURS = float(os.environ.get("FAILED_JOB_RETENTION_HOURS", "24"))
+STALE_JOB_HOURS = float(os.environ.get("STALE_JOB_HOURS", "6"))
+ORPHAN_GRACE_MINUTES = float(os.environ.get("ORPHAN_GRACE_MINUTES", "60"))
+MEDIA_QUOTA_BYTES = int(os.environ.get("MEDIA_QUOTA_BYTES", "0"))  # 0 disables the quota
+MEDIA_SWEEP_INTERVAL_SECONDS = float(os.environ.get("MEDIA_SWEEP_INTERVAL_SECONDS", "3600"))
+
+def video_urls(video: dict) -> set:
+    urls = {video["video_url"]} | {output["video_url"] for output in video.get("outputs") or []}
+    if video.get("thumbnail_url"):
+        urls.add(video["thumbnail_url"])
+    return urls
+
+def story_media_urls(story: dict) -> set:
+    urls = set(story.get("images") or [])
+    urls.update(state["image_url"] for state in story.get("image_segments") or [] if state.get("image_url"))
+    if story.get("audio_url"):
+        urls.add(story["audio_url"])
+    return urls
+
+async def forget_evicted_media(story_ids: set, evicted: set, now: datetime):
+    """Drop references to evicted files, so the stories ask for them to be generated again.
+
+    Evicted images go back to pending, which image generation with resume
+    fills in again; evicted narration leaves the story without audio.
+    """
+    stories = await db.stories.find(
+        {"id": {"$in": list(story_ids)}}, {"_id": 0, "id": 1, "images": 1, "image_segments": 1, "audio_url": 1}
+    ).to_list(None)
+    for story in stories:
+        update = {"$set": {"media_evicted_at": now}}
+        states = story.get("image_segments") or []
+        if evicted & set(story.get("images") or []) or any(state.get("image_url") in evicted for state in states):
+            states = [
+                {**state, "status": "pending", "image_url": None} if state.get("image_url") in evicted else state
+                for state in states
+            ]
+            done = sum(state["status"] == "done" for state in states)
+            update["$set"].update(
+                images=[],
+                image_segments=states,
+                image_generation_complete=False,
+                image_generation_progress=(done / len(states)) * 100 if states else 0
+            )
+        if story.get("audio_url") in evicted:
+            update["$unset"] = {"audio_url": ""}
+        await db.stories.update_one({"id": story["id"]}, update)
+
+async def sweep_media(dry_run: bool = True) -> dict:
+    """Delete orphaned files, failed job leftovers and abandoned stories, then enforce the quota.
+
+    References are computed from the stories and videos collections on every
+    sweep. With dry_run the report lists what would be removed without
+    touching anything.
+    """
+    now = datetime.utcnow()
+    report = {"dry_run": dry_run, "failed_jobs": [], "abandoned_stories": [], "abandoned_media": [], "orphans": [], "evicted": [], "freed_bytes": 0}
+    removed = set()
+    
+    def remove(url: str, size: int, bucket: str):
+        report[bucket].append({"url": url, "bytes": size})
+        report["freed_bytes"] += size
+        removed.add(url)
+        if not dry_run:
+            storage.delete(url)
+    
+    files = await asyncio.to_thread(storage.list)
+    report["usage_bytes_before"] = sum(item.size for item in files.values())
+    
+    # Renders that failed long enough ago, or stopped heartbeating. Queued
+    # renders are left alone however long they wait for a worker.
+    failed_cutoff = now - timedelta(hours=FAILED_JOB_RETENTION_HOURS)
+    stale_cutoff = now - timedelta(hours=STALE_JOB_HOURS)
+    failed_jobs = await db.video_processing.find({"$or": [
+        {"status": "failed", "started_at": {"$lt": failed_cutoff}},
+        {"status": "rendering", "heartbeat_at": {"$lt": stale_cutoff}}
+    ]}, {"_id": 0, "video_id": 1, "story_id": 1, "status": 1}).to_list(None)
+    for job in failed_jobs:
+        for url in files.keys() - removed:
+            if url.startswith(f"/api/media/videos/{job['video_id']}"):
+                remove(url, files[url].size, "orphans")
+        report["failed_jobs"].append(job["video_id"])
+    if not dry_run and failed_jobs:
+        await db.video_processing.delete_many({"video_id": {"$in": [job["video_id"] for job in failed_jobs]}})
+    
+    # Stories that never produced a video within the retention window
+    story_projection = {"_id": 0, "id": 1, "images": 1, "image_segments.image_url": 1, "audio_url": 1, "created_at": 1}
+    stories = await db.stories.find({}, story_projection).to_list(None)
+    videos = await db.videos.find({}, {"_id": 0, "story_id": 1, "video_url": 1, "outputs.video_url": 1, "thumbnail_url": 1}).to_list(None)
+    stories_with_videos = {video["story_id"] for video in videos}
+    retention_cutoff = now - timedelta(days=MEDIA_RETENTION_DAYS)
+    
+    referenced = set().union(*(video_urls(video) for video in videos))
+    # Stories using each file; the image cache lets several stories share one
+    users: Dict[str, set] = {}
+    abandoned_urls = set()
+    for story in stories:
+        urls = story_media_urls(story)
+        if story["id"] not in stories_with_videos and story.get("created_at", now) < retention_cutoff:
+            abandoned_urls |= urls
+            report["abandoned_stories"].append(story["id"])
+            continue
+        referenced |= urls
+        for url in urls:
+            users.setdefault(url, set()).add(story["id"])
+    # Uploads are deduplicated, so another story may still use the same file
+    for url in (abandoned_urls - referenced) & files.keys():
+        remove(url, files[url].size, "abandoned_media")
+    if not dry_run and report["abandoned_stories"]:
+        await db.stories.delete_many({"id": {"$in": report["abandoned_stories"]}})
+    
+    # Files nothing points at, once they are old enough not to be mid-write
+    grace_cutoff = time.time() - ORPHAN_GRACE_MINUTES * 60
+    for url, item in files.items():
+        if url not in referenced and url not in removed and item.modified < grace_cutoff:
+            remove(url, item.size, "orphans")
+    
+    # Over quota: evict images and narration, least recently used first, that
+    # only rendered stories with no render in progress still use. Those can be
+    # generated again if needed; uploads cannot, so they are never evicted.
+    usage = report["usage_bytes_before"] - report["freed_bytes"]
+    if MEDIA_QUOTA_BYTES and usage > MEDIA_QUOTA_BYTES:
+        active_jobs = await db.video_processing.find(
+            {"status": {"$in": ["queued", "rendering"]}}, {"_id": 0, "story_id": 1}
+        ).to_list(None)
+        settled = stories_with_videos - {job["story_id"] for job in active_jobs}
+        candidates = sorted(
+            (
+                url for url, story_ids in users.items()
+                if story_ids <= settled and "/upload_" not in url and url in files and url not in removed
+            ),
+            key=lambda url: files[url].modified
+        )
+        evicted = set()
+        for url in candidates:
+            if usage <= MEDIA_QUOTA_BYTES:
+                break
+            usage -= files[url].size
+            remove(url, files[url].size, "evicted")
+            evicted.add(url)
+        if not dry_run and evicted:
+            await forget_evicted_media(set().union(*(users[url] for url in evicted)), evicted, now)
+    
+    if not dry_run and removed:
+        await db.media.delete_many({"url": {"$in": list(removed)}})
+    
+    report["usage_bytes_after"] = report["usage_bytes_before"] - report["freed_bytes"]
+    report["quota_bytes"] = MEDIA_QUOTA_BYTES
+    if not dry_run:
+        logging.info(f"Media sweep freed {report['freed_bytes']} bytes")
+    return report
+
+async def acquire_lease(name: str, duration: timedelta) -> bool:
+    """Take or renew a named lease shared by all workers; False if another worker holds it."""
+    now = datetime.utcnow()
+    try:
+        await db.leases.update_one(
+            {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"holder": INSTANCE_ID}]},
+            {"$set": {"holder": INSTANCE_ID, "expires_at": now + duration}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def run_media_sweeper():
+    while True:
+        await asyncio.sleep(MEDIA_SWEEP_INTERVAL_SECONDS)
+        try:
+            # Every worker runs this loop; one sweep per interval is enough
+            if await acquire_lease("media_sweep", timedelta(seconds=MEDIA_SWEEP_INTERVAL_SECONDS * 0.9)):
+                await sweep_media(dry_run=False)
+        except Exception as e:
+            logging.error(f"Media sweep error: {str(e)}")
+
+@api_router.post("/media-sweep")
+async def trigger_media_sweep(dry_run: bool = True):
+    return await sweep_media(dry_run=dry_run)
+
+@api_router.get("/media-usage")
+async def get_media_usage():
+    files = await asyncio.to_thread(storage.list)
+    usage = {}
+    for url, item in files.items():
+        kind = url.split("/")[3]
+        usage[kind] = usage.get(kind, 0) + item.size
+    return {"usage_bytes": usage, "total_bytes": sum(usage.values()), "quota_bytes": MEDIA_QUOTA_BYTES}
+
+# Render queue
+# Renders are queued in db.video_processing and claimed by whichever worker
+# has a free slot, so a render survives the worker that accepted it and
+# any number of worker processes or hosts can share the queue.
+RENDER_CONCURRENCY = int(os.environ.get("RENDER_CONCURRENCY", "1"))  # 0 makes an API-only worker
+RENDER_MAX_ATTEMPTS = 3
+RENDER_POLL_SECONDS = 2
+RENDER_HEARTBEAT_SECONDS = 30
+# A render whose worker stopped heartbeating for this long is picked up again
+RENDER_CLAIM_TIMEOUT = timedelta(minutes=5)
+# Interactive renders, the ones someone is watching a progress bar for, are
+# claimed ahead of batch renders. Lanes only reorder the queue; a render that
+# is already running is never preempted.
+RENDER_PRIORITIES = {"interactive": 0, "batch": 1}
+# An interactive render nobody has polled for this long waits in the batch lane
+RENDER_WATCH_TIMEOUT = timedelta(minutes=2)
+
+class RenderWorker:
+    def __init__(self):
+        self.wakeup = asyncio.Event()
+        self.slots = asyncio.Semaphore(max(RENDER_CONCURRENCY, 1))
+        self.tasks = set()
+        self.running: Dict[str, RenderControl] = {}
+
+    def notify(self):
+        self.wakeup.set()
+
+    def cancel(self, video_id: str):
+        # Renders on other workers see cancel_requested on their next watch poll
+        control = self.running.get(video_id)
+        if control:
+            control.cancel()
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        # Render capacity goes to renders someone is still waiting for
+        await db.video_processing.update_many(
+            {"status": "queued", "priority": {"$lt": RENDER_PRIORITIES["batch"]}, "watched_at": {"$lt": now - RENDER_WATCH_TIMEOUT}},
+            {"$set": {"priority": RENDER_PRIORITIES["batch"]}}
+        )
+        return await db.video_processing.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "rendering", "heartbeat_at": {"$lt": now - RENDER_CLAIM_TIMEOUT}, "attempts": {"$lt": RENDER_MAX_ATTEMPTS}, "cancel_requested": {"$ne": True}}
+            ]},
+            {"$set": {"status": "rendering", "claimed_by": INSTANCE_ID, "started_at": now, "heartbeat_at": now}, "$inc": {"attempts": 1}},
+            sort=[("priority", 1), ("queued_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def run(self):
+        while True:
+            try:
+                await self.slots.acquire()
+                try:
+                    job = await self.claim()
+                except Exception:
+                    self.slots.release()
+                    raise
+                if job:
+                    task = asyncio.create_task(self.render(job))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                    continue
+                self.slots.release()
+                
+                RENDER_QUEUE_DEPTH.set(await db.video_processing.count_documents({"status": "queued"}))
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=RENDER_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Render worker error: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def render(self, job: dict):
+        control = RenderControl()
+        self.running[job["video_id"]] = control
+        watch = asyncio.create_task(self.watch(job["video_id"], control))
+        try:
+            story = await db.stories.find_one({"id": job["story_id"]})
+            if not story:
+                await db.video_processing.update_one(
+                    {"video_id": job["video_id"]},
+                    {"$set": {"status": "failed", "error": "Story not found"}}
+                )
+                await forget_video_request(job["video_id"])
+                return
+            await create_video(
+                story,
+                SubtitleCustomization(**job["subtitle_customization"]),
+                job["video_id"],
+                job["voice_id"],
+                job["formats"],
+                burn_subtitles=job.get("burn_subtitles", False),
+                control=control
+            )
+        finally:
+            watch.cancel()
+            self.running.pop(job["video_id"], None)
+            self.slots.release()
+
+    async def watch(self, video_id: str, control: RenderControl):
+        """Heartbeat the claim and pick up cancels made through any worker."""
+        heartbeat_at = time.monotonic()
+        while True:
+            await asyncio.sleep(RENDER_POLL_SECONDS)
+            job = await db.video_processing.find_one({"video_id": video_id}, {"_id": 0, "cancel_requested": 1})
+            # A running render projects to {}; only a deleted entry comes back as None
+            if job is None or job.get("cancel_requested"):
+                control.cancel()
+                return
+            if time.monotonic() - heartbeat_at >= RENDER_HEARTBEAT_SECONDS:
+                heartbeat_at = time.monotonic()
+                await db.video_processing.update_one(
+                    {"video_id": video_id, "claimed_by": INSTANCE_ID},
+                    {"$set": {"heartbeat_at": datetime.utcnow()}}
+                )
+
+render_worker = RenderWorker()
+
+# Publishing
+PUBLISH_CONCURRENCY = int(os.environ.get("PUBLISH_CONCURRENCY", "4"))
+PUBLISH_MAX_ATTEMPTS = int(os.environ.get("PUBLISH_MAX_ATTEMPTS", "5"))
+PUBLISH_CHUNK_BYTES = int(os.environ.get("PUBLISH_CHUNK_BYTES", str(8 * 1024 * 1024)))
+# How far ahead entries are loaded into the timer heap, and how often the
+# heap is resynced to pick up entries scheduled by other instances
+PUBLISH_HORIZON = timedelta(minutes=10)
+PUBLISH_RESYNC_SECONDS = 60
+# A publishing claim without a heartbeat for this long is taken over
+PUBLISH_CLAIM_TIMEOUT = timedelta(minutes=5)
+# Resumable upload endpoints, e.g. for YouTube
+# https://www.googleapis.com/upload/youtube/v3/videos?uploadType=resumable&part=snippet,status
+# Nothing is uploaded off the machine unless one is configured.
+PUBLISH_UPLOAD_URLS = {
+    "youtube": os.environ.get("YOUTUBE_UPLOAD_URL", ""),
+    "tiktok": os.environ.get("TIKTOK_UPLOAD_URL", ""),
+}
+# The rendered aspect ratio each platform expects
+PUBLISH_FORMATS = {"youtube": "16:9", "tiktok": "9:16"}
+
+def publish_source(video: dict, platform: str) -> str:
+    """The rendered output to upload for a platform, or the default one if that format wasn't rendered."""
+    for output in video.get("outputs") or []:
+        if output["format"] == PUBLISH_FORMATS.get(platform):
+            return output["video_url"]
+    return video["video_url"]
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Mongo hands back naive UTC datetimes; compare everything that way."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class UploadError(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+class ResumableUploader:
+    """Chunked upload over the resumable protocol used by YouTube.
+
+    A session is opened with the video metadata, then the file is sent in
+    Content-Range chunks. After an interruption the server is asked how many
+    bytes it holds (308 + Range) and the upload continues from there.
+    """
+
+    def __init__(self, upload_url: str, api_key: Optional[str]):
+        self.upload_url = upload_url
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    def open_session(self, metadata: dict, size: int) -> str:
+        response = requests.post(
+            self.upload_url,
+            json=metadata,
+            headers={**self.headers, "X-Upload-Content-Length": str(size), "X-Upload-Content-Type": "video/mp4"},
+            timeout=30
+        )
+        self.check(response)
+        return response.headers["Location"]
+
+    def committed_bytes(self, session_url: str, size: int):
+        """Ask the server how much of the file it already has.
+
+        Returns the offset to continue from, and the platform response if
+        the upload had in fact already completed.
+        """
+        response = requests.put(session_url, headers={**self.headers, "Content-Range": f"bytes */{size}"}, timeout=30)
+        if response.status_code == 308:
+            return self.range_end(response), None
+        self.check(response)
+        return size, response.json() if response.content else {}
+
+    def send_chunk(self, session_url: str, data: bytes, offset: int, size: int):
+        """Send one chunk; returns the next offset, or the platform response when done."""
+        end = offset + len(data) - 1
+        response = requests.put(
+            session_url,
+            data=data,
+            headers={**self.headers, "Content-Range": f"bytes {offset}-{end}/{size}"},
+            timeout=120
+        )
+        if response.status_code == 308:
+            return self.range_end(response), None
+        self.check(response)
+        return size, response.json() if response.content else {}
+
+    @staticmethod
+    def range_end(response) -> int:
+        committed = response.headers.get("Range")
+        return int(committed.rsplit("-", 1)[1]) + 1 if committed else 0
+
+    @staticmethod
+    def check(response):
+        if response.status_code >= 500 or response.status_code == 429:
+            raise UploadError(f"Platform returned {response.status_code}", retryable=True)
+        if response.status_code >= 400:
+            raise UploadError(f"Platform returned {response.status_code}: {response.text[:200]}", retryable=False)
+
+class PublishScheduler:
+    """Publishes db.publish_schedule entries when their publish_date arrives.
+
+    Due entries are loaded through the (status, publish_date) index into an
+    in-memory timer heap, so the loop sleeps until the next entry instead of
+    polling. Entries are claimed atomically, so any number of instances can
+    run the scheduler without publishing twice.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.queued = set()
+        self.wakeup = asyncio.Event()
+        self.slots = asyncio.Semaphore(PUBLISH_CONCURRENCY)
+        self.tasks = set()
+
+    def notify(self, entry: dict):
+        self.push(to_utc_naive(entry["publish_date"]), entry["id"])
+        self.wakeup.set()
+
+    def push(self, publish_date: datetime, entry_id: str):
+        if entry_id not in self.queued:
+            self.queued.add(entry_id)
+            heapq.heappush(self.heap, (publish_date, entry_id))
+
+    async def resync(self):
+        now = datetime.utcnow()
+        due = await db.publish_schedule.find(
+            {"$or": [
+                {"status": "scheduled", "publish_date": {"$lte": now + PUBLISH_HORIZON}},
+                {"status": "publishing", "heartbeat_at": {"$lt": now - PUBLISH_CLAIM_TIMEOUT}}
+            ]},
+            {"_id": 0, "id": 1, "publish_date": 1}
+        ).sort("publish_date", 1).to_list(1000)
+        for entry in due:
+            self.push(entry["publish_date"], entry["id"])
+
+    async def run(self):
+        next_resync = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_resync:
+                    await self.resync()
+                    next_resync = time.monotonic() + PUBLISH_RESYNC_SECONDS
+                
+                now = datetime.utcnow()
+                while self.heap and self.heap[0][0] <= now:
+                    _, entry_id = heapq.heappop(self.heap)
+                    self.queued.discard(entry_id)
+                    task = asyncio.create_task(self.publish(entry_id))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                
+                timeout = next_resync - time.monotonic()
+                if self.heap:
+                    timeout = min(timeout, (self.heap[0][0] - datetime.utcnow()).total_seconds())
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=max(0.0, timeout))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Publish scheduler error: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def claim(self, entry_id: str) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await db.publish_schedule.find_one_and_update(
+            {"id": entry_id, "publish_date": {"$lte": now}, "$or": [
+                {"status": "scheduled"},
+                {"status": "publishing", "heartbeat_at": {"$lt": now - PUBLISH_CLAIM_TIMEOUT}}
+            ]},
+            {
+                "$set": {"status": "publishing", "claimed_by": INSTANCE_ID, "claimed_at": now, "heartbeat_at": now},
+                "$push": {"status_history": {"status": "publishing", "at": now, "instance": INSTANCE_ID}}
+            },
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def publish(self, entry_id: str):
+        async with self.slots:
+            entry = await self.claim(entry_id)
+            if not entry:
+                return
+            started = time.perf_counter()
+            try:
+                result = await self.upload(entry)
+                await self.finish(entry_id, "published", started, {"platform_response": result})
+            except Exception as e:
+                PIPELINE_FAILURES.labels("publish").inc()
+                logging.error(f"Publishing {entry_id} to {entry['platform']} failed: {str(e)}")
+                await self.finish(entry_id, "failed", started, {"error": str(e)})
+
+    async def finish(self, entry_id: str, status: str, started: float, fields: dict):
+        now = datetime.utcnow()
+        await db.publish_schedule.update_one(
+            {"id": entry_id, "claimed_by": INSTANCE_ID},
+            {
+                "$set": {"status": status, "completed_at": now, "publish_duration_ms": round((time.perf_counter() - started) * 1000, 3), **fields},
+                "$push": {"status_history": {"status": status, "at": now, "instance": INSTANCE_ID}}
+            }
+        )
+
+    async def upload(self, entry: dict) -> dict:
+        upload_url = PUBLISH_UPLOAD_URLS.get(entry["platform"])
+        if not upload_url:
+            raise UploadError(f"No upload endpoint configured for {entry['platform']}", retryable=False)
+        video = await db.videos.find_one({"id": entry["video_id"]})
+        if not video:
+            raise UploadError("Video not found", retryable=False)
+        settings = await db.settings.find_one({}) or {}
+        uploader = ResumableUploader(upload_url, settings.get(f"{entry['platform']}_api_key"))
+        metadata = {
+            "snippet": {"title": entry["title"], "description": entry["description"]},
+            "status": {"privacyStatus": entry["visibility"]}
+        }
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = await asyncio.to_thread(storage.fetch, publish_source(video, entry["platform"]), Path(temp_dir))
+            size = source.stat().st_size
+            session_url = entry.get("upload_session")
+            offset = None
+            
+            for attempt in range(1, PUBLISH_MAX_ATTEMPTS + 1):
+                try:
+                    if not session_url:
+                        session_url = await asyncio.to_thread(uploader.open_session, metadata, size)
+                        offset = 0
+                        await db.publish_schedule.update_one({"id": entry["id"]}, {"$set": {"upload_session": session_url}})
+                    if offset is None:
+                        # Resuming an earlier session, ours or a dead instance's
+                        offset, result = await asyncio.to_thread(uploader.committed_bytes, session_url, size)
+                        if result is not None:
+                            return result
+                    
+                    with open(source, "rb") as f:
+                        while True:
+                            f.seek(offset)
+                            chunk = f.read(PUBLISH_CHUNK_BYTES) if offset < size else b""
+                            offset, result = await asyncio.to_thread(uploader.send_chunk, session_url, chunk, offset, size)
+                            await db.publish_schedule.update_one(
+                                {"id": entry["id"]},
+                                {"$set": {"uploaded_bytes": offset, "heartbeat_at": datetime.utcnow()}}
+                            )
+                            if result is not None:
+                                return result
+                except (UploadError, requests.RequestException) as e:
+                    retryable = getattr(e, "retryable", True)
+                    if not retryable or attempt == PUBLISH_MAX_ATTEMPTS:
+                        raise
+                    offset = None
+                    delay = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                    logging.warning(f"Upload of {entry['id']} interrupted, resuming in {delay:.1f}s: {str(e)}")
+                    await asyncio.sleep(delay)
+
+publish_scheduler = PublishScheduler()
+
+# Health and readiness
+STARTUP_SECONDS = Gauge("startup_seconds", "Seconds from module import to each startup milestone", ["phase"])
+startup_timings: Dict[str, float] = {}
+media_tools: Dict[str, Optional[str]] = {}
+
+def record_startup(phase: str):
+    startup_timings[phase] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    STARTUP_SECONDS.labels(phase).set(startup_timings[phase])
+
+async def check_readiness() -> Dict[str, str]:
+    checks = {}
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=2)
+        checks["mongo"] = "ok"
+    except Exception as e:
+        checks["mongo"] = f"unreachable: {str(e) or type(e).__name__}"
+    
+    unwritable = [str(directory) for directory in (MEDIA_DIR, IMAGES_DIR, AUDIO_DIR, VIDEOS_DIR) if not os.access(directory, os.W_OK)]
+    checks["media_dirs"] = f"not writable: {', '.join(unwritable)}" if unwritable else "ok"
+    
+    missing = [tool for tool, path in media_tools.items() if not path]
+    checks["ffmpeg"] = f"not found: {', '.join(missing)}" if missing or not media_tools else "ok"
+    
+    checks["provider"] = "ok" if _openai is not None else "initializing"
+    return checks
+
+@api_router.get("/health")
+async def health():
+    # Liveness only: the process is up and serving requests
+    return {"status": "ok"}
+
+@api_router.get("/ready")
+async def ready(response: Response):
+    checks = await check_readiness()
+    is_ready = all(status == "ok" for status in checks.values())
+    if is_ready and "ready" not in startup_timings:
+        record_startup("ready")
+        logging.info(f"Backend ready {startup_timings['ready']}s after import")
+    if not is_ready:
+        response.status_code = 503
+    # An open provider circuit is reported but doesn't take the worker out of
+    # rotation; galleries, uploads and renders don't need the provider
+    return {"ready": is_ready, "checks": checks, "provider_circuits": provider_scheduler.circuit_states(), "startup_seconds": startup_timings}
+
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.middleware("http")
+async def record_request_latency(request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template rather than raw path to keep cardinality bounded
+        route = request.scope.get("route")
+        REQUEST_SECONDS.labels(
+            request.method,
+            route.path if route else "unmatched",
+            str(status)
+        ).observe(time.perf_counter() - start)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -766,6 +3779,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def prepare_runtime():
+    create_media_dirs()
+    for tool in ("ffmpeg", "ffprobe"):
+        media_tools[tool] = shutil.which(tool)
+    # Import the provider client off the event loop so requests are served meanwhile
+    app.state.provider_init = asyncio.create_task(asyncio.to_thread(get_openai))
+
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await db.idempotency.create_index("key", unique=True)
+        await db.idempotency.create_index("expires_at", expireAfterSeconds=0)
+        await db.idempotency.create_index("response.video_id", sparse=True)
+        await db.job_timings.create_index([("created_at", -1)])
+        await db.job_timings.create_index([("kind", 1), ("created_at", -1)])
+        await db.publish_schedule.create_index([("status", 1), ("publish_date", 1)])
+        await db.stories.create_index(
+            [("prompt", "text"), ("story", "text")],
+            weights={"prompt": 5, "story": 1},
+            name="story_text"
+        )
+        await db.stories.create_index("id")
+        await db.stories.create_index([("created_at", -1)])
+        # Filtered searches without keywords, newest first
+        await db.stories.create_index([("duration", 1), ("created_at", -1)])
+        await db.stories.create_index([("style", 1), ("created_at", -1)])
+        await db.stories.create_index([("voice", 1), ("created_at", -1)])
+        await db.stories.create_index([("lsh_bands", 1), ("duration", 1)])
+        await db.videos.create_index("id")
+        await db.videos.create_index([("story_id", 1), ("created_at", -1)])
+        await db.videos.create_index([("created_at", -1)])
+        await db.media.create_index("url", unique=True)
+        await db.media.create_index("sha256")
+        await db.media.create_index("story_ids")
+        await db.media.create_index("video_id")
+        await db.media.create_index("prompt_hash", sparse=True)
+        await db.video_processing.create_index("video_id")
+        await db.video_processing.create_index([("status", 1), ("priority", 1), ("queued_at", 1)])
+    except Exception as e:
+        logging.error(f"Index creation error: {str(e)}")
+
+@app.on_event("startup")
+async def start_background_workers():
+    app.state.media_sweeper = asyncio.create_task(run_media_sweeper())
+    app.state.publish_scheduler = asyncio.create_task(publish_scheduler.run())
+    if RENDER_CONCURRENCY > 0:
+        app.state.render_worker = asyncio.create_task(render_worker.run())
+    record_startup("startup")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.media_sweeper.cancel()
+    app.state.publish_scheduler.cancel()
+    if RENDER_CONCURRENCY > 0:
+        app.state.render_worker.cancel()
     client.close()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+record_startup("import")
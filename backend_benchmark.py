@@ -0,0 +1,660 @@
+"""Offline load-test and benchmark suite for the content generation backend.
+
+Runs entirely on the local machine: a stub generation provider stands in for
+the OpenAI API (the backend is pointed at it through ``OPENAI_BASE_URL``) and
+all data goes to a throwaway database on the local Mongo.
+
+Three suites are available:
+
+* ``api``    - spawns the backend with uvicorn and measures p50/p95/p99 latency
+               and requests per second for every ``/api`` endpoint under
+               concurrent load.
+* ``render`` - runs ``create_video`` in-process for each duration bucket and
+               times each stage (probe, subtitle compositing, encode).
+* ``subtitles`` - times per-frame subtitle compositing for every background
+               and effect combination against the old flat-rectangle draw.
+               Needs neither Mongo nor ffmpeg.
+
+Results are written as JSON so runs can be compared; pass ``--baseline`` with a
+previous results file to fail the run on regressions.
+
+    python backend_benchmark.py --suite all --output bench_results.json
+    python backend_benchmark.py --baseline bench_results.json --threshold 0.15
+    python backend_benchmark.py --suite render --encode-workers 1 --output single_encode.json
+    python backend_benchmark.py --suite subtitles --frames 200 --output subtitles.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / "backend"
+
+# Midpoint of each duration bucket, used for the stub narration length
+DURATION_BUCKETS = {
+    "30-60": 45,
+    "60-90": 75,
+    "90-120": 105,
+}
+
+WORDS_PER_SECOND = 2.5
+
+SUBTITLE_TEXT = "The little robot walked through the quiet city and wondered where everyone had gone."
+
+SUBTITLE_CUSTOMIZATION = {
+    "font": "Arial",
+    "color": "#FFFFFF",
+    "placement": "bottom",
+    "background": "solid",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples, wall_time: float = None) -> dict:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ms = [s * 1000 for s in samples]
+    summary = {
+        "count": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+    if wall_time:
+        summary["rps"] = round(len(ms) / wall_time, 2)
+    return summary
+
+
+def stub_story(seconds: int) -> str:
+    """Deterministic story text long enough to narrate for ``seconds``."""
+    sentence = "The little robot walked through the quiet city and wondered where everyone had gone."
+    words_per_sentence = len(sentence.split())
+    num_sentences = max(1, int(seconds * WORDS_PER_SECOND / words_per_sentence))
+    return " ".join([sentence] * num_sentences)
+
+
+def make_stub_image(path: Path, width: int = 1792, height: int = 1024):
+    from PIL import Image
+
+    # A gradient is a more realistic encode workload than a flat color
+    gradient = Image.linear_gradient("L").resize((width, height))
+    Image.merge("RGB", (gradient, gradient.transpose(Image.FLIP_LEFT_RIGHT), gradient)).save(path)
+
+
+def make_stub_audio(path: Path, seconds: float):
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+            "-b:a", "160k", str(path),
+        ],
+        check=True,
+    )
+
+
+class StubProvider:
+    """Minimal stand-in for the OpenAI endpoints and the resumable upload endpoint the backend calls."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._workdir = tempfile.TemporaryDirectory()
+        self._image_path = Path(self._workdir.name) / "image.png"
+        self._audio_cache = {}
+        self._audio_lock = threading.Lock()
+        make_stub_image(self._image_path)
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._workdir.cleanup()
+
+    def audio_for(self, text: str) -> bytes:
+        seconds = max(1.0, round(len(text.split()) / WORDS_PER_SECOND))
+        with self._audio_lock:
+            if seconds not in self._audio_cache:
+                path = Path(self._workdir.name) / f"speech_{int(seconds)}.mp3"
+                make_stub_audio(path, seconds)
+                self._audio_cache[seconds] = path.read_bytes()
+            return self._audio_cache[seconds]
+
+    def _handler(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body: bytes, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload: dict):
+                self._send(json.dumps(payload).encode(), "application/json")
+
+            def do_GET(self):
+                if self.path.startswith("/files/image.png"):
+                    self._send(provider._image_path.read_bytes(), "image/png")
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if provider.latency:
+                    time.sleep(provider.latency)
+
+                if self.path.endswith("/chat/completions"):
+                    seconds = DURATION_BUCKETS["30-60"]
+                    for bucket, midpoint in DURATION_BUCKETS.items():
+                        if bucket in json.dumps(payload.get("messages", [])):
+                            seconds = midpoint
+                    self._json({
+                        "id": f"chatcmpl-{uuid.uuid4().hex}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": payload.get("model", "gpt-4o"),
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": stub_story(seconds)},
+                        }],
+                        "usage": {"prompt_tokens": 50, "completion_tokens": 300, "total_tokens": 350},
+                    })
+                elif self.path.endswith("/images/generations"):
+                    self._json({
+                        "created": int(time.time()),
+                        "data": [{"url": f"{provider.base_url}/files/image.png"}],
+                    })
+                elif self.path.endswith("/audio/speech"):
+                    self._send(provider.audio_for(payload.get("input", "")), "audio/mpeg")
+                elif self.path.startswith("/upload/"):
+                    # Opens a resumable upload session
+                    self.send_response(200)
+                    self.send_header("Location", f"{provider.base_url}/upload-session/{uuid.uuid4().hex}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                else:
+                    self.send_error(404)
+
+            def do_PUT(self):
+                # Takes the whole file in one chunk and completes the upload
+                if self.path.startswith("/upload-session/"):
+                    self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                    self._json({"id": f"stub-{uuid.uuid4().hex[:8]}"})
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+
+class BackendProcess:
+    """Runs the backend with uvicorn against the stub provider and a scratch database."""
+
+    def __init__(self, provider: StubProvider, db_name: str):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(
+            os.environ,
+            OPENAI_BASE_URL=f"{provider.base_url}/v1",
+            OPENAI_API_KEY="sk-benchmark",
+            # Scheduled publishes upload to the stub, never to the platform
+            YOUTUBE_UPLOAD_URL=f"{provider.base_url}/upload/youtube",
+            DB_NAME=db_name,
+        )
+        self.process = None
+
+    def start(self, timeout: float = 60):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(self.port)],
+            cwd=BACKEND_DIR,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(f"{self.base_url}/api/ready", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("Backend did not become ready")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+
+
+class ApiBenchmark:
+    """Concurrent load against each /api endpoint."""
+
+    def __init__(self, base_url: str, concurrency: int, requests_per_endpoint: int):
+        self.api_url = f"{base_url}/api"
+        self.concurrency = concurrency
+        self.requests_per_endpoint = requests_per_endpoint
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+
+    def call(self, method: str, endpoint: str, data=None, timeout=120):
+        response = self.session.request(method, f"{self.api_url}/{endpoint}", json=data, timeout=timeout)
+        response.raise_for_status()
+        return response.json() if "json" in response.headers.get("content-type", "") else None
+
+    def prepare(self) -> dict:
+        """Create the fixtures every endpoint needs: a user, a story with media and a video."""
+        self.call("POST", "auth", {"password": "1234"})
+        story = self.call("POST", "generate-story", {"prompt": "a lost robot", "duration": "30-60"})
+        images = self.call("POST", "generate-images", {"story_id": story["id"], "style": "cartoon"})
+        voice = self.call("POST", "generate-voice", {"story_id": story["id"], "voice": "alloy"})
+        video = self.call("POST", "generate-video", {
+            "story_id": story["id"],
+            "subtitle_customization": SUBTITLE_CUSTOMIZATION,
+            "voice_id": "alloy",
+        })
+        deadline = time.monotonic() + 300
+        while time.monotonic() < deadline:
+            status = self.call("GET", f"video-status/{video['video_id']}")
+            if status["status"] != "processing":
+                break
+            time.sleep(0.5)
+        return {
+            "story_id": story["id"],
+            "video_id": video["video_id"],
+            "image": images["image_urls"][0].rsplit("/", 1)[-1],
+            "audio": voice["audio_url"].rsplit("/", 1)[-1],
+        }
+
+    def endpoints(self, fixtures: dict) -> list:
+        story_id = fixtures["story_id"]
+        video_id = fixtures["video_id"]
+        return [
+            ("POST /auth", "POST", "auth", {"password": "1234"}),
+            ("GET /settings", "GET", "settings", None),
+            ("POST /settings", "POST", "settings", {"tiktok_api_key": "bench"}),
+            ("GET /videos", "GET", "videos", None),
+            ("GET /video/{id}", "GET", f"video/{video_id}", None),
+            ("GET /video-status/{id}", "GET", f"video-status/{video_id}", None),
+            ("GET /story/{id}", "GET", f"story/{story_id}", None),
+            ("GET /publish-schedule", "GET", "publish-schedule", None),
+            ("POST /publish-video", "POST", "publish-video", {
+                "video_id": video_id,
+                "platform": "youtube",
+                "title": "Benchmark",
+                "description": "Benchmark",
+                "publish_date": datetime.utcnow().isoformat(),
+                "visibility": "private",
+            }),
+            ("GET /media/images/{file}", "GET", f"media/images/{fixtures['image']}", None),
+            ("GET /media/audio/{file}", "GET", f"media/audio/{fixtures['audio']}", None),
+            ("GET /media/videos/{file}", "GET", f"media/videos/{video_id}.mp4", None),
+            ("POST /generate-story", "POST", "generate-story", {"prompt": "a lost robot", "duration": "30-60"}),
+            ("POST /generate-voice", "POST", "generate-voice", {"story_id": story_id, "voice": "alloy"}),
+            ("POST /generate-images", "POST", "generate-images", {"story_id": story_id, "style": "cartoon"}),
+        ]
+
+    def load(self, method: str, endpoint: str, data) -> dict:
+        # A fresh idempotency key per request, so generation endpoints do the
+        # work each time instead of joining a concurrent identical request
+        fresh = endpoint.startswith("generate-")
+
+        def one(_):
+            headers = {"Idempotency-Key": str(uuid.uuid4())} if fresh else None
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, f"{self.api_url}/{endpoint}", json=data, headers=headers, timeout=300)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(one, range(self.requests_per_endpoint)))
+        wall_time = time.perf_counter() - start
+
+        summary = summarize([duration for duration, ok in results if ok], wall_time)
+        summary["errors"] = sum(1 for _, ok in results if not ok)
+        return summary
+
+    def run(self) -> dict:
+        fixtures = self.prepare()
+        results = {}
+        for name, method, endpoint, data in self.endpoints(fixtures):
+            print(f"  {name} ...", flush=True)
+            results[name] = self.load(method, endpoint, data)
+        return results
+
+
+class RenderBenchmark:
+    """Times each stage of create_video for every duration bucket."""
+
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+
+    def run(self) -> dict:
+        sys.path.insert(0, str(BACKEND_DIR))
+        import ffmpeg
+        import server
+
+        server.create_media_dirs()
+
+        stage_samples = {}
+
+        def timed(stage, func):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stage_samples.setdefault(stage, []).append(time.perf_counter() - start)
+            return wrapper
+
+        original_probe = ffmpeg.probe
+        original_subtitle = server.add_subtitle_to_image
+        original_encode = server.encode_video
+        ffmpeg.probe = timed("probe", original_probe)
+        server.add_subtitle_to_image = timed("subtitle_compositing", original_subtitle)
+        server.encode_video = timed("encode", original_encode)
+
+        num_images = {"30-60": 3, "60-90": 5, "90-120": 7}
+        customization = server.SubtitleCustomization(**SUBTITLE_CUSTOMIZATION)
+        results = {}
+        created = []
+        loop = asyncio.new_event_loop()
+        try:
+            for bucket, seconds in DURATION_BUCKETS.items():
+                story_id = f"bench-{uuid.uuid4()}"
+                images = []
+                for i in range(num_images[bucket]):
+                    image_path = server.IMAGES_DIR / f"{story_id}_{i}.png"
+                    make_stub_image(image_path)
+                    created.append(image_path)
+                    images.append(f"/api/media/images/{image_path.name}")
+                audio_path = server.AUDIO_DIR / f"{story_id}.mp3"
+                make_stub_audio(audio_path, seconds)
+                created.append(audio_path)
+
+                story = {
+                    "id": story_id,
+                    "story": stub_story(seconds),
+                    "duration": bucket,
+                    "images": images,
+                    "audio_url": f"/api/media/audio/{audio_path.name}",
+                }
+
+                stage_samples.clear()
+                totals = []
+                for _ in range(self.iterations):
+                    video_id = str(uuid.uuid4())
+                    start = time.perf_counter()
+                    # Burn-in keeps the subtitle compositing stage in the measurements
+                    loop.run_until_complete(server.create_video(story, customization, video_id, "alloy", burn_subtitles=True))
+                    totals.append(time.perf_counter() - start)
+                    output_video = server.VIDEOS_DIR / f"{video_id}.mp4"
+                    if not output_video.exists():
+                        raise RuntimeError(f"create_video produced no output for the {bucket} bucket")
+                    # The render also leaves {video_id}_thumb.jpg and any extra aspect ratios beside it
+                    created.extend(server.VIDEOS_DIR.glob(f"{video_id}*"))
+
+                print(f"  {bucket} ...", flush=True)
+                results[bucket] = {stage: summarize(samples) for stage, samples in stage_samples.items()}
+                results[bucket]["total"] = summarize(totals)
+        finally:
+            ffmpeg.probe = original_probe
+            server.add_subtitle_to_image = original_subtitle
+            server.encode_video = original_encode
+            for path in created:
+                if path.exists():
+                    path.unlink()
+            loop.close()
+        return results
+
+
+def previous_wrap_text(text: str, font, max_width: float) -> str:
+    """The previous wrap_text, which measured every candidate line from scratch."""
+    wrapped_lines = []
+    current_line = []
+    for word in text.split():
+        if font.getlength(" ".join(current_line + [word])) <= max_width:
+            current_line.append(word)
+        elif current_line:
+            wrapped_lines.append(" ".join(current_line))
+            current_line = [word]
+        else:
+            wrapped_lines.append(word)
+    if current_line:
+        wrapped_lines.append(" ".join(current_line))
+    return "\n".join(wrapped_lines)
+
+
+def flat_rectangle_subtitle(img, text: str, customization):
+    """The previous subtitle draw: an opaque box and plain text straight onto the frame."""
+    from PIL import ImageDraw
+    import server
+
+    draw = ImageDraw.Draw(img)
+    font = server.load_subtitle_font(customization.font)
+    wrapped_text = previous_wrap_text(text, font, img.width * 0.8)
+    text_width, text_height = draw.textbbox((0, 0), wrapped_text, font=font)[2:4]
+    position = ((img.width - text_width) / 2, img.height * 0.8 - text_height)
+    if customization.background != "none":
+        draw.rectangle(
+            [position[0] - 10, position[1] - 10, position[0] + text_width + 10, position[1] + text_height + 10],
+            fill=(0, 0, 0, 180),
+        )
+    draw.text(position, wrapped_text, font=font, fill=customization.color)
+    return img
+
+
+class SubtitleBenchmark:
+    """Per-frame cost of subtitle compositing, old flat rectangle vs. the NumPy overlay.
+
+    Every frame gets different subtitle text, as the scenes of a render do, so
+    "composite" is the cost of building and blending a fresh overlay.
+    "composite_repeat" reuses one text and measures the overlay cache (a
+    re-render of the same story). Frames are decoded once up front so the
+    samples cover only the drawing and blending, not PNG encode and decode,
+    which both paths share.
+    """
+
+    def __init__(self, frames: int):
+        self.frames = frames
+
+    def run(self) -> dict:
+        sys.path.insert(0, str(BACKEND_DIR))
+        from PIL import Image
+        import server
+
+        with tempfile.TemporaryDirectory() as tmp:
+            image_path = Path(tmp) / "frame.png"
+            make_stub_image(image_path)
+            frame = Image.open(image_path).convert("RGB")
+            frame.load()
+
+        results = {}
+        for background in ("none", "solid", "gradient"):
+            for effects in ("plain", "outline", "shadow", "outline+shadow"):
+                customization = server.SubtitleCustomization(**{
+                    **SUBTITLE_CUSTOMIZATION,
+                    "background": background,
+                    "outline": "outline" in effects,
+                    "shadow": "shadow" in effects,
+                })
+
+                def flat(text):
+                    flat_rectangle_subtitle(frame.copy(), text, customization)
+
+                def composite(text):
+                    server.composite_subtitle(frame.copy(), server.subtitle_overlay(
+                        frame.width, frame.height, text,
+                        customization.font, customization.color, customization.placement, customization.background,
+                        customization.outline, customization.shadow,
+                    ))
+
+                variant = f"{background}/{effects}"
+                results[variant] = {}
+                runs = (
+                    ("flat_rectangle", flat, True),
+                    ("composite", composite, True),
+                    ("composite_repeat", composite, False),
+                )
+                for label, func, fresh_text in runs:
+                    # Effects the old path can't draw have no flat-rectangle figure to compare to
+                    if label == "flat_rectangle" and effects != "plain":
+                        continue
+                    server.subtitle_overlay.cache_clear()
+                    func(SUBTITLE_TEXT)
+                    samples = []
+                    for i in range(self.frames):
+                        text = f"{SUBTITLE_TEXT} ({variant} {i})" if fresh_text else SUBTITLE_TEXT
+                        start = time.perf_counter()
+                        func(text)
+                        samples.append(time.perf_counter() - start)
+                    results[variant][label] = summarize(samples)
+                print(f"  {variant} ...", flush=True)
+        return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """List of p95 regressions larger than ``threshold`` (a fraction) between two runs."""
+    regressions = []
+    for suite in ("api", "render", "subtitles"):
+        for name, metrics in current.get(suite, {}).items():
+            base_metrics = baseline.get(suite, {}).get(name)
+            if not base_metrics:
+                continue
+            # API results are flat, render and subtitle results are nested per stage
+            pairs = [(name, metrics, base_metrics)] if "p95_ms" in metrics else [
+                (f"{name} {stage}", metrics[stage], base_metrics[stage])
+                for stage in metrics if stage in base_metrics
+            ]
+            for label, now, before in pairs:
+                if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                    regressions.append(
+                        f"{suite}: {label} p95 {before['p95_ms']}ms -> {now['p95_ms']}ms"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=["api", "render", "subtitles", "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--iterations", type=int, default=3, help="renders per duration bucket")
+    parser.add_argument("--frames", type=int, default=100, help="frames per variant for the subtitles suite")
+    parser.add_argument("--encode-workers", type=int, help="parallel encode chunks for the render suite (defaults to the CPU count)")
+    parser.add_argument("--provider-latency", type=float, default=0.0, help="seconds added to each stub provider call")
+    parser.add_argument("--base-url", help="benchmark an already running backend instead of spawning one")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p95 slowdown before failing")
+    args = parser.parse_args()
+
+    load_dotenv(BACKEND_DIR / ".env")
+    db_name = f"benchmark_{uuid.uuid4().hex[:8]}"
+    os.environ["DB_NAME"] = db_name
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    if args.encode_workers:
+        os.environ["ENCODE_WORKERS"] = str(args.encode_workers)
+
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "config": vars(args),
+    }
+
+    provider = StubProvider(latency=args.provider_latency).start()
+    os.environ["OPENAI_BASE_URL"] = f"{provider.base_url}/v1"
+    try:
+        if args.suite in ("api", "all"):
+            print("=== API load ===")
+            backend = None
+            if args.base_url:
+                base_url = args.base_url
+            else:
+                backend = BackendProcess(provider, db_name).start()
+                base_url = backend.base_url
+            try:
+                results["api"] = ApiBenchmark(base_url, args.concurrency, args.requests).run()
+            finally:
+                if backend:
+                    backend.stop()
+
+        if args.suite in ("render", "all"):
+            print("=== Render stages ===")
+            results["render"] = RenderBenchmark(args.iterations).run()
+
+        if args.suite in ("subtitles", "all"):
+            print("=== Subtitle compositing ===")
+            results["subtitles"] = SubtitleBenchmark(args.frames).run()
+    finally:
+        provider.stop()
+        MongoClient(os.environ["MONGO_URL"]).drop_database(db_name)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"\n📊 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"❌ Regression - {regression}")
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,19 +4,66 @@ set -e
 # Start the FastAPI backend
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
-echo "Starting FastAPI backend"
+# Scale-out
+# BACKEND_WORKERS  uvicorn worker processes in this container (default 1).
+#                  Workers share nothing in memory: renders, publishes,
+#                  idempotency and progress live in MongoDB and media in
+#                  MEDIA_STORAGE, so API throughput scales with cores.
+# BACKEND_UPSTREAMS extra API hosts for nginx, e.g. "10.0.0.2:8001 10.0.0.3:8001".
+#                  Run those with BACKEND_ONLY=1, the same MONGO_URL and
+#                  MEDIA_STORAGE=s3 (or a shared media volume).
+# BACKEND_ONLY=1   run just the API workers, without nginx.
+# RENDER_CONCURRENCY renders each worker runs at once; 0 keeps a worker API-only.
+# OpenAI rate limits are token buckets kept in MongoDB, so every worker on
+# every host draws on the one account quota.
+BACKEND_WORKERS=${BACKEND_WORKERS:-1}
+export BACKEND_WORKERS
+
+if [ "$BACKEND_WORKERS" -gt 1 ]; then
+    # Workers write metrics here so /api/metrics can aggregate them
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+echo "Starting FastAPI backend with $BACKEND_WORKERS worker(s)"
 # Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+uvicorn server:app --host 0.0.0.0 --port 8001 --workers "$BACKEND_WORKERS" &
 BACKEND_PID=$!
 
-echo "Waiting for backend to start..."
-sleep 30
+echo "Waiting for backend to become ready..."
+READY_TIMEOUT=${READY_TIMEOUT:-120}
+STARTED_AT=$(date +%s)
+until wget -q -O /dev/null http://127.0.0.1:8001/api/ready; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ $(( $(date +%s) - STARTED_AT )) -ge "$READY_TIMEOUT" ]; then
+        echo "Backend not ready after ${READY_TIMEOUT}s:"
+        wget -q -O - http://127.0.0.1:8001/api/ready 2>/dev/null || true
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 0.5
+done
+echo "Backend ready after $(( $(date +%s) - STARTED_AT ))s"
 
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
+if [ "${BACKEND_ONLY:-0}" = "1" ]; then
+    trap 'kill $BACKEND_PID; exit 0' SIGTERM SIGINT
+    wait $BACKEND_PID
     exit 1
 fi
 
+# Refuse oversized uploads at nginx, with room for the multipart framing
+echo "client_max_body_size $(( ${MAX_UPLOAD_BYTES:-209715200} + 1048576 ));" > /etc/nginx/upload_limit.conf
+
+# nginx upstream pool: the local workers plus any extra hosts
+echo "server 127.0.0.1:8001;" > /etc/nginx/backend_upstreams.conf
+for upstream in $BACKEND_UPSTREAMS; do
+    echo "server $upstream;" >> /etc/nginx/backend_upstreams.conf
+done
+
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
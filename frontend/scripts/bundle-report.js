@@ -0,0 +1,65 @@
+// Reports the size of the production build, split into what the browser
+// needs before the first screen renders (the entrypoints) and the chunks
+// loaded later. Pass --baseline with an earlier report to compare.
+//
+//   yarn build && yarn report:bundle --output bundle-report.json
+//   yarn build && yarn report:bundle --baseline bundle-report.json
+const fs = require("fs");
+const path = require("path");
+const zlib = require("zlib");
+
+const BUILD_DIR = path.join(__dirname, "..", "build");
+
+const argValue = (name) => {
+  const index = process.argv.indexOf(name);
+  return index === -1 ? null : process.argv[index + 1];
+};
+
+const sizeOf = (file) => {
+  const content = fs.readFileSync(path.join(BUILD_DIR, file));
+  return { bytes: content.length, gzip: zlib.gzipSync(content, { level: 9 }).length };
+};
+
+const sum = (files) => files.reduce(
+  (total, file) => ({ bytes: total.bytes + file.bytes, gzip: total.gzip + file.gzip }),
+  { bytes: 0, gzip: 0 }
+);
+
+const kb = (bytes) => `${(bytes / 1024).toFixed(1)} kB`;
+
+const change = (now, before) => {
+  if (!before) return "";
+  const delta = now - before;
+  const pct = before ? ` (${delta > 0 ? "+" : ""}${((delta / before) * 100).toFixed(1)}%)` : "";
+  return `  ${delta > 0 ? "+" : ""}${kb(delta)}${pct}`;
+};
+
+const manifest = JSON.parse(fs.readFileSync(path.join(BUILD_DIR, "asset-manifest.json"), "utf8"));
+const assets = Object.values(manifest.files)
+  .map((file) => file.replace(/^\//, ""))
+  .filter((file) => /\.(js|css)$/.test(file));
+const entrypoints = new Set(manifest.entrypoints);
+
+const files = assets.map((file) => ({ file, initial: entrypoints.has(file), ...sizeOf(file) }));
+const report = {
+  initial: sum(files.filter((file) => file.initial)),
+  total: sum(files),
+  chunks: files.length,
+  files: files.sort((a, b) => b.gzip - a.gzip)
+};
+
+const baselinePath = argValue("--baseline");
+const baseline = baselinePath ? JSON.parse(fs.readFileSync(baselinePath, "utf8")) : null;
+
+console.log(`Initial load: ${kb(report.initial.gzip)} gzip, ${kb(report.initial.bytes)} raw${change(report.initial.gzip, baseline?.initial.gzip)}`);
+console.log(`All chunks:   ${kb(report.total.gzip)} gzip, ${kb(report.total.bytes)} raw${change(report.total.gzip, baseline?.total.gzip)}`);
+console.log(`Chunks:       ${report.chunks}${baseline ? ` (was ${baseline.chunks})` : ""}`);
+console.log("");
+report.files.forEach((file) => {
+  console.log(`${file.initial ? "*" : " "} ${kb(file.gzip).padStart(10)}  ${file.file}`);
+});
+
+const outputPath = argValue("--output");
+if (outputPath) {
+  fs.writeFileSync(outputPath, JSON.stringify(report, null, 2));
+}
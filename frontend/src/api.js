@@ -0,0 +1,26 @@
+import axios from "axios";
+
+export const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+export const API = `${BACKEND_URL}/api`;
+
+// Media comes back either as an API path or as an absolute storage/CDN URL
+export const mediaUrl = (url) => (/^https?:\/\//.test(url) ? url : `${BACKEND_URL}${url}`);
+
+// Video list cards don't need render timings or other bookkeeping fields
+export const VIDEO_LIST_FIELDS = "title,duration,video_url,outputs,thumbnail_url,subtitles.mode,created_at";
+
+// Soft subtitles are served as WebVTT and styled by the browser's player
+export const subtitlesUrl = (videoId) => `${API}/video/${videoId}/subtitles.vtt`;
+
+// Utility function to check authentication
+export const checkAuthenticated = async () => {
+  const password = localStorage.getItem("authPassword");
+  if (!password) return false;
+  
+  try {
+    await axios.post(`${API}/auth`, { password });
+    return true;
+  } catch (error) {
+    return false;
+  }
+};
@@ -0,0 +1,57 @@
+import { useEffect, useRef, useState } from "react";
+import axios from "axios";
+
+// Video player that only attaches its source once it scrolls near the
+// viewport, so a gallery of videos doesn't fetch every file on page load.
+// A subtitles URL adds a WebVTT track, loaded through a blob URL so the
+// video itself doesn't need CORS headers from wherever it is stored.
+const LazyVideo = ({ src, poster, className, subtitles }) => {
+  const [visible, setVisible] = useState(false);
+  const [trackUrl, setTrackUrl] = useState(null);
+  const ref = useRef(null);
+  
+  useEffect(() => {
+    if (visible || !ref.current) return;
+    if (!("IntersectionObserver" in window)) {
+      setVisible(true);
+      return;
+    }
+    const observer = new IntersectionObserver((entries) => {
+      if (entries.some((entry) => entry.isIntersecting)) {
+        setVisible(true);
+        observer.disconnect();
+      }
+    }, { rootMargin: "200px" });
+    observer.observe(ref.current);
+    return () => observer.disconnect();
+  }, [visible]);
+  
+  useEffect(() => {
+    if (!visible || !subtitles) return;
+    let url = null;
+    axios.get(subtitles, { responseType: "text" })
+      .then((response) => {
+        url = URL.createObjectURL(new Blob([response.data], { type: "text/vtt" }));
+        setTrackUrl(url);
+      })
+      .catch((error) => console.error("Error loading subtitles:", error));
+    return () => {
+      if (url) URL.revokeObjectURL(url);
+    };
+  }, [visible, subtitles]);
+  
+  return (
+    <video
+      ref={ref}
+      className={className}
+      controls
+      preload="metadata"
+      src={visible ? src : undefined}
+      poster={poster}
+    >
+      {trackUrl && <track kind="subtitles" src={trackUrl} srcLang="en" label="Subtitles" default />}
+    </video>
+  );
+};
+
+export default LazyVideo;
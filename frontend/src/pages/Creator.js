@@ -0,0 +1,114 @@
+import { lazy, Suspense, useEffect, useState } from "react";
+import StepOne from "./creator/StepOne";
+
+// Steps after the first load on demand; each step fetches the next one in
+// the background so moving forward doesn't wait on the network
+const stepLoaders = {
+  2: () => import("./creator/StepTwo"),
+  3: () => import("./creator/StepThree"),
+  4: () => import("./creator/StepFour"),
+  5: () => import("./creator/StepFive")
+};
+const StepTwo = lazy(stepLoaders[2]);
+const StepThree = lazy(stepLoaders[3]);
+const StepFour = lazy(stepLoaders[4]);
+const StepFive = lazy(stepLoaders[5]);
+
+// Creator Component
+const Creator = () => {
+  const [currentStep, setCurrentStep] = useState(1);
+  const [storyData, setStoryData] = useState(null);
+  const [imageData, setImageData] = useState(null);
+  const [subtitleData, setSubtitleData] = useState(null);
+  const [voiceData, setVoiceData] = useState(null);
+  const [finalVideoData, setFinalVideoData] = useState(null);
+  
+  const handleStoryComplete = (data) => {
+    setStoryData(data);
+    setCurrentStep(2);
+  };
+  
+  const handleImageComplete = (data) => {
+    setImageData(data);
+    setCurrentStep(3);
+  };
+  
+  const handleSubtitleComplete = (data) => {
+    setSubtitleData(data);
+    setCurrentStep(4);
+  };
+  
+  const handleVoiceComplete = (data) => {
+    setVoiceData(data);
+    setCurrentStep(5);
+  };
+  
+  const handleVideoComplete = (data) => {
+    setFinalVideoData(data);
+  };
+  
+  useEffect(() => {
+    stepLoaders[currentStep + 1]?.();
+  }, [currentStep]);
+  
+  const goBack = () => {
+    setCurrentStep(currentStep - 1);
+  };
+  
+  const renderStep = () => {
+    switch (currentStep) {
+      case 1:
+        return <StepOne onComplete={handleStoryComplete} />;
+      case 2:
+        return <StepTwo story={storyData} onComplete={handleImageComplete} onBack={goBack} />;
+      case 3:
+        return <StepThree story={imageData} onComplete={handleSubtitleComplete} onBack={goBack} />;
+      case 4:
+        return <StepFour story={subtitleData} onComplete={handleVoiceComplete} onBack={goBack} />;
+      case 5:
+        return <StepFive story={voiceData} onComplete={handleVideoComplete} onBack={goBack} />;
+      default:
+        return <StepOne onComplete={handleStoryComplete} />;
+    }
+  };
+  
+  return (
+    <div className="bg-gray-900 min-h-screen text-white">
+      <div className="py-6">
+        <div className="max-w-4xl mx-auto px-4">
+          <div className="mb-8">
+            <div className="flex items-center">
+              {[1, 2, 3, 4, 5].map((step) => (
+                <div key={step} className="flex items-center">
+                  <div 
+                    className={`w-10 h-10 rounded-full flex items-center justify-center ${currentStep >= step ? 'bg-blue-600' : 'bg-gray-700'}`}
+                  >
+                    {step}
+                  </div>
+                  {step < 5 && (
+                    <div 
+                      className={`h-1 w-10 mx-1 ${currentStep > step ? 'bg-blue-600' : 'bg-gray-700'}`}
+                    ></div>
+                  )}
+                </div>
+              ))}
+            </div>
+            <div className="flex justify-between mt-2 text-xs text-gray-400">
+              <div>Story</div>
+              <div>Images</div>
+              <div>Subtitles</div>
+              <div>Voice</div>
+              <div>Video</div>
+            </div>
+          </div>
+          
+          <Suspense fallback={<div className="text-center p-8 text-gray-300">Loading...</div>}>
+            {renderStep()}
+          </Suspense>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default Creator;
@@ -0,0 +1,144 @@
+import { useEffect, useState } from "react";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { FaTrash, FaDownload, FaSearch } from "react-icons/fa";
+import { API, mediaUrl, subtitlesUrl, VIDEO_LIST_FIELDS } from "../api";
+import LazyVideo from "../components/LazyVideo";
+
+// Gallery Component
+const Gallery = () => {
+  const [videos, setVideos] = useState([]);
+  const [loading, setLoading] = useState(true);
+  const [query, setQuery] = useState("");
+  const [duration, setDuration] = useState("");
+  
+  const fetchVideos = async (searchQuery = "", searchDuration = "") => {
+    try {
+      if (searchQuery || searchDuration) {
+        // Ranked by the server's text index; each story hit carries its videos
+        const response = await axios.get(`${API}/search`, {
+          params: { q: searchQuery || undefined, duration: searchDuration || undefined, page_size: 50 }
+        });
+        setVideos(response.data.results.flatMap((result) => result.videos));
+      } else {
+        const response = await axios.get(`${API}/videos`, { params: { fields: VIDEO_LIST_FIELDS } });
+        setVideos(response.data);
+      }
+    } catch (error) {
+      console.error("Error fetching videos:", error);
+      toast.error("Failed to fetch videos");
+    } finally {
+      setLoading(false);
+    }
+  };
+  
+  useEffect(() => {
+    fetchVideos();
+  }, []);
+  
+  const handleSearch = (e) => {
+    e.preventDefault();
+    fetchVideos(query.trim(), duration);
+  };
+  
+  const handleDelete = async (videoId) => {
+    if (window.confirm("Are you sure you want to delete this video?")) {
+      try {
+        await axios.delete(`${API}/video/${videoId}`);
+        toast.success("Video deleted successfully");
+        // Update the list
+        setVideos(videos.filter(video => video.id !== videoId));
+      } catch (error) {
+        console.error("Error deleting video:", error);
+        toast.error("Failed to delete video");
+      }
+    }
+  };
+  
+  if (loading) {
+    return <div className="text-center p-8 text-white">Loading videos...</div>;
+  }
+  
+  return (
+    <div className="p-6 bg-gray-900 min-h-screen">
+      <h2 className="text-2xl font-bold mb-6 text-white">Video Gallery</h2>
+      
+      <form onSubmit={handleSearch} className="flex gap-2 mb-6">
+        <input
+          type="text"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder="Search stories and prompts"
+          className="flex-1 p-2 bg-gray-800 border border-gray-700 rounded-md text-white"
+        />
+        <select
+          value={duration}
+          onChange={(e) => setDuration(e.target.value)}
+          className="p-2 bg-gray-800 border border-gray-700 rounded-md text-white"
+        >
+          <option value="">Any length</option>
+          <option value="30-60">30-60s</option>
+          <option value="60-90">60-90s</option>
+          <option value="90-120">90-120s</option>
+        </select>
+        <button type="submit" className="py-2 px-4 bg-blue-600 text-white rounded-md hover:bg-blue-700 flex items-center">
+          <FaSearch className="mr-1" /> Search
+        </button>
+      </form>
+      
+      {videos.length === 0 ? (
+        <div className="text-center p-8 bg-gray-800 rounded-lg">
+          <p className="text-gray-300">No videos yet. Create your first video!</p>
+        </div>
+      ) : (
+        <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+          {videos.map((video) => (
+            <div key={video.id} className="bg-gray-800 rounded-lg overflow-hidden">
+              <LazyVideo
+                className="w-full h-auto"
+                src={mediaUrl(video.video_url)}
+                poster={video.thumbnail_url ? mediaUrl(video.thumbnail_url) : undefined}
+                subtitles={video.subtitles?.mode === "soft" ? subtitlesUrl(video.id) : null}
+              />
+              <div className="p-4">
+                <p className="text-white font-semibold mb-1">{video.title || `Video ${video.id.substring(0, 8)}...`}</p>
+                <p className="text-gray-400 text-sm mb-3">Duration: {video.duration} seconds</p>
+                {video.outputs && video.outputs.length > 1 && (
+                  <div className="flex gap-2 mb-3">
+                    {video.outputs.map((output) => (
+                      <a
+                        key={output.format}
+                        href={mediaUrl(output.video_url)}
+                        download
+                        className="py-1 px-2 bg-gray-700 text-gray-200 text-xs rounded-md hover:bg-gray-600"
+                      >
+                        {output.format}
+                      </a>
+                    ))}
+                  </div>
+                )}
+                <div className="flex justify-between">
+                  <a 
+                    href={mediaUrl(video.video_url)}
+                    download
+                    className="py-1 px-3 bg-blue-600 text-white text-sm rounded-md hover:bg-blue-700 flex items-center"
+                  >
+                    <FaDownload className="mr-1" /> Download
+                  </a>
+                  <button
+                    onClick={() => handleDelete(video.id)}
+                    className="py-1 px-3 bg-red-600 text-white text-sm rounded-md hover:bg-red-700 flex items-center"
+                  >
+                    <FaTrash className="mr-1" /> Delete
+                  </button>
+                </div>
+              </div>
+            </div>
+          ))}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default Gallery;
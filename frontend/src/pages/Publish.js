@@ -0,0 +1,141 @@
+import { useEffect, useState } from "react";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { API, VIDEO_LIST_FIELDS } from "../api";
+
+// Publish Component
+const Publish = () => {
+  const [videos, setVideos] = useState([]);
+  const [loading, setLoading] = useState(true);
+  
+  useEffect(() => {
+    const fetchVideos = async () => {
+      try {
+        const response = await axios.get(`${API}/videos`, { params: { fields: VIDEO_LIST_FIELDS } });
+        setVideos(response.data);
+      } catch (error) {
+        console.error("Error fetching videos:", error);
+        toast.error("Failed to fetch videos");
+      } finally {
+        setLoading(false);
+      }
+    };
+    
+    fetchVideos();
+  }, []);
+  
+  if (loading) {
+    return <div className="text-center p-8 text-white">Loading videos...</div>;
+  }
+  
+  return (
+    <div className="p-6 bg-gray-900 min-h-screen">
+      <h2 className="text-2xl font-bold mb-6 text-white">Publish Schedule</h2>
+      
+      <div className="bg-gray-800 rounded-lg p-6 mb-6">
+        <p className="text-gray-300 mb-4">
+          To enable publishing to TikTok and YouTube, please add your API credentials in the Settings page.
+        </p>
+        
+        <div className="grid grid-cols-1 md:grid-cols-7 gap-1 mb-4">
+          {['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'].map(day => (
+            <div key={day} className="bg-gray-700 p-2 text-center rounded-t-lg font-semibold">
+              {day}
+            </div>
+          ))}
+          
+          {Array.from({ length: 35 }, (_, i) => (
+            <div 
+              key={i} 
+              className="bg-gray-700 border border-gray-600 p-2 min-h-20 relative"
+            >
+              <div className="text-xs text-gray-400">{i + 1}</div>
+              
+              {/* Example scheduled item */}
+              {i === 8 && (
+                <div className="bg-blue-600 p-1 text-xs rounded mt-1">
+                  <div className="font-semibold">Video Title</div>
+                  <div>TikTok</div>
+                </div>
+              )}
+              
+              {i === 15 && (
+                <div className="bg-red-600 p-1 text-xs rounded mt-1">
+                  <div className="font-semibold">Story Video</div>
+                  <div>YouTube</div>
+                </div>
+              )}
+            </div>
+          ))}
+        </div>
+      </div>
+      
+      <div className="bg-gray-800 rounded-lg p-6">
+        <h3 className="text-xl font-semibold mb-4 text-white">Schedule New Publication</h3>
+        
+        <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+          <div>
+            <label className="block text-gray-300 mb-2">Select Video:</label>
+            <select className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600">
+              {videos.map(video => (
+                <option key={video.id} value={video.id}>
+                  {video.title || `Video ${video.id.substring(0, 8)}...`}
+                </option>
+              ))}
+            </select>
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">Platform:</label>
+            <div className="flex space-x-4">
+              <button className="flex-1 p-2 bg-blue-600 rounded-lg">TikTok</button>
+              <button className="flex-1 p-2 bg-gray-700 rounded-lg">YouTube</button>
+            </div>
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">Title:</label>
+            <input 
+              type="text" 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              placeholder="Enter title for the video"
+            />
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">Description:</label>
+            <textarea 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              placeholder="Enter description"
+              rows="3"
+            ></textarea>
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">Publish Date:</label>
+            <input 
+              type="date" 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+            />
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">Visibility:</label>
+            <div className="flex space-x-4">
+              <button className="flex-1 p-2 bg-blue-600 rounded-lg">Public</button>
+              <button className="flex-1 p-2 bg-gray-700 rounded-lg">Private</button>
+            </div>
+          </div>
+        </div>
+        
+        <div className="mt-6">
+          <button className="py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700">
+            Schedule Publication
+          </button>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default Publish;
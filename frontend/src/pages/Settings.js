@@ -0,0 +1,187 @@
+import { useEffect, useState } from "react";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { API } from "../api";
+
+// Settings Component
+const Settings = () => {
+  const [settings, setSettings] = useState({
+    tiktok_api_key: "",
+    youtube_api_key: ""
+  });
+  const [password, setPassword] = useState("");
+  const [newPassword, setNewPassword] = useState("");
+  const [confirmPassword, setConfirmPassword] = useState("");
+  const [loading, setLoading] = useState(true);
+  const [saving, setSaving] = useState(false);
+  
+  useEffect(() => {
+    const fetchSettings = async () => {
+      try {
+        const response = await axios.get(`${API}/settings`);
+        setSettings({
+          tiktok_api_key: response.data.tiktok_api_key || "",
+          youtube_api_key: response.data.youtube_api_key || ""
+        });
+      } catch (error) {
+        console.error("Error fetching settings:", error);
+        toast.error("Failed to fetch settings");
+      } finally {
+        setLoading(false);
+      }
+    };
+    
+    fetchSettings();
+  }, []);
+  
+  const handleApiChange = (e) => {
+    setSettings({
+      ...settings,
+      [e.target.name]: e.target.value
+    });
+  };
+  
+  const saveSettings = async () => {
+    setSaving(true);
+    
+    try {
+      await axios.post(`${API}/settings`, settings);
+      toast.success("Settings saved successfully");
+    } catch (error) {
+      console.error("Error saving settings:", error);
+      toast.error("Failed to save settings");
+    } finally {
+      setSaving(false);
+    }
+  };
+  
+  const changePassword = async () => {
+    if (newPassword !== confirmPassword) {
+      toast.error("New passwords don't match");
+      return;
+    }
+    
+    if (!password || !newPassword) {
+      toast.error("Please fill in all password fields");
+      return;
+    }
+    
+    setSaving(true);
+    
+    try {
+      await axios.post(`${API}/change-password`, {
+        old_password: password,
+        new_password: newPassword
+      });
+      
+      toast.success("Password changed successfully");
+      
+      // Clear fields
+      setPassword("");
+      setNewPassword("");
+      setConfirmPassword("");
+    } catch (error) {
+      console.error("Error changing password:", error);
+      toast.error(error.response?.data?.detail || "Failed to change password");
+    } finally {
+      setSaving(false);
+    }
+  };
+  
+  if (loading) {
+    return <div className="text-center p-8 text-white">Loading settings...</div>;
+  }
+  
+  return (
+    <div className="p-6 bg-gray-900 min-h-screen">
+      <h2 className="text-2xl font-bold mb-6 text-white">Settings</h2>
+      
+      <div className="bg-gray-800 rounded-lg p-6 mb-6">
+        <h3 className="text-xl font-semibold mb-4 text-white">API Credentials</h3>
+        
+        <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+          <div>
+            <label className="block text-gray-300 mb-2">TikTok API Key:</label>
+            <input 
+              type="password" 
+              name="tiktok_api_key"
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              value={settings.tiktok_api_key}
+              onChange={handleApiChange}
+              placeholder="Enter your TikTok API key"
+            />
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">YouTube API Key:</label>
+            <input 
+              type="password" 
+              name="youtube_api_key"
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              value={settings.youtube_api_key}
+              onChange={handleApiChange}
+              placeholder="Enter your YouTube API key"
+            />
+          </div>
+        </div>
+        
+        <button 
+          className={`mt-4 py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700 ${saving ? 'opacity-70 cursor-not-allowed' : ''}`}
+          onClick={saveSettings}
+          disabled={saving}
+        >
+          {saving ? 'Saving...' : 'Save API Keys'}
+        </button>
+      </div>
+      
+      <div className="bg-gray-800 rounded-lg p-6">
+        <h3 className="text-xl font-semibold mb-4 text-white">Change Password</h3>
+        
+        <div className="grid grid-cols-1 gap-4">
+          <div>
+            <label className="block text-gray-300 mb-2">Current Password:</label>
+            <input 
+              type="password" 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              value={password}
+              onChange={(e) => setPassword(e.target.value)}
+              placeholder="Enter your current password"
+            />
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">New Password:</label>
+            <input 
+              type="password" 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              value={newPassword}
+              onChange={(e) => setNewPassword(e.target.value)}
+              placeholder="Enter your new password"
+            />
+          </div>
+          
+          <div>
+            <label className="block text-gray-300 mb-2">Confirm New Password:</label>
+            <input 
+              type="password" 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              value={confirmPassword}
+              onChange={(e) => setConfirmPassword(e.target.value)}
+              placeholder="Confirm your new password"
+            />
+          </div>
+        </div>
+        
+        <button 
+          className={`mt-4 py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700 ${saving ? 'opacity-70 cursor-not-allowed' : ''}`}
+          onClick={changePassword}
+          disabled={saving}
+        >
+          {saving ? 'Changing...' : 'Change Password'}
+        </button>
+      </div>
+    </div>
+  );
+};
+
+export default Settings;
@@ -0,0 +1,217 @@
+import { useEffect, useState } from "react";
+import { useNavigate } from "react-router-dom";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { API } from "../../api";
+
+// Step 5: Final Video Generation
+const StepFive = ({ story, onBack, onComplete }) => {
+  const [isGenerating, setIsGenerating] = useState(false);
+  const [videoStatus, setVideoStatus] = useState(null);
+  const [videoId, setVideoId] = useState(null);
+  const [progress, setProgress] = useState(0);
+  const [formats, setFormats] = useState(["9:16"]);
+  const [burnSubtitles, setBurnSubtitles] = useState(false);
+  const navigate = useNavigate();
+  
+  const outputFormats = [
+    { id: "9:16", name: "Vertical 9:16", description: "TikTok, Shorts, Reels" },
+    { id: "16:9", name: "Landscape 16:9", description: "YouTube" },
+    { id: "1:1", name: "Square 1:1", description: "Feeds" }
+  ];
+  
+  const toggleFormat = (format) => {
+    setFormats((current) => {
+      if (!current.includes(format)) return [...current, format];
+      // At least one output is always rendered
+      return current.length > 1 ? current.filter((f) => f !== format) : current;
+    });
+  };
+  
+  useEffect(() => {
+    // Poll for video status if we have a videoId
+    if (videoId) {
+      const interval = setInterval(async () => {
+        try {
+          const response = await axios.get(`${API}/video-status/${videoId}`);
+          setVideoStatus(response.data.status);
+          
+          if (response.data.status === 'processing' && response.data.progress) {
+            setProgress(response.data.progress);
+          }
+          
+          if (response.data.status === 'completed') {
+            clearInterval(interval);
+            onComplete({
+              ...story,
+              video_url: response.data.video_url,
+              video_id: videoId
+            });
+            toast.success("Video generated successfully!");
+          }
+        } catch (error) {
+          console.error("Error checking video status:", error);
+        }
+      }, 2000);
+      
+      return () => clearInterval(interval);
+    }
+  }, [videoId, onComplete, story]);
+  
+  const handleGenerate = async () => {
+    setIsGenerating(true);
+    
+    try {
+      const response = await axios.post(`${API}/generate-video`, {
+        story_id: story.id,
+        subtitle_customization: {
+          font: story.subtitleOptions.font,
+          color: story.subtitleOptions.color,
+          placement: story.subtitleOptions.placement,
+          background: story.subtitleOptions.background,
+          outline: story.subtitleOptions.outline,
+          shadow: story.subtitleOptions.shadow
+        },
+        voice_id: story.voice,
+        formats,
+        burn_subtitles: burnSubtitles
+      });
+      
+      setVideoId(response.data.video_id);
+      setVideoStatus('processing');
+      toast.info("Video generation started, this may take a few minutes...");
+    } catch (error) {
+      console.error("Error generating video:", error);
+      toast.error(error.response?.data?.detail || "Failed to generate video");
+      setIsGenerating(false);
+    }
+  };
+  
+  const handleCancel = async () => {
+    try {
+      await axios.post(`${API}/video/${videoId}/cancel`);
+      setVideoId(null);
+      setVideoStatus(null);
+      setProgress(0);
+      setIsGenerating(false);
+      toast.info("Video generation cancelled");
+    } catch (error) {
+      console.error("Error cancelling video:", error);
+      toast.error(error.response?.data?.detail || "Failed to cancel video generation");
+    }
+  };
+  
+  const handleViewInGallery = () => {
+    navigate('/gallery');
+  };
+  
+  return (
+    <div className="p-6 max-w-4xl mx-auto">
+      <h2 className="text-2xl font-bold mb-4 text-white">Step 5: Final Video Generation</h2>
+      
+      <div className="bg-gray-800 p-6 rounded-lg mb-6">
+        <h3 className="text-lg font-semibold mb-4 text-white">Summary</h3>
+        
+        <div className="grid grid-cols-1 sm:grid-cols-2 gap-6">
+          <div>
+            <p className="text-gray-300 mb-2"><span className="font-bold">Duration:</span> {story.duration} seconds</p>
+            <p className="text-gray-300 mb-2"><span className="font-bold">Style:</span> {story.style || 'Not specified'}</p>
+            <p className="text-gray-300 mb-2"><span className="font-bold">Voice:</span> {story.voice || 'Not specified'}</p>
+            <p className="text-gray-300 mb-2"><span className="font-bold">Text placement:</span> {story.subtitleOptions?.placement || 'Bottom'}</p>
+          </div>
+          
+          <div>
+            <p className="text-gray-300 mb-2 whitespace-pre-line"><span className="font-bold">Story:</span> {story.story.substring(0, 100)}...</p>
+            {story.images && story.images.length > 0 && (
+              <p className="text-gray-300 mb-2"><span className="font-bold">Images:</span> {story.images.length} images</p>
+            )}
+          </div>
+        </div>
+      </div>
+      
+      <div className="mb-6">
+        <h3 className="text-lg font-semibold mb-4 text-white">Output Formats:</h3>
+        <div className="grid grid-cols-3 gap-4">
+          {outputFormats.map((format) => (
+            <button
+              key={format.id}
+              onClick={() => toggleFormat(format.id)}
+              className={`p-4 rounded-lg text-left ${formats.includes(format.id) ? 'bg-blue-600 border border-blue-500' : 'bg-gray-700 border border-gray-600'}`}
+              disabled={isGenerating}
+            >
+              <div className="font-bold mb-1">{format.name}</div>
+              <div className="text-sm text-gray-300">{format.description}</div>
+            </button>
+          ))}
+        </div>
+        <label className="flex items-center mt-4 text-gray-300">
+          <input
+            type="checkbox"
+            className="mr-2"
+            checked={burnSubtitles}
+            onChange={(e) => setBurnSubtitles(e.target.checked)}
+            disabled={isGenerating}
+          />
+          Burn subtitles into the picture (only for platforms that can't show a subtitle track)
+        </label>
+      </div>
+      
+      {videoStatus === 'processing' && (
+        <div className="mb-6">
+          <h3 className="text-lg font-semibold mb-2 text-white">Processing Video</h3>
+          <div className="w-full bg-gray-700 rounded-full h-4">
+            <div 
+              className="bg-blue-600 h-4 rounded-full"
+              style={{ width: `${progress}%` }}
+            ></div>
+          </div>
+          <p className="text-gray-300 mt-2 text-center">{progress}% complete</p>
+          <div className="flex justify-center mt-4">
+            <button 
+              className="py-2 px-4 bg-red-600 text-white font-semibold rounded-md hover:bg-red-700"
+              onClick={handleCancel}
+            >
+              Cancel
+            </button>
+          </div>
+        </div>
+      )}
+      
+      {videoStatus === 'completed' && (
+        <div className="mb-6">
+          <h3 className="text-lg font-semibold mb-4 text-white">Video Ready!</h3>
+          <div className="flex justify-center">
+            <button 
+              className="py-2 px-4 bg-green-600 text-white font-semibold rounded-md hover:bg-green-700"
+              onClick={handleViewInGallery}
+            >
+              View in Gallery
+            </button>
+          </div>
+        </div>
+      )}
+      
+      <div className="flex justify-between">
+        <button 
+          className="py-2 px-4 bg-gray-700 text-white font-semibold rounded-md hover:bg-gray-600"
+          onClick={onBack}
+          disabled={isGenerating || videoStatus === 'processing' || videoStatus === 'completed'}
+        >
+          Back
+        </button>
+        
+        {!videoStatus && (
+          <button 
+            className={`py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700 ${isGenerating ? 'opacity-70 cursor-not-allowed' : ''}`}
+            onClick={handleGenerate}
+            disabled={isGenerating}
+          >
+            Generate Final Video
+          </button>
+        )}
+      </div>
+    </div>
+  );
+};
+
+export default StepFive;
@@ -0,0 +1,106 @@
+import { useState } from "react";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { API, mediaUrl } from "../../api";
+
+// Step 4: Voice Generation
+const StepFour = ({ story, onComplete, onBack }) => {
+  const [selectedVoice, setSelectedVoice] = useState("alloy");
+  const [isGenerating, setIsGenerating] = useState(false);
+  const [audioPreview, setAudioPreview] = useState(null);
+  
+  const voices = [
+    { id: "alloy", name: "Alloy", description: "Versatile, neutral voice" },
+    { id: "echo", name: "Echo", description: "Deeper, slower, more relaxed voice" },
+    { id: "fable", name: "Fable", description: "Expressive, youthful, storytelling voice" },
+    { id: "onyx", name: "Onyx", description: "Deep, authoritative, wise voice" },
+    { id: "nova", name: "Nova", description: "Energetic, enthusiastic voice" },
+    { id: "shimmer", name: "Shimmer", description: "Clear, professional, supportive voice" }
+  ];
+  
+  const handleGenerate = async () => {
+    setIsGenerating(true);
+    
+    try {
+      const response = await axios.post(`${API}/generate-voice`, {
+        story_id: story.id,
+        voice: selectedVoice
+      });
+      
+      setAudioPreview(mediaUrl(response.data.audio_url));
+      
+      onComplete({
+        ...story,
+        audio_url: response.data.audio_url,
+        voice: selectedVoice
+      });
+      
+      toast.success("Voice generated successfully!");
+    } catch (error) {
+      console.error("Error generating voice:", error);
+      toast.error(error.response?.data?.detail || "Failed to generate voice");
+    } finally {
+      setIsGenerating(false);
+    }
+  };
+  
+  return (
+    <div className="p-6 max-w-4xl mx-auto">
+      <h2 className="text-2xl font-bold mb-4 text-white">Step 4: Voice Selection</h2>
+      
+      <div className="mb-6">
+        <h3 className="text-lg font-semibold mb-4 text-white">Choose a Voice:</h3>
+        <div className="grid grid-cols-2 md:grid-cols-3 gap-4">
+          {voices.map((voice) => (
+            <button
+              key={voice.id}
+              onClick={() => setSelectedVoice(voice.id)}
+              className={`p-4 rounded-lg text-left ${selectedVoice === voice.id ? 'bg-blue-600 border border-blue-500' : 'bg-gray-700 border border-gray-600'}`}
+            >
+              <div className="font-bold mb-1">{voice.name}</div>
+              <div className="text-sm text-gray-300">{voice.description}</div>
+            </button>
+          ))}
+        </div>
+      </div>
+      
+      {audioPreview && (
+        <div className="mb-6">
+          <h3 className="text-lg font-semibold mb-4 text-white">Preview:</h3>
+          <audio controls className="w-full bg-gray-800 rounded-lg">
+            <source src={audioPreview} type="audio/mpeg" />
+            Your browser does not support the audio element.
+          </audio>
+        </div>
+      )}
+      
+      <div className="flex justify-between">
+        <button 
+          className="py-2 px-4 bg-gray-700 text-white font-semibold rounded-md hover:bg-gray-600"
+          onClick={onBack}
+        >
+          Back
+        </button>
+        <div className="flex gap-2">
+          {story.audio_url && !isGenerating && (
+            <button 
+              className="py-2 px-4 bg-gray-700 text-white font-semibold rounded-md hover:bg-gray-600"
+              onClick={() => onComplete(story)}
+            >
+              Use Existing Narration
+            </button>
+          )}
+          <button 
+            className={`py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700 ${isGenerating ? 'opacity-70 cursor-not-allowed' : ''}`}
+            onClick={handleGenerate}
+            disabled={isGenerating}
+          >
+            {isGenerating ? 'Generating Voice...' : 'Generate Voice'}
+          </button>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default StepFour;
@@ -0,0 +1,98 @@
+import { useState } from "react";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { API } from "../../api";
+
+// Step 1: Prompt and Story Generation
+const StepOne = ({ onComplete }) => {
+  const [prompt, setPrompt] = useState("");
+  const [duration, setDuration] = useState("30-60");
+  const [isGenerating, setIsGenerating] = useState(false);
+  
+  const handleGenerate = async () => {
+    if (!prompt.trim()) {
+      toast.error("Please enter a prompt");
+      return;
+    }
+    
+    setIsGenerating(true);
+    
+    try {
+      // Offer an earlier story for a near-identical prompt before writing a new one
+      let reuse = false;
+      const similar = await axios.get(`${API}/similar-story`, { params: { prompt, duration } });
+      const match = similar.data.match;
+      if (match) {
+        const assets = [match.has_images && "images", match.has_audio && "narration"].filter(Boolean).join(" and ");
+        reuse = window.confirm(
+          `A similar story already exists for "${match.prompt}"${assets ? ` with its ${assets}` : ""}. Reuse it instead of writing a new one?`
+        );
+      }
+      
+      const response = await axios.post(`${API}/generate-story`, {
+        prompt: prompt,
+        duration: duration,
+        reuse: reuse
+      });
+      
+      onComplete(response.data);
+      toast.success(response.data.reused ? "Reusing the existing story" : "Story generated successfully!");
+    } catch (error) {
+      console.error("Error generating story:", error);
+      toast.error(error.response?.data?.detail || "Failed to generate story");
+    } finally {
+      setIsGenerating(false);
+    }
+  };
+  
+  return (
+    <div className="p-6 max-w-4xl mx-auto">
+      <h2 className="text-2xl font-bold mb-4 text-white">Step 1: Story Generation</h2>
+      
+      <div className="mb-6">
+        <label className="block text-gray-300 mb-2">Select video duration:</label>
+        <div className="grid grid-cols-3 gap-4">
+          <button 
+            onClick={() => setDuration("30-60")}
+            className={`p-3 rounded-lg border ${duration === "30-60" ? 'bg-blue-600 border-blue-500' : 'bg-gray-700 border-gray-600'}`}
+          >
+            30-60 seconds
+          </button>
+          <button 
+            onClick={() => setDuration("60-90")}
+            className={`p-3 rounded-lg border ${duration === "60-90" ? 'bg-blue-600 border-blue-500' : 'bg-gray-700 border-gray-600'}`}
+          >
+            60-90 seconds
+          </button>
+          <button 
+            onClick={() => setDuration("90-120")}
+            className={`p-3 rounded-lg border ${duration === "90-120" ? 'bg-blue-600 border-blue-500' : 'bg-gray-700 border-gray-600'}`}
+          >
+            90-120 seconds
+          </button>
+        </div>
+      </div>
+      
+      <div className="mb-6">
+        <label className="block text-gray-300 mb-2">Enter your prompt:</label>
+        <textarea 
+          className="w-full p-3 bg-gray-700 text-white rounded-lg border border-gray-600 focus:outline-none focus:border-blue-500"
+          rows="4"
+          placeholder="e.g., a story about a lost cat"
+          value={prompt}
+          onChange={(e) => setPrompt(e.target.value)}
+        ></textarea>
+      </div>
+      
+      <button 
+        className={`py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-blue-500 ${isGenerating ? 'opacity-70 cursor-not-allowed' : ''}`}
+        onClick={handleGenerate}
+        disabled={isGenerating || !prompt.trim()}
+      >
+        {isGenerating ? 'Generating...' : 'Generate Story'}
+      </button>
+    </div>
+  );
+};
+
+export default StepOne;
@@ -0,0 +1,188 @@
+import { useState } from "react";
+import { mediaUrl } from "../../api";
+
+// Step 3: Subtitle and Font Customization
+const StepThree = ({ story, onComplete, onBack }) => {
+  const [subtitleOptions, setSubtitleOptions] = useState({
+    font: "Arial",
+    color: "#FFFFFF",
+    placement: "bottom",
+    background: "solid",
+    outline: false,
+    shadow: false
+  });
+  
+  const fonts = ["Arial", "Verdana", "Courier", "Times New Roman", "Impact"];
+  const placements = ["top", "middle", "bottom"];
+  const backgrounds = [
+    { id: "none", name: "None" },
+    { id: "solid", name: "Solid" },
+    { id: "gradient", name: "Gradient" }
+  ];
+  const effects = [
+    { id: "outline", name: "Outline" },
+    { id: "shadow", name: "Drop Shadow" }
+  ];
+  
+  const handleNext = () => {
+    onComplete({
+      ...story,
+      subtitleOptions
+    });
+  };
+  
+  return (
+    <div className="p-6 max-w-4xl mx-auto">
+      <h2 className="text-2xl font-bold mb-4 text-white">Step 3: Subtitle Customization</h2>
+      
+      <div className="grid grid-cols-1 md:grid-cols-2 gap-6 mb-6">
+        <div>
+          <h3 className="text-lg font-semibold mb-4 text-white">Font Options</h3>
+          
+          <div className="mb-4">
+            <label className="block text-gray-300 mb-2">Font Style:</label>
+            <select 
+              className="w-full p-2 bg-gray-700 text-white rounded-lg border border-gray-600"
+              value={subtitleOptions.font}
+              onChange={(e) => setSubtitleOptions({...subtitleOptions, font: e.target.value})}
+            >
+              {fonts.map(font => (
+                <option key={font} value={font}>{font}</option>
+              ))}
+            </select>
+          </div>
+          
+          <div className="mb-4">
+            <label className="block text-gray-300 mb-2">Text Color:</label>
+            <input 
+              type="color" 
+              className="w-full p-1 h-10 bg-gray-700 rounded-lg border border-gray-600"
+              value={subtitleOptions.color}
+              onChange={(e) => setSubtitleOptions({...subtitleOptions, color: e.target.value})}
+            />
+          </div>
+          
+          <div className="mb-4">
+            <label className="block text-gray-300 mb-2">Text Placement:</label>
+            <div className="grid grid-cols-3 gap-2">
+              {placements.map(placement => (
+                <button
+                  key={placement}
+                  className={`p-2 rounded-lg text-center ${subtitleOptions.placement === placement ? 'bg-blue-600 border-blue-500' : 'bg-gray-700 border-gray-600'}`}
+                  onClick={() => setSubtitleOptions({...subtitleOptions, placement})}
+                >
+                  {placement.charAt(0).toUpperCase() + placement.slice(1)}
+                </button>
+              ))}
+            </div>
+          </div>
+          
+          <div className="mb-4">
+            <label className="block text-gray-300 mb-2">Background Style:</label>
+            <div className="grid grid-cols-3 gap-2">
+              {backgrounds.map(bg => (
+                <button
+                  key={bg.id}
+                  className={`p-2 rounded-lg text-center ${subtitleOptions.background === bg.id ? 'bg-blue-600 border-blue-500' : 'bg-gray-700 border-gray-600'}`}
+                  onClick={() => setSubtitleOptions({...subtitleOptions, background: bg.id})}
+                >
+                  {bg.name}
+                </button>
+              ))}
+            </div>
+          </div>
+          
+          <div className="mb-4">
+            <label className="block text-gray-300 mb-2">Text Effects:</label>
+            <div className="grid grid-cols-2 gap-2">
+              {effects.map(effect => (
+                <button
+                  key={effect.id}
+                  className={`p-2 rounded-lg text-center ${subtitleOptions[effect.id] ? 'bg-blue-600 border-blue-500' : 'bg-gray-700 border-gray-600'}`}
+                  onClick={() => setSubtitleOptions({...subtitleOptions, [effect.id]: !subtitleOptions[effect.id]})}
+                >
+                  {effect.name}
+                </button>
+              ))}
+            </div>
+          </div>
+        </div>
+        
+        <div>
+          <h3 className="text-lg font-semibold mb-4 text-white">Preview</h3>
+          
+          <div className="bg-gray-800 rounded-lg overflow-hidden">
+            {story.images && story.images.length > 0 && (
+              <div className="relative">
+                <img 
+                  src={mediaUrl(story.images[0])} 
+                  alt="Preview" 
+                  className="w-full h-auto"
+                />
+                <div 
+                  className={`absolute p-3 max-w-full ${getPlacementClass(subtitleOptions.placement)}`}
+                  style={{
+                    background: getBackgroundStyle(subtitleOptions.background),
+                    color: subtitleOptions.color,
+                    fontFamily: subtitleOptions.font,
+                    textShadow: getTextShadowStyle(subtitleOptions)
+                  }}
+                >
+                  {story.story.split('.')[0]}...
+                </div>
+              </div>
+            )}
+          </div>
+        </div>
+      </div>
+      
+      <div className="flex justify-between">
+        <button 
+          className="py-2 px-4 bg-gray-700 text-white font-semibold rounded-md hover:bg-gray-600"
+          onClick={onBack}
+        >
+          Back
+        </button>
+        <button 
+          className="py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700"
+          onClick={handleNext}
+        >
+          Next
+        </button>
+      </div>
+    </div>
+  );
+};
+
+// Helper functions for Step Three
+const getPlacementClass = (placement) => {
+  switch (placement) {
+    case 'top': return 'top-0 left-0 right-0';
+    case 'middle': return 'top-1/2 left-0 right-0 -translate-y-1/2';
+    case 'bottom': return 'bottom-0 left-0 right-0';
+    default: return 'bottom-0 left-0 right-0';
+  }
+};
+
+const getBackgroundStyle = (type) => {
+  switch (type) {
+    case 'none': return 'transparent';
+    case 'solid': return 'rgba(0, 0, 0, 0.7)';
+    case 'gradient': return 'linear-gradient(to bottom, rgba(0, 0, 0, 0.16), rgba(0, 0, 0, 0.78))';
+    default: return 'rgba(0, 0, 0, 0.7)';
+  }
+};
+
+// Same look as the rendered outline and drop shadow
+const getTextShadowStyle = ({ outline, shadow }) => {
+  const shadows = [];
+  if (outline) {
+    shadows.push('-2px -2px 0 #000', '2px -2px 0 #000', '-2px 2px 0 #000', '2px 2px 0 #000');
+  }
+  if (shadow) {
+    shadows.push('3px 3px 3px rgba(0, 0, 0, 0.63)');
+  }
+  return shadows.length ? shadows.join(', ') : 'none';
+};
+
+export default StepThree;
@@ -0,0 +1,171 @@
+import { useEffect, useState } from "react";
+import axios from "axios";
+import { toast } from "react-toastify";
+import { API } from "../../api";
+
+// Step 2: Image Style and Generation
+const StepTwo = ({ story, onComplete, onBack }) => {
+  const [selectedStyle, setSelectedStyle] = useState("realistic");
+  const [isGenerating, setIsGenerating] = useState(false);
+  const [progress, setProgress] = useState(0);
+  const [error, setError] = useState(null);
+  
+  const styles = [
+    { id: "realistic", name: "Realistic", description: "Photo-realistic imagery" },
+    { id: "cartoon", name: "Cartoon", description: "Colorful cartoon style" },
+    { id: "lego", name: "Lego", description: "Built with Lego bricks" },
+    { id: "fashion", name: "Fashion", description: "High-fashion editorial" },
+    { id: "painting", name: "Painting", description: "Oil painting style" },
+    { id: "neon", name: "Neon", description: "Cyberpunk neon-lit urban" }
+  ];
+  
+  // Poll for image generation progress
+  useEffect(() => {
+    let interval;
+    
+    if (isGenerating) {
+      interval = setInterval(async () => {
+        try {
+          // Only the progress fields; the story text doesn't change while polling
+          const response = await axios.get(`${API}/story/${story.id}`, {
+            params: { fields: "image_generation_progress,image_generation_complete,images,style" }
+          });
+          if (response.data.image_generation_progress) {
+            setProgress(response.data.image_generation_progress);
+          }
+          
+          if (response.data.image_generation_complete) {
+            clearInterval(interval);
+            setIsGenerating(false);
+            if (response.data.images && response.data.images.length > 0) {
+              onComplete({
+                ...story,
+                images: response.data.images,
+                style: response.data.style
+              });
+              toast.success("Images generated successfully!");
+            }
+          }
+        } catch (error) {
+          console.error("Error checking image generation progress:", error);
+        }
+      }, 2000);
+    }
+    
+    return () => {
+      if (interval) clearInterval(interval);
+    };
+  }, [isGenerating, story.id, onComplete, story]);
+  
+  const handleGenerate = async () => {
+    // After a failure, only regenerate the images that are missing
+    const retrying = error !== null;
+    setIsGenerating(true);
+    setProgress(0);
+    setError(null);
+    
+    try {
+      // Start the image generation process
+      const response = await axios.post(`${API}/generate-images`, {
+        story_id: story.id,
+        style: selectedStyle,
+        resume: retrying
+      });
+      
+      if (response.data.failed_indices && response.data.failed_indices.length > 0) {
+        toast.warning(`${response.data.failed_indices.length} image(s) could not be generated`);
+      }
+      
+      // Polling for progress is handled by the useEffect hook
+      toast.info("Image generation started. This may take a few minutes...");
+    } catch (error) {
+      console.error("Error generating images:", error);
+      setError(error.response?.data?.detail || "Failed to generate images");
+      toast.error(error.response?.data?.detail || "Failed to generate images");
+      setIsGenerating(false);
+    }
+  };
+  
+  return (
+    <div className="p-6 max-w-4xl mx-auto">
+      <h2 className="text-2xl font-bold mb-4 text-white">Step 2: Image Style Selection</h2>
+      
+      <div className="bg-gray-800 p-4 rounded-lg mb-6">
+        <h3 className="text-lg font-semibold mb-2 text-white">Generated Story:</h3>
+        <p className="text-gray-300 whitespace-pre-line">{story.story}</p>
+      </div>
+      
+      <div className="mb-6">
+        <h3 className="text-lg font-semibold mb-4 text-white">Choose Image Style:</h3>
+        <div className="grid grid-cols-3 gap-4">
+          {styles.map((style) => (
+            <button
+              key={style.id}
+              onClick={() => setSelectedStyle(style.id)}
+              className={`p-4 rounded-lg text-left ${selectedStyle === style.id ? 'bg-blue-600 border border-blue-500' : 'bg-gray-700 border border-gray-600'}`}
+              disabled={isGenerating}
+            >
+              <div className="font-bold mb-1">{style.name}</div>
+              <div className="text-sm text-gray-300">{style.description}</div>
+            </button>
+          ))}
+        </div>
+      </div>
+      
+      {isGenerating && (
+        <div className="mb-6">
+          <h3 className="text-lg font-semibold mb-2 text-white">Generating Images...</h3>
+          <div className="w-full bg-gray-700 rounded-full h-4">
+            <div 
+              className="bg-blue-600 h-4 rounded-full pulse"
+              style={{ width: `${progress}%` }}
+            ></div>
+          </div>
+          <p className="text-gray-300 mt-2 text-center">
+            {progress > 0 ? `${Math.round(progress)}% complete` : 'Starting image generation...'}
+          </p>
+          <p className="text-gray-300 mt-2 text-center text-sm">
+            This may take several minutes. DALL-E is creating high-quality images for your story.
+          </p>
+        </div>
+      )}
+      
+      {error && (
+        <div className="mb-6 p-4 bg-red-900 text-white rounded-lg">
+          <h3 className="font-semibold mb-2">Error</h3>
+          <p>{error}</p>
+          <p className="mt-2 text-sm">You can try again with a different style or fewer images.</p>
+        </div>
+      )}
+      
+      <div className="flex justify-between">
+        <button 
+          className="py-2 px-4 bg-gray-700 text-white font-semibold rounded-md hover:bg-gray-600"
+          onClick={onBack}
+          disabled={isGenerating}
+        >
+          Back
+        </button>
+        <div className="flex gap-2">
+          {story.images && story.images.length > 0 && !isGenerating && (
+            <button 
+              className="py-2 px-4 bg-gray-700 text-white font-semibold rounded-md hover:bg-gray-600"
+              onClick={() => onComplete(story)}
+            >
+              Use Existing Images
+            </button>
+          )}
+          <button 
+            className={`py-2 px-4 bg-blue-600 text-white font-semibold rounded-md hover:bg-blue-700 ${isGenerating ? 'opacity-70 cursor-not-allowed' : ''}`}
+            onClick={handleGenerate}
+            disabled={isGenerating}
+          >
+            {isGenerating ? 'Generating Images...' : 'Generate Images'}
+          </button>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default StepTwo;
@@ -0,0 +1,60 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend is a single module that reads its settings on import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Stands in for the server's monotonic and wall clocks so tests move time by hand."""
+    import server
+    
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    monkeypatch.setattr(server.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def db(monkeypatch):
+    """An in-memory database in place of the server's Mongo connection."""
+    from mongomock.collection import Collection
+    from mongomock_motor import AsyncMongoMockClient
+    import server
+    
+    # mongomock looks the document up again by the original filter when the
+    # projection drops _id, so updates that change a filtered field (every
+    # claim) return None; real Mongo returns the document
+    find_and_modify = Collection._find_and_modify
+    
+    def find_by_id_and_modify(self, query, projection=None, update=None, upsert=False, sort=None, *args, **kwargs):
+        found = self.find_one(query, projection={"_id": 1}, sort=sort)
+        return find_and_modify(self, {"_id": found["_id"]} if found else query, projection, update, upsert, sort, *args, **kwargs)
+    
+    monkeypatch.setattr(Collection, "_find_and_modify", find_by_id_and_modify)
+    database = AsyncMongoMockClient()["test_database"]
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+@pytest.fixture
+def media_dir(tmp_path, monkeypatch):
+    """Local media storage in a temporary directory."""
+    import server
+    
+    monkeypatch.setattr(server, "MEDIA_DIR", tmp_path)
+    for name in ("images", "audio", "videos"):
+        monkeypatch.setattr(server, f"{name.upper()}_DIR", tmp_path / name)
+    monkeypatch.setattr(server, "storage", server.LocalMediaStorage())
+    server.create_media_dirs()
+    return tmp_path
@@ -0,0 +1,61 @@
+import pytest
+
+import server
+
+def open_breaker(breaker):
+    for _ in range(server.CIRCUIT_MIN_CALLS):
+        breaker.check()
+        breaker.record(False)
+
+def test_breaker_needs_enough_calls_before_opening(clock):
+    breaker = server.CircuitBreaker("test-model")
+    for _ in range(server.CIRCUIT_MIN_CALLS - 1):
+        breaker.record(False)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open"
+
+def test_breaker_opens_only_at_the_failure_rate(clock):
+    breaker = server.CircuitBreaker("test-model")
+    for i in range(server.CIRCUIT_WINDOW):
+        breaker.record(i % 3 == 0)
+    assert breaker.state == "open"
+    breaker = server.CircuitBreaker("test-model")
+    for i in range(server.CIRCUIT_WINDOW):
+        breaker.record(i % 3 != 0)
+    assert breaker.state == "closed"
+
+def test_open_breaker_fails_fast_until_the_cooldown(clock):
+    breaker = server.CircuitBreaker("test-model")
+    open_breaker(breaker)
+    with pytest.raises(server.ProviderUnavailable):
+        breaker.check()
+    clock.now += server.CIRCUIT_COOLDOWN_SECONDS
+    breaker.check()
+    assert breaker.state == "half_open"
+
+def test_half_open_breaker_lets_one_probe_through(clock):
+    breaker = server.CircuitBreaker("test-model")
+    open_breaker(breaker)
+    clock.now += server.CIRCUIT_COOLDOWN_SECONDS
+    breaker.check()
+    with pytest.raises(server.ProviderUnavailable):
+        breaker.check()
+    # A probe that never reports back is replaced after the cooldown
+    clock.now += server.CIRCUIT_COOLDOWN_SECONDS
+    breaker.check()
+
+def test_probe_result_closes_or_reopens_the_breaker(clock):
+    breaker = server.CircuitBreaker("test-model")
+    open_breaker(breaker)
+    clock.now += server.CIRCUIT_COOLDOWN_SECONDS
+    breaker.check()
+    breaker.record(False)
+    assert breaker.state == "open"
+    clock.now += server.CIRCUIT_COOLDOWN_SECONDS
+    breaker.check()
+    breaker.record(True)
+    assert breaker.state == "closed"
+    # A closed breaker starts counting afresh
+    breaker.record(False)
+    assert breaker.state == "closed"
@@ -0,0 +1,39 @@
+import pytest
+
+import server
+
+@pytest.fixture(autouse=True)
+def workers(monkeypatch):
+    monkeypatch.setattr(server, "ENCODE_WORKERS", 4)
+
+def chunk_lengths(durations, chunks):
+    return [sum(durations[i] for i in chunk) for chunk in chunks]
+
+@pytest.mark.parametrize("durations", [
+    [10] * 12,
+    [5] * 20,
+    [30, 40],
+    [25, 3, 3, 3, 40, 2, 30, 30],
+    [60, 1, 1, 1, 1, 60],
+])
+def test_chunks_keep_scene_order_and_minimum_length(durations):
+    chunks = server.plan_encode_chunks(durations)
+    assert [i for chunk in chunks for i in chunk] == list(range(len(durations)))
+    assert len(chunks) <= server.ENCODE_WORKERS
+    if len(chunks) > 1:
+        assert min(chunk_lengths(durations, chunks)) >= server.ENCODE_CHUNK_MIN_SECONDS
+
+def test_equal_scenes_split_evenly():
+    assert server.plan_encode_chunks([10] * 12) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9, 10, 11]]
+
+def test_short_trailing_scenes_are_merged():
+    # A naive split gives [40], [5], [5]; neither short chunk may stand alone
+    assert server.plan_encode_chunks([40, 5, 5]) == [[0, 1, 2]]
+
+@pytest.mark.parametrize("durations", [[15, 15], [10, 10, 10], [30], []])
+def test_short_videos_are_not_chunked(durations):
+    assert server.plan_encode_chunks(durations) == [list(range(len(durations)))]
+
+def test_single_worker_never_chunks(monkeypatch):
+    monkeypatch.setattr(server, "ENCODE_WORKERS", 1)
+    assert server.plan_encode_chunks([30] * 10) == [list(range(10))]
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+
+def test_no_fields_returns_everything_but_mongo_ids():
+    assert server.field_projection(None) == {"_id": 0}
+
+def test_requested_fields_come_with_the_id():
+    assert server.field_projection("title, video_url,,") == {"_id": 0, "id": 1, "title": 1, "video_url": 1}
+
+def test_mongo_id_is_never_returned():
+    assert server.field_projection("_id,_id.x,title") == {"_id": 0, "id": 1, "title": 1}
+
+def test_overlapping_paths_are_merged():
+    assert server.field_projection("outputs.video_url,outputs,images.url,title,title") == {"_id": 0, "id": 1, "outputs": 1, "images.url": 1, "title": 1}
+    assert server.field_projection("id.x") == {"_id": 0, "id": 1}
+
+@pytest.mark.parametrize("fields", ["$where", "title,$expr", "outputs..url", ".title", "title."])
+def test_invalid_names_are_rejected(fields):
+    with pytest.raises(HTTPException) as error:
+        server.field_projection(fields)
+    assert error.value.status_code == 400
+
+def test_videos_endpoint_selects_fields(db):
+    asyncio.run(db.videos.insert_one({
+        "id": "v1",
+        "title": "Robot",
+        "video_url": "/api/media/videos/v1.mp4",
+        "outputs": [{"format": "9:16", "width": 1080, "height": 1920, "video_url": "/api/media/videos/v1.mp4"}],
+        "created_at": datetime.utcnow(),
+    }))
+    client = TestClient(server.app)
+    
+    response = client.get("/api/videos", params={"fields": "_id,title,outputs,outputs.format"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": "v1", "title": "Robot", "outputs": [{"format": "9:16", "width": 1080, "height": 1920, "video_url": "/api/media/videos/v1.mp4"}]}]
+    assert client.get("/api/videos", params={"fields": "$where"}).status_code == 400
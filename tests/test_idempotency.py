@@ -0,0 +1,159 @@
+import asyncio
+import importlib.util
+from datetime import datetime, timedelta
+
+import prometheus_client
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+@pytest.fixture
+def other_worker(db, monkeypatch):
+    """A second copy of the server module sharing the database, like another API worker process."""
+    # Its metrics would collide with this process's in the default registry
+    monkeypatch.setattr(prometheus_client.REGISTRY, "register", lambda collector: None)
+    spec = importlib.util.spec_from_file_location("server_other_worker", server.__file__)
+    worker = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(worker)
+    worker.db = db
+    return worker
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(server, "IDEMPOTENCY_POLL_SECONDS", 0.01)
+
+def run_counting(runs, name, delay=0.0, result=None):
+    async def run():
+        runs.append(name)
+        await asyncio.sleep(delay)
+        return result or {"run": name}
+    return run
+
+async def create_indexes(db):
+    await db.idempotency.create_index("key", unique=True)
+
+def test_concurrent_duplicates_in_one_worker_run_once(db):
+    runs = []
+    
+    async def main():
+        await create_indexes(db)
+        first, second = Response(), Response()
+        return await asyncio.gather(
+            server.single_flight("generate-story", {"prompt": "robot"}, None, first, run_counting(runs, "A", 0.05)),
+            server.single_flight("generate-story", {"prompt": "robot"}, None, second, run_counting(runs, "B", 0.05)),
+        ), second
+    
+    (a, b), second = asyncio.run(main())
+    assert runs == ["A"]
+    assert a == b == {"run": "A"}
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+def test_concurrent_duplicates_across_workers_run_once(db, other_worker, monkeypatch):
+    monkeypatch.setattr(other_worker, "IDEMPOTENCY_POLL_SECONDS", 0.01)
+    runs = []
+    
+    async def main():
+        await create_indexes(db)
+        
+        async def later():
+            await asyncio.sleep(0.02)
+            return await other_worker.single_flight("generate-story", {"prompt": "robot"}, None, Response(), run_counting(runs, "B"))
+        
+        return await asyncio.gather(
+            server.single_flight("generate-story", {"prompt": "robot"}, None, Response(), run_counting(runs, "A", 0.2)),
+            later(),
+        )
+    
+    a, b = asyncio.run(main())
+    assert runs == ["A"]
+    assert a == b == {"run": "A"}
+
+def test_repeat_without_key_runs_again(db):
+    runs = []
+    
+    async def main():
+        await create_indexes(db)
+        first = await server.single_flight("regenerate-image", {"index": 1}, None, Response(), run_counting(runs, "A"))
+        second = await server.single_flight("regenerate-image", {"index": 1}, None, Response(), run_counting(runs, "B"))
+        return first, second
+    
+    assert asyncio.run(main()) == ({"run": "A"}, {"run": "B"})
+    assert runs == ["A", "B"]
+
+def test_explicit_key_replays_the_completed_result(db):
+    runs = []
+    
+    async def main():
+        await create_indexes(db)
+        await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting(runs, "A"))
+        replay = Response()
+        return await server.single_flight("generate-video", {"story_id": "s"}, "key-1", replay, run_counting(runs, "B")), replay
+    
+    result, replay = asyncio.run(main())
+    assert result == {"run": "A"}
+    assert runs == ["A"]
+    assert replay.headers["Idempotent-Replayed"] == "true"
+
+def test_expired_key_runs_again(db):
+    runs = []
+    
+    async def main():
+        await create_indexes(db)
+        await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting(runs, "A"))
+        await db.idempotency.update_many({}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+        return await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting(runs, "B"))
+    
+    assert asyncio.run(main()) == {"run": "B"}
+
+def test_key_reused_with_other_parameters_is_rejected(db):
+    async def main():
+        await create_indexes(db)
+        await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting([], "A"))
+        await server.single_flight("generate-video", {"story_id": "t"}, "key-1", Response(), run_counting([], "B"))
+    
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main())
+    assert error.value.status_code == 422
+
+def test_failures_are_not_stored(db):
+    runs = []
+    
+    async def fail():
+        runs.append("A")
+        raise ValueError("provider down")
+    
+    async def main():
+        await create_indexes(db)
+        with pytest.raises(ValueError):
+            await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), fail)
+        assert await db.idempotency.count_documents({}) == 0
+        return await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting(runs, "B"))
+    
+    assert asyncio.run(main()) == {"run": "B"}
+    assert runs == ["A", "B"]
+
+def test_forgotten_video_is_not_replayed(db):
+    runs = []
+    
+    async def main():
+        await create_indexes(db)
+        await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting(runs, "A", result={"video_id": "v1"}))
+        await server.forget_video_request("v1")
+        return await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting(runs, "B"))
+    
+    assert asyncio.run(main()) == {"run": "B"}
+
+def test_abandoned_claim_is_taken_over(db):
+    async def main():
+        await create_indexes(db)
+        params_hash = server.hashlib.sha256(server.json.dumps({"story_id": "s"}, sort_keys=True).encode()).hexdigest()
+        await db.idempotency.insert_one({
+            "key": "generate-video:key-1",
+            "params_hash": params_hash,
+            "status": "in_progress",
+            "expires_at": datetime.utcnow() - timedelta(seconds=1)
+        })
+        return await server.single_flight("generate-video", {"story_id": "s"}, "key-1", Response(), run_counting([], "A"))
+    
+    assert asyncio.run(main()) == {"run": "A"}
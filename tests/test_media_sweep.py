@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+HOUR = 3600
+
+def media_file(media_dir, url, size=100, age=2 * HOUR):
+    path = media_dir / url.replace(server.MEDIA_URL_PREFIX, "")
+    path.write_bytes(b"x" * size)
+    modified = time.time() - age
+    os.utime(path, (modified, modified))
+    return url
+
+def story(story_id, images=(), audio_url=None, days_old=0):
+    return {
+        "id": story_id,
+        "story": "A robot walks home.",
+        "duration": "30-60",
+        "images": list(images),
+        "image_segments": [{"index": i, "status": "done", "image_url": url} for i, url in enumerate(images)],
+        "image_generation_complete": bool(images),
+        "audio_url": audio_url,
+        "created_at": datetime.utcnow() - timedelta(days=days_old),
+    }
+
+def video(video_id, story_id):
+    return {"id": video_id, "story_id": story_id, "video_url": f"/api/media/videos/{video_id}.mp4", "outputs": []}
+
+def sweep(dry_run=False):
+    return asyncio.run(server.sweep_media(dry_run=dry_run))
+
+def urls(report, bucket):
+    return {item["url"] for item in report[bucket]}
+
+@pytest.fixture
+def quota(monkeypatch):
+    def set_quota(size):
+        monkeypatch.setattr(server, "MEDIA_QUOTA_BYTES", size)
+    set_quota(0)
+    return set_quota
+
+def test_orphans_are_removed_after_the_grace_period(db, media_dir, quota):
+    old = media_file(media_dir, "/api/media/images/old.png")
+    fresh = media_file(media_dir, "/api/media/images/fresh.png", age=60)
+    
+    report = sweep()
+    assert urls(report, "orphans") == {old}
+    assert not (media_dir / "images/old.png").exists()
+    assert (media_dir / "images/fresh.png").exists()
+
+def test_dry_run_touches_nothing(db, media_dir, quota):
+    media_file(media_dir, "/api/media/images/old.png")
+    asyncio.run(db.stories.insert_one(story("abandoned", days_old=90)))
+    
+    report = sweep(dry_run=True)
+    assert report["orphans"] and report["abandoned_stories"] == ["abandoned"]
+    assert (media_dir / "images/old.png").exists()
+    assert asyncio.run(db.stories.count_documents({})) == 1
+
+def test_abandoned_story_keeps_uploads_another_story_uses(db, media_dir, quota):
+    shared = media_file(media_dir, "/api/media/images/upload_abc.png")
+    own = media_file(media_dir, "/api/media/images/own.png")
+    asyncio.run(db.stories.insert_many([story("abandoned", [shared, own], days_old=90), story("live", [shared])]))
+    
+    report = sweep()
+    assert report["abandoned_stories"] == ["abandoned"]
+    assert urls(report, "abandoned_media") == {own}
+    assert (media_dir / "images/upload_abc.png").exists()
+    assert asyncio.run(db.stories.find_one({"id": "abandoned"})) is None
+
+def test_failed_render_leftovers_are_removed(db, media_dir, quota):
+    leftover = media_file(media_dir, "/api/media/videos/v1_16x9.mp4", age=60)
+    asyncio.run(db.video_processing.insert_many([
+        {"video_id": "v1", "story_id": "s", "status": "failed", "started_at": datetime.utcnow() - timedelta(days=3)},
+        {"video_id": "v2", "story_id": "s", "status": "queued", "queued_at": datetime.utcnow() - timedelta(days=3)},
+    ]))
+    
+    report = sweep()
+    assert report["failed_jobs"] == ["v1"]
+    assert urls(report, "orphans") == {leftover}
+    assert asyncio.run(db.video_processing.distinct("video_id")) == ["v2"]
+
+def test_eviction_frees_least_recently_used_intermediates_of_rendered_stories(db, media_dir, quota):
+    older = media_file(media_dir, "/api/media/images/older.png", age=5 * HOUR)
+    newer = media_file(media_dir, "/api/media/images/newer.png", age=3 * HOUR)
+    audio = media_file(media_dir, "/api/media/audio/s_1.mp3", age=4 * HOUR)
+    media_file(media_dir, "/api/media/videos/v1.mp4", size=1000)
+    asyncio.run(db.stories.insert_one(story("s", [older, newer], audio)))
+    asyncio.run(db.videos.insert_one(video("v1", "s")))
+    quota(1150)
+    
+    report = sweep()
+    assert urls(report, "evicted") == {older, audio}
+    assert report["usage_bytes_after"] == 1100
+    
+    rendered = asyncio.run(db.stories.find_one({"id": "s"}))
+    assert rendered["images"] == []
+    assert [state["status"] for state in rendered["image_segments"]] == ["pending", "done"]
+    assert rendered["image_segments"][0]["image_url"] is None
+    assert rendered["image_generation_complete"] is False
+    assert rendered["image_generation_progress"] == 50
+    assert "audio_url" not in rendered
+    assert rendered["media_evicted_at"]
+
+def test_eviction_skips_files_a_story_without_a_video_shares(db, media_dir, quota):
+    # The image cache hands the same file to every story with the same prompt
+    shared = media_file(media_dir, "/api/media/images/cached.png", age=5 * HOUR)
+    own = media_file(media_dir, "/api/media/images/own.png", age=4 * HOUR)
+    asyncio.run(db.stories.insert_many([story("rendered", [shared, own]), story("draft", [shared])]))
+    asyncio.run(db.videos.insert_one(video("v1", "rendered")))
+    quota(1)
+    
+    report = sweep()
+    assert urls(report, "evicted") == {own}
+    assert asyncio.run(db.stories.find_one({"id": "draft"}))["images"] == [shared]
+
+def test_eviction_skips_stories_with_a_render_in_progress(db, media_dir, quota):
+    image = media_file(media_dir, "/api/media/images/busy.png")
+    asyncio.run(db.stories.insert_one(story("s", [image])))
+    asyncio.run(db.videos.insert_one(video("v1", "s")))
+    asyncio.run(db.video_processing.insert_one({"video_id": "v2", "story_id": "s", "status": "queued"}))
+    quota(1)
+    
+    assert sweep()["evicted"] == []
+
+def test_uploads_are_never_evicted(db, media_dir, quota):
+    upload = media_file(media_dir, "/api/media/images/upload_abc.png")
+    asyncio.run(db.stories.insert_one(story("s", [upload])))
+    asyncio.run(db.videos.insert_one(video("v1", "s")))
+    quota(1)
+    
+    assert sweep()["evicted"] == []
+
+def test_evicted_story_cannot_be_rendered_or_reused_with_dead_media(db, media_dir, quota):
+    image = media_file(media_dir, "/api/media/images/a.png")
+    audio = media_file(media_dir, "/api/media/audio/s_1.mp3")
+    signature = server.minhash_signature("A robot walks home")
+    asyncio.run(db.stories.insert_one({**story("s", [image], audio), "minhash": signature, "lsh_bands": server.lsh_bands(signature)}))
+    asyncio.run(db.videos.insert_one(video("v1", "s")))
+    quota(1)
+    sweep()
+    
+    request = server.VideoGenerationRequest(story_id="s", subtitle_customization={"font": "Arial", "color": "white", "placement": "bottom", "background": "solid"}, voice_id="alloy")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.start_video_generation(request))
+    assert error.value.status_code == 400
+    assert "evicted" in error.value.detail
+    
+    match = asyncio.run(server.get_similar_story("A robot walks home", "30-60"))["match"]
+    assert match["id"] == "s"
+    assert not match["has_images"] and not match["has_audio"]
@@ -0,0 +1,47 @@
+import hashlib
+import random
+
+import server
+
+def test_shingles_ignore_case_punctuation_and_filler_words():
+    assert server.prompt_shingles("A robot, who LOVES the sea!") == server.prompt_shingles("robot loves sea")
+
+def test_short_prompt_is_one_shingle():
+    assert server.prompt_shingles("cat") == {"cat"}
+
+def test_signature_is_deterministic():
+    signature = server.minhash_signature("A lonely robot explores an abandoned city")
+    assert len(signature) == server.MINHASH_PERMUTATIONS
+    assert signature == server.minhash_signature("A lonely robot explores an abandoned city")
+
+def test_signature_matches_the_plain_integer_definition():
+    # Stored signatures were computed with Python ints; the vectorised version must agree
+    def reference(prompt):
+        hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "big") for shingle in server.prompt_shingles(prompt)]
+        return [min((a * h + b) % server.MINHASH_PRIME for h in hashes) for a, b in server.MINHASH_COEFFICIENTS]
+    
+    rng = random.Random(7)
+    words = "lonely robot explores abandoned city night pirates buried treasure tropical island".split()
+    prompts = ["", "cat"] + [" ".join(rng.choice(words) + str(rng.randrange(100)) for _ in range(rng.randint(1, 40))) for _ in range(200)]
+    for prompt in prompts:
+        assert server.minhash_signature(prompt) == reference(prompt)
+
+def test_similar_prompts_score_higher_than_unrelated_ones():
+    base = server.minhash_signature("A lonely robot explores an abandoned city at night")
+    near = server.minhash_signature("The lonely robot that explores the abandoned city at night")
+    far = server.minhash_signature("Two pirates argue about buried treasure on a tropical island")
+    assert server.signature_similarity(base, near) == 1.0
+    assert server.signature_similarity(base, far) < 0.2
+
+def test_similar_prompts_share_an_lsh_band():
+    a = server.lsh_bands(server.minhash_signature("A lonely robot explores an abandoned city at night"))
+    b = server.lsh_bands(server.minhash_signature("A lonely robot explores an abandoned town at night"))
+    c = server.lsh_bands(server.minhash_signature("Two pirates argue about buried treasure on a tropical island"))
+    assert len(a) == server.LSH_BANDS
+    assert set(a) & set(b)
+    assert not set(a) & set(c)
+
+def test_bands_are_keyed_by_position():
+    # The same rows in different bands must not collide
+    bands = server.lsh_bands([7] * server.MINHASH_PERMUTATIONS)
+    assert len(set(bands)) == server.LSH_BANDS
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+class UploadPlatform(ThreadingHTTPServer):
+    """The resumable upload protocol, as YouTube speaks it, over one session."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), UploadHandler)
+        self.received = bytearray()
+        self.sessions = 0
+        self.fail_chunks = []  # statuses returned, in order, instead of storing chunks
+        self.metadata = None
+
+    @property
+    def upload_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/upload"
+
+class UploadHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, headers=None, body=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        platform = self.server
+        platform.metadata = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        platform.sessions += 1
+        self.reply(200, {"Location": f"http://127.0.0.1:{platform.server_address[1]}/session"})
+
+    def do_PUT(self):
+        platform = self.server
+        data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status = re.fullmatch(r"bytes \*/(\d+)", self.headers["Content-Range"])
+        if status:
+            size = int(status.group(1))
+        else:
+            start, end, size = map(int, re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", self.headers["Content-Range"]).groups())
+            if platform.fail_chunks:
+                return self.reply(platform.fail_chunks.pop(0))
+            platform.received[start:end + 1] = data
+        if len(platform.received) >= size:
+            return self.reply(200, body={"id": "platform-video"})
+        headers = {"Range": f"bytes=0-{len(platform.received) - 1}"} if platform.received else {}
+        self.reply(308, headers)
+
+@pytest.fixture
+def platform(monkeypatch):
+    platform = UploadPlatform()
+    thread = threading.Thread(target=platform.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(server, "PUBLISH_UPLOAD_URLS", {"youtube": platform.upload_url, "tiktok": ""})
+    monkeypatch.setattr(server, "PUBLISH_CHUNK_BYTES", 1000)
+    monkeypatch.setattr(server, "BACKOFF_BASE_SECONDS", 0.001)
+    yield platform
+    platform.shutdown()
+    platform.server_close()
+
+@pytest.fixture
+def rendered_video(db, media_dir):
+    (media_dir / "videos/v1.mp4").write_bytes(b"p" * 1500)
+    (media_dir / "videos/v1_16x9.mp4").write_bytes(bytes(range(256)) * 14)
+    asyncio.run(db.videos.insert_one({
+        "id": "v1",
+        "story_id": "s",
+        "video_url": "/api/media/videos/v1.mp4",
+        "outputs": [
+            {"format": "9:16", "width": 1080, "height": 1920, "video_url": "/api/media/videos/v1.mp4"},
+            {"format": "16:9", "width": 1920, "height": 1080, "video_url": "/api/media/videos/v1_16x9.mp4"},
+        ],
+    }))
+    return media_dir
+
+def schedule(db, entry_id="p1", publish_date=None, **fields):
+    entry = {
+        "id": entry_id,
+        "video_id": "v1",
+        "platform": "youtube",
+        "title": "Robot",
+        "description": "A robot walks home",
+        "visibility": "private",
+        "publish_date": publish_date or datetime.utcnow() - timedelta(seconds=1),
+        "status": "scheduled",
+        **fields,
+    }
+    asyncio.run(db.publish_schedule.insert_one(entry))
+    return entry
+
+def publish(entry_id="p1"):
+    asyncio.run(server.PublishScheduler().publish(entry_id))
+
+def entry(db, entry_id="p1"):
+    return asyncio.run(db.publish_schedule.find_one({"id": entry_id}, {"_id": 0}))
+
+def test_unconfigured_platform_is_rejected(db, platform):
+    request = server.PublishRequest(
+        video_id="v1", platform="tiktok", title="Robot", description="", publish_date=datetime.utcnow(), visibility="public"
+    )
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.publish_video(request))
+    assert error.value.status_code == 400
+
+def test_publish_uploads_the_platforms_format_in_chunks(db, platform, rendered_video):
+    schedule(db)
+    publish()
+    
+    published = entry(db)
+    assert published["status"] == "published"
+    assert published["platform_response"] == {"id": "platform-video"}
+    assert published["uploaded_bytes"] == 3584
+    assert [change["status"] for change in published["status_history"]] == ["publishing", "published"]
+    assert bytes(platform.received) == (rendered_video / "videos/v1_16x9.mp4").read_bytes()
+    assert platform.metadata == {"snippet": {"title": "Robot", "description": "A robot walks home"}, "status": {"privacyStatus": "private"}}
+
+def test_interrupted_upload_resumes_where_the_platform_stopped(db, platform, rendered_video):
+    platform.fail_chunks = [503, 429]
+    schedule(db)
+    publish()
+    
+    assert entry(db)["status"] == "published"
+    assert platform.sessions == 1
+    assert bytes(platform.received) == (rendered_video / "videos/v1_16x9.mp4").read_bytes()
+
+def test_rejected_upload_fails_without_retrying(db, platform, rendered_video):
+    platform.fail_chunks = [403, 403]
+    schedule(db)
+    publish()
+    
+    failed = entry(db)
+    assert failed["status"] == "failed"
+    assert "403" in failed["error"]
+    assert platform.fail_chunks == [403]
+
+def test_entries_are_not_published_early_or_twice(db, platform, rendered_video):
+    schedule(db, "future", publish_date=datetime.utcnow() + timedelta(hours=1))
+    schedule(db, "claimed", status="publishing", claimed_by="another-worker", heartbeat_at=datetime.utcnow())
+    publish("future")
+    publish("claimed")
+    
+    assert entry(db, "future")["status"] == "scheduled"
+    assert entry(db, "claimed")["claimed_by"] == "another-worker"
+    assert platform.sessions == 0
+
+def test_abandoned_claim_is_taken_over(db, platform, rendered_video):
+    stale = datetime.utcnow() - server.PUBLISH_CLAIM_TIMEOUT - timedelta(seconds=1)
+    schedule(db, status="publishing", claimed_by="dead-worker", heartbeat_at=stale)
+    publish()
+    
+    assert entry(db)["status"] == "published"
+    assert entry(db)["claimed_by"] == server.INSTANCE_ID
+
+def test_resync_loads_due_entries_in_order(db):
+    now = datetime.utcnow()
+    schedule(db, "later", publish_date=now + timedelta(minutes=5))
+    schedule(db, "sooner", publish_date=now + timedelta(minutes=1))
+    schedule(db, "far", publish_date=now + timedelta(days=1))
+    scheduler = server.PublishScheduler()
+    asyncio.run(scheduler.resync())
+    
+    assert [entry_id for _, entry_id in sorted(scheduler.heap)] == ["sooner", "later"]
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+import server
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_bucket_waits_exactly_until_refilled(db, clock):
+    bucket = server.TokenBucket("test:requests", 60)
+    assert run(bucket.take(60)) == 0
+    assert run(bucket.take(1)) == pytest.approx(1)
+    clock.now += 0.5
+    assert run(bucket.take(1)) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert run(bucket.take(1)) == 0
+
+def test_bucket_never_refills_past_capacity(db, clock):
+    bucket = server.TokenBucket("test:requests", 60)
+    run(bucket.take(30))
+    clock.now += 3600
+    assert run(bucket.take(60)) == 0
+    assert run(bucket.take(1)) == pytest.approx(1)
+
+def test_oversized_request_waits_for_a_full_bucket_only(db, clock):
+    bucket = server.TokenBucket("test:tokens", 60)
+    run(bucket.take(10))
+    assert run(bucket.take(1000)) == pytest.approx(10)
+
+def test_short_bucket_takes_nothing(db, clock):
+    bucket = server.TokenBucket("test:requests", 60)
+    run(bucket.take(50))
+    assert run(bucket.take(20)) > 0
+    assert run(bucket.take(10)) == 0
+
+def test_bucket_follows_provider_when_it_reports_less(db, clock):
+    bucket = server.TokenBucket("test:requests", 60)
+    run(bucket.sync(20, None))
+    run(bucket.sync(50, None))
+    assert run(bucket.take(21)) == pytest.approx(1)
+    assert run(bucket.take(20)) == 0
+
+def test_exhausted_provider_budget_waits_for_the_reset(db, clock):
+    bucket = server.TokenBucket("test:requests", 60)
+    run(bucket.sync(0, 6))
+    assert run(bucket.take(1)) == pytest.approx(7)
+
+def test_workers_share_one_quota(db, clock):
+    # Two workers' limiters for the same model draw on the same buckets
+    first = server.ModelLimiter("dall-e-3", rpm=5, tpm=0, concurrency=5)
+    second = server.ModelLimiter("dall-e-3", rpm=5, tpm=0, concurrency=5)
+    
+    async def main():
+        await first.acquire(0)
+        await first.acquire(0)
+        await first.acquire(0)
+        taken = [await second.try_acquire(0) for _ in range(3)]
+        return taken
+    
+    assert run(main()) == [True, True, False]
+
+def test_one_busy_worker_gets_the_whole_quota(db, clock):
+    limiter = server.ModelLimiter("dall-e-3", rpm=5, tpm=0, concurrency=5)
+    for _ in range(5):
+        assert run(limiter.take_budget(0)) == 0
+    assert run(limiter.take_budget(0)) == pytest.approx(12)
+
+def test_request_is_given_back_when_tokens_are_short(db, clock):
+    limiter = server.ModelLimiter("test-model", rpm=60, tpm=1000, concurrency=4)
+    assert run(limiter.take_budget(800)) == 0
+    assert run(limiter.take_budget(800)) > 0
+    assert run(limiter.requests.take(59)) == 0
+
+@pytest.mark.parametrize("value, seconds", [("1s", 1), ("6m0s", 360), ("250ms", 0.25), ("1h2m", 3720), ("soon", None)])
+def test_reset_durations(value, seconds):
+    assert server.parse_reset_duration(value) == seconds
+
+def test_concurrency_halves_on_throttle_and_grows_back_slowly(db):
+    limiter = server.ModelLimiter("test-model", rpm=0, tpm=0, concurrency=8)
+    
+    async def finish(throttled):
+        await limiter.acquire(0)
+        await limiter.release(throttled)
+    
+    run(finish(True))
+    assert limiter.limit == 4
+    run(finish(True))
+    run(finish(True))
+    run(finish(True))
+    assert limiter.limit == 1
+    # Additive increase: about one slot per limit's worth of successes
+    for _ in range(3):
+        run(finish(False))
+    assert 2 < limiter.limit < 3
+    for _ in range(100):
+        run(finish(False))
+    assert limiter.limit == 8
+
+def test_try_acquire_respects_the_concurrency_limit(db, clock):
+    limiter = server.ModelLimiter("test-model", rpm=0, tpm=0, concurrency=2)
+    assert run(limiter.try_acquire(0))
+    assert run(limiter.try_acquire(0))
+    assert not run(limiter.try_acquire(0))
+
+def test_try_acquire_respects_the_token_budget(db, clock):
+    limiter = server.ModelLimiter("test-model", rpm=60, tpm=1000, concurrency=4)
+    assert run(limiter.try_acquire(800))
+    assert not run(limiter.try_acquire(800))
+    assert limiter.in_flight == 1
+
+def test_limiter_syncs_rate_limit_headers(db, clock):
+    limiter = server.ModelLimiter("test-model", rpm=60, tpm=1000, concurrency=4)
+    run(limiter.sync_headers({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s", "x-ratelimit-remaining-tokens": "100"}))
+    assert run(limiter.requests.take(1)) == pytest.approx(3)
+    assert run(limiter.tokens.take(101)) == pytest.approx(0.06)
+
+def test_rate_limits_are_not_split_across_workers(monkeypatch):
+    monkeypatch.setenv("BACKEND_WORKERS", "4")
+    assert server.load_rate_limits()["dall-e-3"] == server.DEFAULT_RATE_LIMITS["dall-e-3"]
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+def remembered(db, video_id):
+    return asyncio.run(db.idempotency.insert_one({"key": f"generate-video:{video_id}", "status": "completed", "response": {"video_id": video_id}}))
+
+def is_remembered(db, video_id):
+    return asyncio.run(db.idempotency.count_documents({"response.video_id": video_id})) == 1
+
+@pytest.fixture
+def worker(monkeypatch):
+    worker = server.RenderWorker()
+    monkeypatch.setattr(server, "render_worker", worker)
+    return worker
+
+@pytest.mark.parametrize("entry", [
+    {"status": "queued"},
+    {"status": "failed"},
+    {"status": "rendering", "heartbeat_at": datetime.utcnow() - server.RENDER_CLAIM_TIMEOUT - timedelta(seconds=1)},
+])
+def test_renders_nobody_works_on_are_dropped(db, worker, entry):
+    asyncio.run(db.video_processing.insert_one({"video_id": "v1", **entry}))
+    remembered(db, "v1")
+    
+    assert asyncio.run(server.cancel_video("v1"))["status"] == "cancelled"
+    assert asyncio.run(db.video_processing.count_documents({})) == 0
+    assert not is_remembered(db, "v1")
+
+def test_running_render_is_asked_to_stop(db, worker):
+    asyncio.run(db.video_processing.insert_one({"video_id": "v1", "status": "rendering", "heartbeat_at": datetime.utcnow()}))
+    remembered(db, "v1")
+    control = worker.running["v1"] = server.RenderControl()
+    
+    assert asyncio.run(server.cancel_video("v1"))["status"] == "cancelling"
+    assert asyncio.run(db.video_processing.find_one({"video_id": "v1"}))["cancel_requested"] is True
+    assert control.cancelled.is_set()
+    assert not is_remembered(db, "v1")
+
+def test_finished_render_is_not_cancelled_or_forgotten(db, worker):
+    remembered(db, "v1")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.cancel_video("v1"))
+    assert error.value.status_code == 404
+    # A retried /generate-video still gets the finished render
+    assert is_remembered(db, "v1")
+
+def test_running_render_keeps_running_under_its_watch(db, monkeypatch):
+    monkeypatch.setattr(server, "RENDER_POLL_SECONDS", 0.01)
+    asyncio.run(db.video_processing.insert_one({"video_id": "v1", "status": "rendering", "heartbeat_at": datetime.utcnow()}))
+    control = server.RenderControl()
+    
+    async def main():
+        watch = asyncio.create_task(server.RenderWorker().watch("v1", control))
+        await asyncio.sleep(0.05)
+        watch.cancel()
+    
+    asyncio.run(main())
+    assert not control.cancelled.is_set()
+
+def test_watch_stops_a_render_whose_entry_is_gone(db, monkeypatch):
+    monkeypatch.setattr(server, "RENDER_POLL_SECONDS", 0.01)
+    control = server.RenderControl()
+    asyncio.run(asyncio.wait_for(server.RenderWorker().watch("v1", control), 1))
+    assert control.cancelled.is_set()
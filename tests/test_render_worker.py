@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+
+SUBTITLES = {"font": "Arial", "color": "white", "placement": "bottom", "background": "solid", "outline": False, "shadow": False}
+
+def job(video_id, lane="interactive", minutes_ago=0, **fields):
+    now = datetime.utcnow()
+    return {
+        "video_id": video_id,
+        "story_id": "s",
+        "status": "queued",
+        "subtitle_customization": SUBTITLES,
+        "voice_id": "alloy",
+        "formats": ["9:16"],
+        "lane": lane,
+        "priority": server.RENDER_PRIORITIES[lane],
+        "attempts": 0,
+        "queued_at": now - timedelta(minutes=minutes_ago),
+        "watched_at": now,
+        **fields,
+    }
+
+def claim_all(worker):
+    async def main():
+        claimed = []
+        while job := await worker.claim():
+            claimed.append(job["video_id"])
+        return claimed
+    return asyncio.run(main())
+
+def test_interactive_renders_are_claimed_first_then_oldest_first(db):
+    asyncio.run(db.video_processing.insert_many([
+        job("batch-old", "batch", minutes_ago=1),
+        job("interactive-new", minutes_ago=0.5),
+        job("batch-new", "batch"),
+        job("interactive-old", minutes_ago=1),
+    ]))
+    assert claim_all(server.RenderWorker()) == ["interactive-old", "interactive-new", "batch-old", "batch-new"]
+
+def test_unwatched_interactive_render_waits_in_the_batch_lane(db):
+    unwatched = job("unwatched", minutes_ago=5, watched_at=datetime.utcnow() - server.RENDER_WATCH_TIMEOUT - timedelta(seconds=1))
+    asyncio.run(db.video_processing.insert_many([unwatched, job("batch", "batch", minutes_ago=1), job("watched")]))
+    assert claim_all(server.RenderWorker()) == ["watched", "unwatched", "batch"]
+
+def test_claim_stamps_the_start_and_heartbeat(db):
+    asyncio.run(db.video_processing.insert_one(job("v1", minutes_ago=30)))
+    claimed = asyncio.run(server.RenderWorker().claim())
+    assert claimed["status"] == "rendering"
+    assert claimed["claimed_by"] == server.INSTANCE_ID
+    assert claimed["attempts"] == 1
+    assert datetime.utcnow() - claimed["started_at"] < timedelta(minutes=1)
+    assert claimed["heartbeat_at"] == claimed["started_at"]
+
+def test_stalled_renders_are_taken_over_until_attempts_run_out(db):
+    stale = datetime.utcnow() - server.RENDER_CLAIM_TIMEOUT - timedelta(seconds=1)
+    asyncio.run(db.video_processing.insert_many([
+        job("stalled", status="rendering", heartbeat_at=stale, attempts=1),
+        job("exhausted", status="rendering", heartbeat_at=stale, attempts=server.RENDER_MAX_ATTEMPTS),
+        job("cancelled", status="rendering", heartbeat_at=stale, attempts=1, cancel_requested=True),
+        job("alive", status="rendering", heartbeat_at=datetime.utcnow(), attempts=1),
+    ]))
+    assert claim_all(server.RenderWorker()) == ["stalled"]
+
+@pytest.fixture
+def rendered(monkeypatch):
+    calls = []
+    
+    async def create_video(story, customization, video_id, voice_id, formats, burn_subtitles=False, control=None):
+        calls.append({"story": story["id"], "font": customization.font, "video_id": video_id, "voice": voice_id, "formats": formats, "burn": burn_subtitles})
+    
+    monkeypatch.setattr(server, "create_video", create_video)
+    return calls
+
+def test_render_runs_the_job_and_frees_its_slot(db, rendered):
+    asyncio.run(db.stories.insert_one({"id": "s", "story": "A robot walks home."}))
+    worker = server.RenderWorker()
+    
+    async def main():
+        await worker.slots.acquire()
+        await worker.render(job("v1", formats=["9:16", "1:1"], burn_subtitles=True))
+        return worker.slots.locked()
+    
+    assert asyncio.run(main()) is False
+    assert rendered == [{"story": "s", "font": "Arial", "video_id": "v1", "voice": "alloy", "formats": ["9:16", "1:1"], "burn": True}]
+    assert worker.running == {}
+
+def test_render_of_a_deleted_story_fails_and_is_forgotten(db, rendered):
+    asyncio.run(db.video_processing.insert_one(job("v1", status="rendering")))
+    asyncio.run(db.idempotency.insert_one({"key": "generate-video:k", "status": "completed", "response": {"video_id": "v1"}}))
+    
+    async def main():
+        worker = server.RenderWorker()
+        await worker.slots.acquire()
+        await worker.render(job("v1"))
+    
+    asyncio.run(main())
+    failed = asyncio.run(db.video_processing.find_one({"video_id": "v1"}))
+    assert (failed["status"], failed["error"]) == ("failed", "Story not found")
+    assert asyncio.run(db.idempotency.count_documents({})) == 0
+    assert rendered == []
+
+def test_watch_cancels_when_another_worker_asks(db, monkeypatch):
+    monkeypatch.setattr(server, "RENDER_POLL_SECONDS", 0.01)
+    asyncio.run(db.video_processing.insert_one(job("v1", status="rendering", cancel_requested=True)))
+    control = server.RenderControl()
+    
+    asyncio.run(asyncio.wait_for(server.RenderWorker().watch("v1", control), 1))
+    assert control.cancelled.is_set()
+
+def test_watch_heartbeats_its_own_claim(db, monkeypatch):
+    monkeypatch.setattr(server, "RENDER_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(server, "RENDER_HEARTBEAT_SECONDS", 0)
+    old = datetime.utcnow() - timedelta(minutes=1)
+    asyncio.run(db.video_processing.insert_one(job("v1", status="rendering", claimed_by=server.INSTANCE_ID, heartbeat_at=old)))
+    
+    async def main():
+        watch = asyncio.create_task(server.RenderWorker().watch("v1", server.RenderControl()))
+        await asyncio.sleep(0.05)
+        assert not watch.done()
+        watch.cancel()
+    
+    asyncio.run(main())
+    assert asyncio.run(db.video_processing.find_one({"video_id": "v1"}))["heartbeat_at"] > old
+
+def test_worker_loop_claims_and_renders_queued_jobs(db, rendered, monkeypatch):
+    asyncio.run(db.stories.insert_one({"id": "s", "story": "A robot walks home."}))
+    asyncio.run(db.video_processing.insert_many([job("v1"), job("v2", "batch")]))
+    
+    async def main():
+        worker = server.RenderWorker()
+        loop = asyncio.create_task(worker.run())
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(rendered) == 2:
+                break
+        loop.cancel()
+    
+    asyncio.run(main())
+    assert [call["video_id"] for call in rendered] == ["v1", "v2"]
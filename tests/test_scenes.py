@@ -0,0 +1,34 @@
+import pytest
+
+import server
+
+STORY = (
+    "The robot woke up in an empty city. It walked to the harbour, counting the boats. "
+    "Nobody answered its calls, so it kept walking. At dusk, a cat followed it home! "
+    "They shared the last battery that night."
+)
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8])
+def test_scenes_cover_the_story_in_order(count):
+    scenes = server.build_scenes(STORY, count)
+    assert len(scenes) == count
+    assert [scene["index"] for scene in scenes] == list(range(count))
+    assert " ".join(scene["text"] for scene in scenes).split() == STORY.split()
+    assert all(scene["text"] for scene in scenes)
+    assert sum(scene["weight"] for scene in scenes) == pytest.approx(1, abs=1e-5)
+
+def test_scenes_cut_between_sentences_when_there_are_enough():
+    scenes = server.build_scenes(STORY, 3)
+    assert all(scene["text"].rstrip()[-1] in ".!?" for scene in scenes)
+
+def test_scene_weights_follow_speaking_time():
+    scenes = server.build_scenes("Short. " + "This sentence is a great deal longer than the first one. " * 3, 2)
+    assert scenes[0]["weight"] < scenes[1]["weight"]
+
+def test_fewer_words_than_scenes_gives_one_scene_per_word():
+    scenes = server.build_scenes("Two words", 5)
+    assert [scene["text"] for scene in scenes] == ["Two", "words"]
+    assert all(scene["weight"] > 0 for scene in scenes)
+
+def test_empty_story_has_no_scenes():
+    assert server.build_scenes("   ", 3) == []
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import server
+
+STYLE = {"font": "Arial", "color": "#ffcc00", "placement": "bottom", "background": "solid", "outline": False, "shadow": False}
+
+def test_wrap_text_fits_lines_and_keeps_every_word():
+    font = server.load_subtitle_font("Arial")
+    text = "the quick brown fox jumps over the lazy dog " * 4 + "supercalifragilisticexpialidocious"
+    wrapped = server.wrap_text(text, font, 200)
+    lines = wrapped.split("\n")
+    assert " ".join(lines).split() == text.split()
+    assert len(lines) > 1
+    for line in lines:
+        assert font.getlength(line) <= 200 or " " not in line
+
+def test_dilate_mask_grows_by_radius():
+    mask = np.zeros((9, 9), dtype=np.uint8)
+    mask[4, 4] = 255
+    dilated = server.dilate_mask(mask, 2)
+    assert (dilated[2:7, 2:7] == 255).all()
+    assert dilated.sum() == 25 * 255
+    assert mask.sum() == 255
+
+def overlay(width, height, text="Hello subtitles", **style):
+    style = {**STYLE, **style}
+    return server.subtitle_overlay(width, height, text, style["font"], style["color"], style["placement"], style["background"], style["outline"], style["shadow"])
+
+def test_composite_matches_alpha_blending():
+    premultiplied, inverse_alpha, (x, y) = overlay(640, 360, outline=True, shadow=True)
+    frame = np.random.default_rng(0).integers(0, 256, (360, 640, 3), dtype=np.uint8)
+    img = Image.fromarray(frame)
+    server.composite_subtitle(img, (premultiplied, inverse_alpha, (x, y)))
+    result = np.asarray(img).astype(int)
+    
+    height, width = inverse_alpha.shape[:2]
+    region = frame[y:y + height, x:x + width].astype(float)
+    expected = np.minimum(region * inverse_alpha / 255 + premultiplied, 255)
+    assert np.abs(result[y:y + height, x:x + width] - expected).max() <= 1
+    # Nothing outside the overlay changes
+    outside = np.ones(frame.shape[:2], dtype=bool)
+    outside[y:y + height, x:x + width] = False
+    assert (result[outside] == frame[outside]).all()
+
+def test_solid_box_darkens_and_text_takes_its_colour():
+    img = Image.new("RGB", (640, 360), (200, 200, 200))
+    premultiplied, inverse_alpha, (x, y) = overlay(640, 360)
+    server.composite_subtitle(img, (premultiplied, inverse_alpha, (x, y)))
+    pixels = np.asarray(img)
+    box = pixels[y + server.SUBTITLE_PADDING // 2, x + server.SUBTITLE_PADDING // 2]
+    assert tuple(box) == (round(200 * (1 - server.SUBTITLE_BACKGROUND_ALPHA / 255)),) * 3
+    # The most opaque text pixel shows the text colour, not the box or the frame
+    row, column = np.unravel_index(inverse_alpha[..., 0].argmin(), inverse_alpha.shape[:2])
+    assert np.abs(pixels[y + row, x + column].astype(int) - (255, 204, 0)).max() <= 5
+
+def test_transparent_background_leaves_the_frame_around_the_text():
+    premultiplied, inverse_alpha, _ = overlay(640, 360, background="none")
+    text = premultiplied.any(axis=2)
+    assert (inverse_alpha[~text] == 255).all()
+    assert (inverse_alpha[text] < 255).all()
+
+@pytest.mark.parametrize("placement", ["top", "middle", "bottom"])
+@pytest.mark.parametrize("background", ["solid", "gradient"])
+def test_overlay_is_clipped_to_small_frames(placement, background):
+    text = "A subtitle far too long to fit on a frame this small " * 3
+    premultiplied, inverse_alpha, (x, y) = overlay(120, 60, text, placement=placement, background=background, outline=True, shadow=True)
+    height, width = inverse_alpha.shape[:2]
+    assert premultiplied.shape[:2] == (height, width)
+    assert x >= 0 and y >= 0 and x + width <= 120 and y + height <= 60
+    img = Image.new("RGB", (120, 60), (50, 100, 150))
+    server.composite_subtitle(img, (premultiplied, inverse_alpha, (x, y)))
+    assert img.size == (120, 60)
+
+def test_gradient_box_gets_darker_towards_the_bottom():
+    premultiplied, inverse_alpha, _ = overlay(640, 360, text="", background="gradient")
+    column = inverse_alpha[:, inverse_alpha.shape[1] // 2, 0]
+    box = column[column < 255]
+    assert len(box) > 2
+    assert (np.diff(box.astype(int)) <= 0).all() and box[0] > box[-1]
+
+def test_add_subtitle_to_image(tmp_path):
+    source, output = tmp_path / "frame.png", tmp_path / "subtitled.png"
+    Image.new("RGB", (320, 240), (10, 20, 30)).save(source)
+    server.add_subtitle_to_image(str(source), "Hello", str(output), server.SubtitleCustomization(**STYLE))
+    with Image.open(output) as img:
+        assert img.size == (320, 240)
+        assert np.asarray(img).any(axis=2).any()
@@ -0,0 +1,96 @@
+import asyncio
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import server
+
+STORY = "A robot wakes up. It walks to the harbour. A cat follows it home."
+
+@pytest.fixture
+def client(db, media_dir):
+    asyncio.run(db.stories.insert_one({"id": "s", "story": STORY, "duration": "30-60"}))
+    return TestClient(server.app)
+
+def image_bytes(size=(64, 48), image_format="PNG", color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+def upload_images(client, *images, story_id="s"):
+    files = [("files", (f"still{i}.png", data, "image/png")) for i, data in enumerate(images)]
+    return client.post("/api/upload-images", data={"story_id": story_id}, files=files)
+
+def test_images_are_stored_once_by_content_and_given_scenes(client, db, media_dir):
+    red, blue = image_bytes(), image_bytes((48, 64), "JPEG", (0, 0, 255))
+    response = upload_images(client, red, blue, red)
+    assert response.status_code == 200
+    
+    story = asyncio.run(db.stories.find_one({"id": "s"}))
+    assert len(story["images"]) == 3 and story["images"][0] == story["images"][2]
+    assert story["images"][1].endswith(".jpg")
+    assert len(story["scenes"]) == 3
+    assert [state["status"] for state in story["image_segments"]] == ["done"] * 3
+    assert story["style"] == "uploaded"
+    assert len(list((media_dir / "images").iterdir())) == 2
+    
+    catalogued = asyncio.run(db.media.find_one({"url": story["images"][1]}))
+    assert (catalogued["width"], catalogued["height"], catalogued["codec"]) == (48, 64, "jpeg")
+    assert catalogued["story_ids"] == ["s"]
+
+@pytest.mark.parametrize("data, detail", [
+    (b"not an image at all", "is not a readable image"),
+    (image_bytes(image_format="GIF"), "must be one of"),
+    (b"", "is empty"),
+])
+def test_bad_images_are_rejected(client, data, detail):
+    response = upload_images(client, data)
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+def test_more_images_than_the_story_has_words_are_rejected(client, db):
+    asyncio.run(db.stories.insert_one({"id": "short", "story": "Two words", "duration": "30-60"}))
+    response = upload_images(client, image_bytes(), image_bytes(), image_bytes(), story_id="short")
+    assert response.status_code == 400
+    assert asyncio.run(db.media.count_documents({})) == 0
+
+def test_upload_form_needs_a_story_and_files(client):
+    assert client.post("/api/upload-images", data={"story_id": "s"}, files=[("other", ("a.txt", b"x"))]).status_code == 400
+    assert client.post("/api/upload-images", files=[("files", ("a.png", image_bytes()))]).status_code == 400
+    assert client.post("/api/upload-images", json={"story_id": "s"}).status_code == 400
+    assert upload_images(client, image_bytes(), story_id="missing").status_code == 404
+
+def test_declared_oversized_upload_is_refused_before_reading(client, monkeypatch):
+    monkeypatch.setattr(server, "MAX_UPLOAD_BYTES", 1000)
+    monkeypatch.setattr(server, "UPLOAD_FORM_OVERHEAD_BYTES", 100)
+    response = upload_images(client, image_bytes((400, 400), color=(1, 2, 3)) + b"\0" * 2000)
+    assert response.status_code == 413
+
+def test_streamed_oversized_upload_is_cut_off_at_the_limit(client, media_dir, monkeypatch):
+    monkeypatch.setattr(server, "MAX_UPLOAD_BYTES", 1000)
+    monkeypatch.setattr(server, "UPLOAD_FORM_OVERHEAD_BYTES", 100)
+    def body():
+        yield (
+            b'--boundary\r\nContent-Disposition: form-data; name="story_id"\r\n\r\ns\r\n'
+            b'--boundary\r\nContent-Disposition: form-data; name="files"; filename="big.png"\r\n'
+            b"Content-Type: image/png\r\n\r\n"
+        )
+        for _ in range(100):
+            yield b"\0" * 100
+        yield b"\r\n--boundary--\r\n"
+    
+    # No Content-Length: the body arrives chunked and has to be counted
+    response = client.post("/api/upload-images", content=body(), headers={"Content-Type": "multipart/form-data; boundary=boundary"})
+    assert response.status_code == 413
+    assert list((media_dir / "images").iterdir()) == []
+
+def test_narration_must_be_a_supported_readable_audio_file(client):
+    response = client.post("/api/upload-audio", data={"story_id": "s"}, files=[("file", ("voice.ogg", b"OggS"))])
+    assert response.status_code == 400
+    assert ".mp3" in response.json()["detail"]
+    
+    response = client.post("/api/upload-audio", data={"story_id": "s"}, files=[("file", ("voice.mp3", b"not audio"))])
+    assert response.status_code == 400
+    assert "not a readable audio file" in response.json()["detail"]
@@ -0,0 +1,40 @@
+import server
+
+STYLE = {"font": "Arial", "color": "#ffcc00", "placement": "bottom", "background": "solid", "outline": False, "shadow": False}
+
+def test_cues_follow_scene_durations():
+    cues = server.subtitle_cues(["First  scene.", "Second\nscene."], [2.5, 1.25])
+    assert cues == [
+        {"start": 0.0, "end": 2.5, "text": "First scene."},
+        {"start": 2.5, "end": 3.75, "text": "Second scene."},
+    ]
+
+def test_webvtt_cues_and_timestamps():
+    vtt = server.cues_to_webvtt([{"start": 0.0, "end": 3661.5, "text": "Hello"}], STYLE)
+    assert vtt.startswith("WEBVTT\n\nSTYLE\n::cue {")
+    assert "1\n00:00:00.000 --> 01:01:01.500 line:80%,end align:center\nHello\n" in vtt
+    assert "font-family: Arial, sans-serif;" in vtt
+    assert "color: #ffcc00;" in vtt
+    assert "background: rgba(0, 0, 0, 0.7);" in vtt
+    assert "text-shadow" not in vtt
+
+def test_webvtt_escapes_cue_markup():
+    vtt = server.cues_to_webvtt([{"start": 0, "end": 1, "text": "Tom & Jerry <b>run</b>"}], STYLE)
+    assert "Tom &amp; Jerry &lt;b&gt;run&lt;/b&gt;" in vtt
+
+def test_webvtt_drops_blank_lines_inside_a_cue():
+    vtt = server.cues_to_webvtt([{"start": 0, "end": 1, "text": "one\n\n  \ntwo"}, {"start": 1, "end": 2, "text": "three"}], STYLE)
+    cue_blocks = vtt.split("\n\n")[2:]
+    assert len(cue_blocks) == 2
+    assert cue_blocks[0].endswith("one\ntwo")
+
+def test_webvtt_outline_and_shadow_become_text_shadow():
+    vtt = server.cues_to_webvtt([], {**STYLE, "outline": True, "shadow": True, "placement": "top", "background": "none"})
+    assert "text-shadow: -2px -2px 0 #000, 2px -2px 0 #000, -2px 2px 0 #000, 2px 2px 0 #000, 3px 3px 3px rgba(0, 0, 0, 0.63);" in vtt
+    assert "background: transparent;" in vtt
+
+def test_webvtt_style_values_cannot_close_the_css_block():
+    vtt = server.cues_to_webvtt([], {**STYLE, "font": "Arial} ::cue { color: red", "color": "red;}"})
+    style = vtt.split("STYLE\n", 1)[1]
+    assert style.count("{") == 1 and style.count("}") == 1
+